@@ -0,0 +1,299 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas as pd
+
+from benchmarks import synthetic
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+SCALES = [1, 10, 100, 1000]
+
+ANYED_USAGE = pd.DataFrame({
+    "Helium Fuel Block": [957, 392, 174, 174, 50, 15219, 7392, 870, 19567, 0, 0, 0],
+    "Hydrogen Fuel Block": [957, 392, 174, 174, 50, 15219, 7392, 870, 0, 19567, 0, 0],
+    "Nitrogen Fuel Block": [957, 392, 174, 174, 50, 15219, 7392, 870, 0, 0, 19567, 0],
+    "Oxygen Fuel Block": [957, 392, 174, 174, 50, 15219, 7392, 870, 0, 0, 0, 19567],
+}, index=synthetic.FUEL_MATERIALS)
+
+
+# Each setup(scale, workdir) writes its inputs and returns (rows, run, prepare). `run` is timed;
+# `prepare` (or None) restores state before every run and is not timed.
+
+def setup_stock_full(scale, workdir):
+    from fuel.storage import calculate_stock_full
+    ledger = synthetic.inventory_ledger(synthetic.BASE_LEDGER_ROWS * scale)
+    ledger.to_csv(os.path.join(workdir, "inventory.csv"), index=False)
+    return len(ledger), lambda: calculate_stock_full("RYC", "FIFO"), None
+
+
+def setup_stock_incremental(scale, workdir):
+    from fuel.ledger import InventoryLedger
+    from fuel.storage import INVENTORY_CSV, INVENTORY_STATE, calculate_stock
+    ledger = synthetic.inventory_ledger(synthetic.BASE_LEDGER_ROWS * scale)
+    ledger.iloc[:-1].to_csv(os.path.join(workdir, "inventory.csv"), index=False)
+    checkpoint = InventoryLedger(INVENTORY_CSV, INVENTORY_STATE)
+    checkpoint.rebuild()
+    shutil.copy("inventory.csv", "inventory.base.csv")
+    shutil.copy(INVENTORY_STATE, "inventory_state.base.json")
+    shutil.copytree(checkpoint.lots_dir, "inventory_state.base.lots")
+    last = ledger.iloc[-1].to_dict()
+
+    def prepare():
+        shutil.copy("inventory.base.csv", "inventory.csv")
+        shutil.copy("inventory_state.base.json", INVENTORY_STATE)
+        shutil.rmtree(checkpoint.lots_dir)
+        shutil.copytree("inventory_state.base.lots", checkpoint.lots_dir)
+
+    def run():
+        InventoryLedger(INVENTORY_CSV, INVENTORY_STATE).append(last)
+        return calculate_stock("RYC", "FIFO")
+
+    return len(ledger), run, prepare
+
+
+def setup_block_costs(scale, workdir):
+    from fuel.production import calculate_block_costs
+    from fuel.storage import INVENTORY_STATE
+    ledger = synthetic.inventory_ledger(synthetic.BASE_LEDGER_ROWS * scale)
+    ledger.to_csv(os.path.join(workdir, "inventory.csv"), index=False)
+
+    def prepare():
+        # Cold: the stock checkpoint is rebuilt from the whole ledger
+        if os.path.exists(INVENTORY_STATE):
+            os.remove(INVENTORY_STATE)
+        shutil.rmtree("inventory_state.lots", ignore_errors=True)
+
+    return len(ledger), lambda: calculate_block_costs(ANYED_USAGE, 2000, target="Anyed"), prepare
+
+
+def _timeline_frames(n_snapshots):
+    frames = synthetic.price_history(n_snapshots, regions=["jita", "C-J6MT"])
+    df_jita, df_cj = frames["jita"], frames["C-J6MT"]
+    for df, region in [(df_jita, "Jita"), (df_cj, "C-J6MT")]:
+        df["Region"] = region
+        df["Timestamp"] = pd.to_datetime(df["Timestamp"])
+        df.sort_values("Timestamp", inplace=True)
+    return df_jita, df_cj
+
+
+def setup_timeline_rebuild(scale, workdir):
+    from fuel.timeline import rebuild_timeline
+    df_jita, df_cj = _timeline_frames(synthetic.BASE_SNAPSHOTS * scale)
+    return len(df_jita) + len(df_cj), lambda: rebuild_timeline(df_jita.copy(), df_cj.copy(), workdir), None
+
+
+def setup_timeline_update(scale, workdir):
+    from fuel.timeline import COMPARISON_CSV, FULL_TIMESERIES_CSV, STATE_FILE, rebuild_timeline, update_timeline
+    df_jita, df_cj = _timeline_frames(synthetic.BASE_SNAPSHOTS * scale)
+    last = df_jita["Timestamp"].max()
+    rebuild_timeline(df_jita[df_jita["Timestamp"] < last].copy(),
+                     df_cj[df_cj["Timestamp"] < df_cj["Timestamp"].max()].copy(), workdir)
+    saved = [FULL_TIMESERIES_CSV, COMPARISON_CSV, STATE_FILE]
+    os.makedirs("base", exist_ok=True)
+    for name in saved:
+        shutil.copy(name, os.path.join("base", name))
+
+    def prepare():
+        for name in saved:
+            shutil.copy(os.path.join("base", name), name)
+
+    return len(df_jita) + len(df_cj), lambda: update_timeline(df_jita, df_cj, workdir), prepare
+
+
+def _history_csvs(n_snapshots):
+    frames = synthetic.price_history(n_snapshots)
+    os.makedirs("prices", exist_ok=True)
+    for region, df in frames.items():
+        df.to_csv(os.path.join("prices", f"prices_{region}.csv"), index=False)
+    return sum(len(df) for df in frames.values())
+
+
+def setup_history_csv(scale, workdir):
+    rows = _history_csvs(synthetic.BASE_SNAPSHOTS * scale)
+
+    def run():
+        # One item in one region the way it was done before the cube: load and filter the file
+        df = pd.read_csv(os.path.join("prices", "prices_jita.csv"))
+        df["Timestamp"] = pd.to_datetime(df["Timestamp"])
+        return df[df["Item"] == "Coolant"]
+
+    return rows, run, None
+
+
+def setup_history_cube(scale, workdir):
+    from common.history import PriceHistoryStore
+    from common.pricecube import PriceCubeStore
+    rows = _history_csvs(synthetic.BASE_SNAPSHOTS * scale)
+    PriceCubeStore("pricecube").build_from_history(PriceHistoryStore("history", csv_dir="prices"))
+    return rows, lambda: PriceCubeStore("pricecube").history("jita", "Coolant"), None
+
+
+def setup_market_cube(scale, workdir):
+    from fuel.market_cube import MarketCube
+    frames = synthetic.price_history(synthetic.BASE_SNAPSHOTS * scale)
+
+    def run():
+        cube = MarketCube.from_frames(frames)
+        return cube.to_frame()
+
+    return sum(len(df) for df in frames.values()), run, None
+
+
+def setup_refining(scale, workdir):
+    from trade.refining import MINERAL_COLUMNS, refining_grid
+    df_ores = pd.read_csv(os.path.join(ROOT, "trade", "ores.csv"))
+    yields = [0.5 + 0.4 * i / scale for i in range(scale)]
+    ore_frames, mineral_frames = synthetic.ore_prices(df_ores, MINERAL_COLUMNS.values(), synthetic.REGIONS)
+    rows = len(df_ores) * len(yields) * len(ore_frames) * len(mineral_frames)
+    return rows, lambda: refining_grid(df_ores, ore_frames, mineral_frames, yields=yields), None
+
+
+def setup_shipping_compare(scale, workdir):
+    from fuel.cargo import compare_buy_prices_with_shipping
+    n_items = 16 * scale
+    frames = synthetic.price_history(2, n_items=n_items, regions=["jita", "C-J6MT"])
+    os.makedirs("prices", exist_ok=True)
+    synthetic.latest_prices(frames).to_csv(os.path.join("prices", "latest.csv"), index=False)
+    synthetic.items_table(n_items).to_csv("items.csv", index=False)
+    return n_items, compare_buy_prices_with_shipping, None
+
+
+def setup_arbitrage(scale, workdir):
+    from common.arbitrage import scan_arbitrage
+    n_items = 16 * scale
+    latest = synthetic.latest_prices(synthetic.price_history(2, n_items=n_items))
+    volumes = synthetic.items_table(n_items).set_index("Item")["Volume"]
+    return len(latest), lambda: scan_arbitrage(latest, volumes, default_cost=1200), None
+
+
+def setup_order_volumes(scale, workdir):
+    from trade.orders import add_order_volumes
+    pages = synthetic.order_pages(synthetic.BASE_ORDERS * scale)
+
+    def run():
+        volume_map = {}
+        for page in pages:
+            add_order_volumes(volume_map, page)
+        return volume_map
+
+    return sum(len(page) for page in pages), run, None
+
+
+# name -> (setup, largest scale that is practical to generate)
+BENCHMARKS = {
+    "stock_full": (setup_stock_full, 1000),
+    "stock_incremental": (setup_stock_incremental, 1000),
+    "block_costs": (setup_block_costs, 1000),
+    "timeline_rebuild": (setup_timeline_rebuild, 1000),
+    "timeline_update": (setup_timeline_update, 1000),
+    "history_csv": (setup_history_csv, 1000),
+    "history_cube": (setup_history_cube, 1000),
+    "market_cube": (setup_market_cube, 1000),
+    "refining_grid": (setup_refining, 1000),
+    "shipping_compare": (setup_shipping_compare, 1000),
+    "arbitrage_scan": (setup_arbitrage, 1000),
+    "order_volumes": (setup_order_volumes, 100),
+}
+
+
+def measure(run, prepare, repeat):
+    best = None
+    for _ in range(repeat):
+        if prepare:
+            prepare()
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    # Separate traced run: tracemalloc slows allocation-heavy code down
+    if prepare:
+        prepare()
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def git_revision():
+    def git(*args):
+        out = subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True)
+        return out.stdout.strip() if out.returncode == 0 else ""
+
+    revision = git("rev-parse", "--short", "HEAD") or "unknown"
+    dirty = bool(git("status", "--porcelain", "--untracked-files=no"))
+    return revision, dirty
+
+
+def results_path(revision):
+    return os.path.join(RESULTS_DIR, f"{revision}.json")
+
+
+def load_results(revision):
+    path = results_path(revision)
+    if not os.path.exists(path):
+        sys.exit(f"No stored results for {revision}: {path}")
+    with open(path, encoding="utf-8") as f:
+        return {(r["bench"], r["scale"]): r for r in json.load(f)["results"]}
+
+
+def run_benchmarks(names, scales, repeat):
+    results = []
+    for name in names:
+        setup, max_scale = BENCHMARKS[name]
+        for scale in scales:
+            if scale > max_scale:
+                continue
+            with tempfile.TemporaryDirectory() as workdir, contextlib.chdir(workdir), \
+                    contextlib.redirect_stdout(io.StringIO()):
+                rows, run, prepare = setup(scale, workdir)
+                seconds, peak = measure(run, prepare, repeat)
+            results.append({"bench": name, "scale": scale, "rows": rows,
+                            "seconds": seconds, "peak_mb": peak / 2**20})
+            print(f"{name:<18} {scale:>5}x {rows:>10,} rows {seconds * 1000:10.1f} ms {peak / 2**20:9.1f} MB",
+                  flush=True)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time and memory-profile hot paths on synthetic data")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="benchmarks to run (default: all)")
+    parser.add_argument("--scales", nargs="+", type=int, default=SCALES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--compare", metavar="REVISION", help="stored revision to compare against")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    revision, dirty = git_revision()
+    baseline = load_results(args.compare) if args.compare else None
+    results = run_benchmarks(args.only or list(BENCHMARKS), args.scales, args.repeat)
+
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        name = f"{revision}-dirty" if dirty else revision
+        with open(results_path(name), "w", encoding="utf-8") as f:
+            json.dump({"revision": revision, "dirty": dirty, "python": sys.version.split()[0],
+                       "date": datetime.now().isoformat(timespec="seconds"), "results": results}, f, indent=2)
+        print(f"Saved {results_path(name)}")
+
+    if baseline:
+        print(f"\nChange against {args.compare} (time, peak memory):")
+        for r in results:
+            old = baseline.get((r["bench"], r["scale"]))
+            if old:
+                print(f"{r['bench']:<18} {r['scale']:>5}x {r['seconds'] / old['seconds']:8.2f}x "
+                      f"{r['peak_mb'] / max(old['peak_mb'], 1e-9):8.2f}x")
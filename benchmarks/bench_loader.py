@@ -0,0 +1,63 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from benchmarks import synthetic
+from common.loader import TableCache, load_table
+
+SCALES = [1, 10, 100, 1000]
+
+
+def read_today(path, date_column, date_format=None):
+    """What the modules did before common.loader: default dtypes, dates parsed by the caller."""
+    df = pd.read_csv(path)
+    df[date_column] = pd.to_datetime(df[date_column], format=date_format, errors="coerce")
+    return df
+
+
+def best_time(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, df
+
+
+def write_inputs(scale, workdir):
+    prices = os.path.join(workdir, "prices.csv")
+    inventory = os.path.join(workdir, "inventory.csv")
+    synthetic.price_history(synthetic.BASE_SNAPSHOTS * scale, regions=["jita"])["jita"].to_csv(prices, index=False)
+    synthetic.inventory_ledger(synthetic.BASE_LEDGER_ROWS * scale).to_csv(inventory, index=False)
+    return {"prices": (prices, "Timestamp", None), "inventory": (inventory, "Date", "%m/%d/%Y")}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load time and memory: plain read_csv vs the typed loader")
+    parser.add_argument("--scales", nargs="+", type=int, default=SCALES)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'table':<10} {'scale':>6} {'rows':>10} | {'read_csv':>9} {'loader':>9} {'cached':>9} | "
+          f"{'read_csv':>9} {'loader':>9} {'float64':>9}")
+    print(f"{'':<30}| {'ms':>9} {'ms':>9} {'ms':>9} | {'MB':>9} {'MB':>9} {'MB':>9}")
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as workdir:
+            for kind, (path, date_column, date_format) in write_inputs(scale, workdir).items():
+                today_s, today_df = best_time(lambda: read_today(path, date_column, date_format), args.repeat)
+                cold_s, typed_df = best_time(lambda: load_table(path, kind, cache=None), args.repeat)
+                cache = TableCache()
+                load_table(path, kind, cache=cache)
+                warm_s, _ = best_time(lambda: load_table(path, kind, cache=cache), args.repeat)
+                full_df = load_table(path, kind, compact=False, cache=None)
+
+                mb = [df.memory_usage(deep=True).sum() / 2**20 for df in (today_df, typed_df, full_df)]
+                print(f"{kind:<10} {scale:>5}x {len(today_df):>10,} | {today_s * 1000:9.1f} {cold_s * 1000:9.1f} "
+                      f"{warm_s * 1000:9.1f} | {mb[0]:9.2f} {mb[1]:9.2f} {mb[2]:9.2f}", flush=True)
@@ -0,0 +1,67 @@
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.appraisal import BACKENDS, parse_region_tables
+
+# The fixture pages are synthetic: built by hand in the appraisal site's markup (tabs, Sell/Buy
+# tables, nav chrome) with made-up prices, not captured from the live site. Timings are
+# indicative; drop real saved pages in as appraisal_<type_id>.html to measure on those.
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+REGIONS = ["C-J6MT", "UALX-3", "jita", "amarr", "dodixie"]
+
+
+def load_fixtures(pattern="appraisal_*.html"):
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, pattern))):
+        with open(path, encoding="utf-8") as f:
+            pages[os.path.basename(path)] = f.read()
+    return pages
+
+
+def check_identical(pages):
+    reference = None
+    mismatches = []
+    for backend in BACKENDS:
+        parsed = {name: parse_region_tables(html, REGIONS, backend=backend) for name, html in pages.items()}
+        if reference is None:
+            reference = (backend, parsed)
+            continue
+        for name in pages:
+            if parsed[name] != reference[1][name]:
+                mismatches.append(f"{name}: {backend} != {reference[0]}")
+    return mismatches
+
+
+def bench_backend(backend, pages, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for html in pages.values():
+            parse_region_tables(html, REGIONS, backend=backend)
+    elapsed = time.perf_counter() - start
+    return rounds * len(pages) / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare HTML extraction backends on synthetic appraisal pages")
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    pages = load_fixtures()
+    if not pages:
+        sys.exit(f"No fixture pages found in {FIXTURES_DIR}")
+
+    mismatches = check_identical(pages)
+    if mismatches:
+        print("Backends disagree:")
+        for line in mismatches:
+            print(f"  {line}")
+        sys.exit(1)
+    print(f"{len(BACKENDS)} backends produce identical Sell_*/Buy_* data on {len(pages)} pages (synthetic fixtures)")
+
+    for backend in BACKENDS:
+        print(f"{backend:>6}: {bench_backend(backend, pages, args.rounds):,.1f} pages/sec")
@@ -0,0 +1,47 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Non-plotting entry points: none of these may pull in matplotlib/seaborn/scipy
+IMPORTS = ["fuel.storage", "fuel.production", "fuel.prices", "fuel.cargo", "trade.ore", "trade.orders"]
+HEAVY = ["matplotlib", "seaborn", "scipy"]
+
+
+def time_command(argv, runs):
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(argv, cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def heavy_modules(module):
+    code = (f"import sys, {module}; "
+            f"print(','.join(m for m in {HEAVY!r} if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True, capture_output=True, text=True)
+    return out.stdout.strip()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold-start time of library imports and CLI commands")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    baseline = time_command([sys.executable, "-c", "pass"], args.runs)
+    print(f"{'interpreter':<28} {baseline * 1000:8.1f} ms")
+
+    for module in IMPORTS:
+        elapsed = time_command([sys.executable, "-c", f"import {module}"], args.runs)
+        heavy = heavy_modules(module)
+        note = f"  (imports {heavy})" if heavy else ""
+        print(f"{'import ' + module:<28} {elapsed * 1000:8.1f} ms{note}")
+
+    for command in (["stock"], ["production"]):
+        elapsed = time_command([sys.executable, "main.py"] + command, args.runs)
+        print(f"{'main.py ' + ' '.join(command):<28} {elapsed * 1000:8.1f} ms")
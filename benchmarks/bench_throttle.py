@@ -0,0 +1,137 @@
+import argparse
+import contextlib
+import http.server
+import io
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.http import PooledSession
+from common.metrics import MetricsRegistry
+from common.throttle import ERROR_LIMIT_REMAIN, ERROR_LIMIT_RESET, AdaptiveLimiter
+
+BODY = b"x" * 20_000
+
+
+class ThrottlingServer(http.server.ThreadingHTTPServer):
+    """Local endpoint that serves `capacity` requests at once and throttles the rest.
+
+    Each request takes `service_time`; requests beyond `capacity` are answered with
+    `status` (429 with Retry-After, or ESI's 420 with error-limit headers) and cost one
+    unit of an error budget of 100 that refills every `reset` seconds.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, capacity: int, service_time: float, status: int = 429, reset: float = 1.0):
+        super().__init__(("127.0.0.1", 0), ThrottlingHandler)
+        self.capacity = capacity
+        self.service_time = service_time
+        self.status = status
+        self.reset = reset
+        self.active = 0
+        self.errors = 0
+        self.window_start = time.monotonic()
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/item/"
+
+    def admit(self):
+        """(admitted, headers) for a new request."""
+        with self.lock:
+            now = time.monotonic()
+            if now - self.window_start >= self.reset:
+                self.window_start, self.errors = now, 0
+            if self.active < self.capacity:
+                self.active += 1
+                admitted = True
+            else:
+                self.errors += 1
+                admitted = False
+            remaining = self.reset - (now - self.window_start)
+            headers = {ERROR_LIMIT_REMAIN: str(max(0, 100 - self.errors)),
+                       ERROR_LIMIT_RESET: str(max(1, round(remaining)))}
+            if not admitted and self.status == 429:
+                headers = {"Retry-After": "0"}
+            return admitted, headers
+
+    def done(self):
+        with self.lock:
+            self.active -= 1
+
+
+class ThrottlingHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        admitted, headers = self.server.admit()
+        if admitted:
+            time.sleep(self.server.service_time)
+            self.server.done()
+            status, body = 200, BODY
+        else:
+            status, body = self.server.status, b"throttled"
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def run_workload(server, n_requests, workers, fixed=None):
+    registry = MetricsRegistry()
+    session = PooledSession(pool_size=workers, rate_per_host=None, timeout=5, retries=8, metrics=registry)
+    if fixed is not None:
+        host = server.url.split("/")[2]
+        session.controllers[host] = AdaptiveLimiter(initial=fixed, min_limit=fixed, max_limit=fixed)
+
+    def fetch(i):
+        return session.get(server.url + str(i)).status_code
+
+    start = time.perf_counter()
+    with session, ThreadPoolExecutor(max_workers=workers) as executor:
+        statuses = list(executor.map(fetch, range(n_requests)))
+        elapsed = time.perf_counter() - start
+        controller = session.controller(server.url)
+
+    counters = registry.to_dict()["counters"]
+    throttled = sum(s["value"] for s in counters.get("http_requests_total", []) if s["labels"]["status"] != "200")
+    return {"seconds": elapsed, "ok": statuses.count(200), "throttled": throttled,
+            "limit": controller.limit, "peak": controller.peak}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Adaptive vs fixed concurrency against a local throttling stub")
+    parser.add_argument("--capacity", type=int, default=6, help="requests the stub serves at once")
+    parser.add_argument("--service-ms", type=float, default=50)
+    parser.add_argument("--status", type=int, choices=[420, 429], default=429)
+    parser.add_argument("--requests", type=int, default=600)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--fixed", type=int, nargs="*", default=[1, 4, 16], help="fixed windows to compare")
+    args = parser.parse_args()
+
+    server = ThrottlingServer(args.capacity, args.service_ms / 1000, status=args.status)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    best = args.capacity / (args.service_ms / 1000)
+    print(f"Stub: {args.capacity} concurrent × {args.service_ms:g} ms → at most {best:.0f} req/s, "
+          f"excess answered {args.status}")
+
+    runs = [("adaptive", None)] + [(f"fixed {k}", k) for k in args.fixed]
+    for name, fixed in runs:
+        with contextlib.redirect_stdout(io.StringIO()):
+            r = run_workload(server, args.requests, args.workers, fixed)
+        rate = r["ok"] / r["seconds"]
+        print(f"{name:<10} {rate:8.1f} req/s ({rate / best:5.1%} of capacity) {r['ok']:>5} ok "
+              f"{r['throttled']:>5} throttled | window {r['limit']:.1f}, peak {r['peak']:.1f}")
+    server.shutdown()
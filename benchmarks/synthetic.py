@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+
+FUEL_MATERIALS = ["Oxygen", "Coolant", "Enriched Uranium", "Mechanical Parts", "Robotics",
+                  "Liquid Ozone", "Heavy Water", "Strontium Clathrates", "Helium Isotopes",
+                  "Hydrogen Isotopes", "Nitrogen Isotopes", "Oxygen Isotopes"]
+FUEL_BLOCKS = ["Helium Fuel Block", "Hydrogen Fuel Block", "Nitrogen Fuel Block", "Oxygen Fuel Block"]
+REGIONS = ["C-J6MT", "UALX-3", "jita", "amarr", "dodixie"]
+PRICE_COLUMNS = ["Sell_Min", "Sell_Median", "Sell_Average", "Sell_1st Percentile", "Sell_Standard Deviation",
+                 "Buy_Max", "Buy_Median", "Buy_Average", "Buy_99th Percentile", "Buy_Standard Deviation"]
+INVENTORY_COLUMNS = ["OperationID", "Date", "Item", "Operation", "Quantity", "Region", "Price", "Fees",
+                     "Volume", "Target", "Total", "Grant Total"]
+
+# Roughly today's data at scale 1: ~130 ledger rows, 16 items × ~15 snapshots per region;
+# orders are ten ESI pages
+BASE_LEDGER_ROWS = 130
+BASE_SNAPSHOTS = 15
+BASE_ORDERS = 10_000
+
+
+def item_names(n: int) -> list:
+    names = FUEL_MATERIALS + FUEL_BLOCKS
+    return names[:n] if n <= len(names) else names + [f"Item {i}" for i in range(len(names), n)]
+
+
+def inventory_ledger(n_rows: int, n_items: int = len(FUEL_MATERIALS), targets=("Anyed", "RYC"),
+                     days: int = 365, seed: int = 0) -> pd.DataFrame:
+    """Incoming and outgoing goods, shipping roughly 80% of what was received per item."""
+    rng = np.random.default_rng(seed)
+    items = np.asarray(item_names(n_items), dtype=object)
+    item = rng.integers(0, n_items, n_rows)
+    target = np.asarray(targets, dtype=object)[rng.integers(0, len(targets), n_rows)]
+    outgoing = rng.random(n_rows) < 0.45
+    # Every (target, item) starts with a receipt, so each item has a stock valuation
+    first = min(n_rows, n_items * len(targets))
+    item[:first] = np.arange(first) % n_items
+    target[:first] = np.asarray(targets, dtype=object)[np.arange(first) // n_items % len(targets)]
+    outgoing[:first] = False
+    quantity = rng.integers(10, 20_000, n_rows)
+    quantity = np.where(outgoing, (quantity * 0.8).astype(int) + 1, quantity)
+    price = np.round(rng.lognormal(7, 2, n_items)[item] * rng.uniform(0.9, 1.1, n_rows), 2)
+    fees = np.where(outgoing, 0.0, np.round(rng.choice([0.0, 2.4, 32.0, 80.0], n_rows), 2))
+    volume = rng.choice([0.01, 0.19, 0.4, 0.75, 3.0], n_items)[item] * quantity
+    dates = pd.Timestamp("2025-01-01") + pd.to_timedelta(np.sort(rng.integers(0, days, n_rows)), unit="D")
+
+    df = pd.DataFrame({
+        "OperationID": np.arange(1, n_rows + 1),
+        "Date": dates.strftime("%m/%d/%Y"),
+        "Item": items[item],
+        "Operation": np.where(outgoing, "Outgoing goods", "Incoming goods"),
+        "Quantity": quantity,
+        "Region": np.where(rng.random(n_rows) < 0.5, "C-J6MT", "Jita"),
+        "Price": price,
+        "Fees": fees,
+        "Volume": volume,
+        "Target": target,
+    })
+    df["Total"] = df["Price"] + df["Fees"]
+    df["Grant Total"] = df["Total"] * df["Quantity"]
+    return df[INVENTORY_COLUMNS]
+
+
+def price_history(n_snapshots: int, n_items: int = 16, regions=REGIONS, seed: int = 0) -> dict:
+    """{region: prices_<region>.csv frame}, one random-walk row per item per snapshot."""
+    rng = np.random.default_rng(seed)
+    items = item_names(n_items)
+    base = rng.lognormal(7, 2, n_items)
+    start = pd.Timestamp("2025-01-01 19:00:00")
+    frames = {}
+    for offset, region in enumerate(regions):
+        steps = rng.normal(0, 0.03, (n_snapshots, n_items))
+        sell = base * rng.uniform(0.95, 1.1) * np.exp(np.cumsum(steps, axis=0))
+        buy = sell * rng.uniform(0.85, 0.97, (n_snapshots, n_items))
+        times = start + pd.to_timedelta(np.arange(n_snapshots) * 24 + rng.uniform(0, 2, n_snapshots), unit="h")
+        times = times + pd.Timedelta(seconds=20 * offset)
+
+        df = pd.DataFrame({
+            "Sell_Min": sell.ravel().round(2),
+            "Sell_Median": (sell * 1.05).ravel().round(2),
+            "Sell_Average": (sell * 1.08).ravel().round(2),
+            "Sell_1st Percentile": (sell * 1.001).ravel().round(2),
+            "Sell_Standard Deviation": (sell * 0.05).ravel().round(2),
+            "Buy_Max": buy.ravel().round(2),
+            "Buy_Median": (buy * 0.95).ravel().round(2),
+            "Buy_Average": (buy * 0.9).ravel().round(2),
+            "Buy_99th Percentile": (buy * 0.999).ravel().round(2),
+            "Buy_Standard Deviation": (buy * 0.1).ravel().round(2),
+            "Item": np.tile(items, n_snapshots),
+            "TypeID": np.tile(np.arange(1000, 1000 + n_items), n_snapshots),
+            "Region": region,
+            "Timestamp": np.repeat(times.floor("s").strftime("%Y-%m-%d %H:%M:%S"), n_items),
+        })
+        frames[region] = df
+    return frames
+
+
+def latest_prices(frames: dict) -> pd.DataFrame:
+    """Latest-price table (prices/latest.csv layout) for generated histories."""
+    df = pd.concat(frames.values(), ignore_index=True)
+    return df.drop_duplicates(["Region", "Item"], keep="last").reset_index(drop=True)
+
+
+def items_table(n_items: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"Item": item_names(n_items), "ID": np.arange(1000, 1000 + n_items),
+                         "Volume": rng.choice([0.01, 0.19, 0.4, 0.75, 3.0], n_items)})
+
+
+def order_pages(n_orders: int, n_types: int = 20_000, page_size: int = 1000, seed: int = 0) -> list:
+    """ESI /markets/{region}/orders/ pages as lists of order dicts."""
+    rng = np.random.default_rng(seed)
+    type_ids = rng.integers(18, 18 + n_types, n_orders)
+    volume_total = rng.integers(1, 100_000, n_orders)
+    volume_remain = (volume_total * rng.random(n_orders)).astype(int)
+    prices = rng.lognormal(7, 2, n_orders).round(2)
+    is_buy = rng.random(n_orders) < 0.4
+    orders = [
+        {"order_id": 6_000_000_000 + i, "type_id": int(t), "volume_total": int(vt), "volume_remain": int(vr),
+         "price": float(p), "is_buy_order": bool(b), "location_id": 60003760, "duration": 90,
+         "issued": "2025-11-01T12:00:00Z", "min_volume": 1, "range": "region", "system_id": 30000142}
+        for i, (t, vt, vr, p, b) in enumerate(zip(type_ids, volume_total, volume_remain, prices, is_buy))
+    ]
+    return [orders[i:i + page_size] for i in range(0, n_orders, page_size)]
+
+
+def ore_prices(df_ores: pd.DataFrame, minerals, regions, seed: int = 0):
+    """({region: ore price frame}, {region: mineral price frame}) in the trade/prices layout."""
+    rng = np.random.default_rng(seed)
+    ore_names = df_ores["Ore Type"].tolist()
+    ore_base = rng.lognormal(5, 2, len(ore_names))
+    mineral_base = rng.lognormal(4, 2, len(minerals))
+    ore_frames, mineral_frames = {}, {}
+    for region in regions:
+        for names, base, frames in ((ore_names, ore_base, ore_frames), (list(minerals), mineral_base, mineral_frames)):
+            sell = base * rng.uniform(0.9, 1.2, len(names))
+            frames[region] = pd.DataFrame({
+                "Sell_Min": sell.round(2), "Buy_Max": (sell * 0.9).round(2), "Name": names,
+                "TypeID": np.arange(len(names)), "Region": region, "Timestamp": "2025-11-01 00:00:00",
+            })
+    return ore_frames, mineral_frames
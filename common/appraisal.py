@@ -0,0 +1,144 @@
+import threading
+import time
+
+import requests
+from bs4 import BeautifulSoup
+
+from common.http import DEFAULT_TIMEOUT
+
+try:
+    import lxml.html
+except ImportError:  # lxml is optional, BeautifulSoup stays the fallback
+    lxml = None
+
+# The region is only a client-side tab (#fragment): one page holds every region
+APPRAISAL_URL = "https://appraise.gnf.lt/item/{}"
+PAGE_CACHE_TTL = 300
+
+
+class PageCache:
+    """Short-lived in-memory cache of item pages keyed by page URL."""
+
+    def __init__(self, ttl: float = PAGE_CACHE_TTL):
+        self.ttl = ttl
+        self.pages = {}
+        self.lock = threading.Lock()
+
+    def get(self, page_url):
+        with self.lock:
+            entry = self.pages.get(page_url)
+            if entry is None:
+                return None
+            stored_at, html = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self.pages[page_url]
+                return None
+            return html
+
+    def put(self, page_url, html):
+        with self.lock:
+            self.pages[page_url] = (time.monotonic(), html)
+
+    def clear(self):
+        with self.lock:
+            self.pages.clear()
+
+
+page_cache = PageCache()
+
+
+def fetch_item_page(type_id, session=None, url=APPRAISAL_URL, cache=page_cache) -> str:
+    # Keyed by the full URL: the same type_id on another appraisal site is another page
+    page_url = url.format(type_id)
+    if cache is not None:
+        html = cache.get(page_url)
+        if html is not None:
+            return html
+
+    if session is not None:
+        r = session.get(page_url)
+    else:
+        r = requests.get(page_url, timeout=DEFAULT_TIMEOUT)
+    r.raise_for_status()
+
+    if cache is not None:
+        cache.put(page_url, r.text)
+    return r.text
+
+
+def _parse_price(text: str):
+    val = text.strip().replace(",", "").replace(" ISK", "")
+    try:
+        return float(val)
+    except ValueError:
+        return None
+
+
+def extract_table_data(table) -> dict:
+    result = {}
+    for row in table.find_all("tr"):
+        th = row.find("th")
+        td = row.find("td")
+        if th and td:
+            result[th.text.strip()] = _parse_price(td.text)
+    return result
+
+
+def _bs4_region_tables(html: str, regions) -> dict:
+    soup = BeautifulSoup(html, "html.parser")
+    result = {}
+    for region in regions:
+        tab = soup.find("div", id=region)
+        tables = tab.find_all("table") if tab else []
+        if len(tables) < 2:
+            result[region] = None
+            continue
+        result[region] = (extract_table_data(tables[0]), extract_table_data(tables[1]))
+    return result
+
+
+def _lxml_table_data(table) -> dict:
+    result = {}
+    for row in table.iter("tr"):
+        th = next(row.iter("th"), None)
+        td = next(row.iter("td"), None)
+        if th is not None and td is not None:
+            result[th.text_content().strip()] = _parse_price(td.text_content())
+    return result
+
+
+def _lxml_region_tables(html: str, regions) -> dict:
+    root = lxml.html.fromstring(html)
+    # Index the region tabs once instead of searching the tree per region
+    tabs = {}
+    for div in root.iter("div"):
+        div_id = div.get("id")
+        if div_id is not None:
+            tabs.setdefault(div_id, div)
+
+    result = {}
+    for region in regions:
+        tab = tabs.get(region)
+        tables = list(tab.iter("table")) if tab is not None else []
+        if len(tables) < 2:
+            result[region] = None
+            continue
+        result[region] = (_lxml_table_data(tables[0]), _lxml_table_data(tables[1]))
+    return result
+
+
+BACKENDS = {"bs4": _bs4_region_tables}
+if lxml is not None:
+    BACKENDS["lxml"] = _lxml_region_tables
+DEFAULT_BACKEND = "lxml" if "lxml" in BACKENDS else "bs4"
+
+
+def parse_region_tables(html: str, regions, backend: str = None) -> dict:
+    """Return {region: (sell_data, buy_data)} for every region tab found on the page.
+
+    Regions whose tab or tables are missing map to None.
+    """
+    backend = backend or DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown HTML backend '{backend}', available: {', '.join(BACKENDS)}")
+    return BACKENDS[backend](html, regions)
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+DEFAULT_TOP_K = 50
+
+
+def price_matrix(latest: pd.DataFrame, column: str, key: str = "Item", regions=None, items=None):
+    """Pivot a latest-price table into a (region × item) array, NaN where a region has no price."""
+    table = latest.pivot_table(index="Region", columns=key, values=column, aggfunc="last")
+    regions = list(regions) if regions is not None else list(table.index)
+    items = list(items) if items is not None else list(table.columns)
+    return table.reindex(index=regions, columns=items).to_numpy(dtype=float)
+
+
+def route_cost_matrix(regions: list, routes=None, default: float = None) -> np.ndarray:
+    """(from × to) shipping cost per m3.
+
+    `routes` maps (from, to) to a cost, or is a DataFrame with From/To/Cost_per_m3 columns.
+    Routes not listed cost `default`; with no default they are treated as unavailable (NaN).
+    Staying in the same region costs nothing.
+    """
+    n = len(regions)
+    costs = np.full((n, n), np.nan if default is None else float(default))
+    if isinstance(routes, pd.DataFrame):
+        routes = dict(zip(zip(routes["From"], routes["To"]), routes["Cost_per_m3"]))
+    index = {region: i for i, region in enumerate(regions)}
+    for (src, dst), cost in (routes or {}).items():
+        if src in index and dst in index:
+            costs[index[src], index[dst]] = cost
+    np.fill_diagonal(costs, 0.0)
+    return costs
+
+
+def profit_tensor(buy: np.ndarray, sell: np.ndarray, volumes: np.ndarray, route_costs: np.ndarray) -> np.ndarray:
+    """(from × to × item) profit per unit of buying in `from` and selling in `to`."""
+    shipping = route_costs[:, :, None] * volumes[None, None, :]
+    return sell[None, :, :] - buy[:, None, :] - shipping
+
+
+def scan_arbitrage(latest: pd.DataFrame, volumes: pd.Series, routes=None, default_cost: float = None,
+                   key: str = "Item", buy_column: str = "Buy_Max", sell_column: str = "Buy_Max",
+                   top_k: int = DEFAULT_TOP_K, min_profit: float = 0.0) -> pd.DataFrame:
+    """Rank buy-here/sell-there opportunities across every region pair in the latest prices.
+
+    `volumes` maps item to m3 per unit; items without a volume are skipped. Defaults compare
+    buy orders on both ends, like the existing Jita/C-J6MT comparisons.
+    """
+    latest = latest[latest[key].isin(volumes.index)]
+    regions = sorted(latest["Region"].unique())
+    items = sorted(latest[key].unique())
+    columns = [key, "From", "To", "Buy_Price", "Sell_Price", "Volume", "Shipping_Cost", "Profit", "Profit_%"]
+    if len(regions) < 2 or not items:
+        return pd.DataFrame(columns=columns)
+
+    buy = price_matrix(latest, buy_column, key, regions, items)
+    sell = price_matrix(latest, sell_column, key, regions, items)
+    vol = volumes.reindex(items).to_numpy(dtype=float)
+    costs = route_cost_matrix(regions, routes, default_cost)
+
+    profit = profit_tensor(buy, sell, vol, costs)
+    diagonal = np.eye(len(regions), dtype=bool)[:, :, None]
+    flat = np.where(np.isnan(profit) | diagonal | (profit <= min_profit), -np.inf, profit).ravel()
+
+    k = min(top_k, int(np.isfinite(flat).sum()))
+    if k == 0:
+        return pd.DataFrame(columns=columns)
+    top = np.argpartition(flat, -k)[-k:]
+    top = top[np.argsort(flat[top])[::-1]]
+    src, dst, item = np.unravel_index(top, profit.shape)
+
+    regions = np.asarray(regions, dtype=object)
+    result = pd.DataFrame({
+        key: np.asarray(items, dtype=object)[item],
+        "From": regions[src],
+        "To": regions[dst],
+        "Buy_Price": buy[src, item],
+        "Sell_Price": sell[dst, item],
+        "Volume": vol[item],
+        "Shipping_Cost": costs[src, dst] * vol[item],
+        "Profit": flat[top],
+    })
+    result["Profit_%"] = result["Profit"] / (result["Buy_Price"] + result["Shipping_Cost"]) * 100
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Scan latest prices for inter-region arbitrage")
+    parser.add_argument("latest_csv")
+    parser.add_argument("volumes_csv", help="CSV with the item key column and a Volume column")
+    parser.add_argument("--key", default="Item")
+    parser.add_argument("--cost-per-m3", type=float, default=1200)
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP_K)
+    args = parser.parse_args()
+
+    volumes_df = pd.read_csv(args.volumes_csv)
+    result = scan_arbitrage(pd.read_csv(args.latest_csv), volumes_df.set_index(args.key)["Volume"],
+                            default_cost=args.cost_per_m3, key=args.key, top_k=args.top)
+    print(result.to_string(index=False))
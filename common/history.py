@@ -0,0 +1,150 @@
+import glob
+import os
+import re
+import uuid
+
+import pandas as pd
+
+from common.loader import cast_table
+
+HISTORY_DIR = "history"
+SEEDED_MARKER = ".csv_migrated"
+_CSV_REGION = re.compile(r"prices_(.+)\.csv$")
+
+
+class PriceHistoryStore:
+    """Append-only price history, one Parquet chunk per snapshot under region=<r>/date=<YYYY-MM-DD>/.
+
+    With `csv_dir`, a region is seeded from csv_dir/prices_<region>.csv the first time it is
+    read, so history collected before the store existed is never missing from reads.
+    """
+
+    def __init__(self, root: str = HISTORY_DIR, csv_dir: str = None):
+        self.root = root
+        self.csv_dir = csv_dir
+
+    def partition_dir(self, region: str, day: str) -> str:
+        return os.path.join(self.root, f"region={region}", f"date={day}")
+
+    def regions(self) -> list:
+        regions = {os.path.basename(p)[len("region="):] for p in glob.glob(os.path.join(self.root, "region=*"))}
+        if self.csv_dir is not None:
+            regions.update(_CSV_REGION.search(os.path.basename(p)).group(1)
+                           for p in glob.glob(os.path.join(self.csv_dir, "prices_*.csv")))
+        return sorted(regions)
+
+    def days(self, region: str) -> list:
+        return sorted(os.path.basename(p)[len("date="):]
+                      for p in glob.glob(os.path.join(self.root, f"region={region}", "date=*")))
+
+    def append(self, region: str, df: pd.DataFrame) -> list:
+        timestamps = pd.to_datetime(df["Timestamp"], errors="coerce")
+        written = []
+        for day, chunk in df.groupby(timestamps.dt.strftime("%Y-%m-%d"), sort=True):
+            part_dir = self.partition_dir(region, day)
+            os.makedirs(part_dir, exist_ok=True)
+            stamp = timestamps[chunk.index].max().strftime("%H%M%S")
+            name = f"{stamp}-{uuid.uuid4().hex[:8]}.parquet"
+            # Write under a hidden name first so readers never see a half-written chunk
+            tmp_path = os.path.join(part_dir, f".{name}.tmp")
+            chunk.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, os.path.join(part_dir, name))
+            written.append(os.path.join(part_dir, name))
+        return written
+
+    def read(self, region: str, start=None, end=None, columns=None, compact: bool = True) -> pd.DataFrame:
+        """Snapshots of one region between start and end, with the dtypes of common.loader's price tables."""
+        self.seed(region)
+        return cast_table(self._read(region, start, end, columns), "prices", compact=compact)
+
+    def _read(self, region: str, start=None, end=None, columns=None) -> pd.DataFrame:
+        start = pd.Timestamp(start) if start is not None else None
+        end = pd.Timestamp(end) if end is not None else None
+
+        files = []
+        for day in self.days(region):
+            if start is not None and day < start.strftime("%Y-%m-%d"):
+                continue
+            if end is not None and day > end.strftime("%Y-%m-%d"):
+                continue
+            files.extend(sorted(glob.glob(os.path.join(self.partition_dir(region, day), "*.parquet"))))
+
+        if not files:
+            return pd.DataFrame(columns=columns)
+
+        if columns is not None and "Timestamp" not in columns:
+            read_columns = list(columns) + ["Timestamp"]
+        else:
+            read_columns = columns
+        df = pd.concat([pd.read_parquet(f, columns=read_columns) for f in files], ignore_index=True)
+
+        if start is not None or end is not None:
+            timestamps = pd.to_datetime(df["Timestamp"], errors="coerce")
+            mask = pd.Series(True, index=df.index)
+            if start is not None:
+                mask &= timestamps >= start
+            if end is not None:
+                mask &= timestamps <= end
+            df = df[mask].reset_index(drop=True)
+
+        return df[columns] if columns is not None else df
+
+    def migrate_csv(self, csv_path: str, region: str = None) -> int:
+        """Copy the snapshots of a prices_<region>.csv that the store does not hold yet.
+
+        Rows already stored (same Timestamp and Item) are skipped, so the migration can be
+        re-run after an interruption or after the collector has started writing the region.
+        """
+        if region is None:
+            match = _CSV_REGION.search(os.path.basename(csv_path))
+            if not match:
+                raise ValueError(f"Cannot infer region from file name: {csv_path}")
+            region = match.group(1)
+
+        df = pd.read_csv(csv_path)
+        timestamps = pd.to_datetime(df["Timestamp"], errors="coerce")
+        stored = pd.DataFrame()
+        if timestamps.notna().any():
+            stored = self._read(region, start=timestamps.min(), end=timestamps.max(), columns=["Timestamp", "Item"])
+        if not stored.empty:
+            stored_keys = pd.MultiIndex.from_arrays([pd.to_datetime(stored["Timestamp"], errors="coerce"),
+                                                     stored["Item"].astype(str)])
+            new_rows = ~pd.MultiIndex.from_arrays([timestamps, df["Item"].astype(str)]).isin(stored_keys)
+            df = df[new_rows]
+
+        # One chunk per original snapshot keeps the layout identical to live appends
+        for _, snapshot in df.groupby("Timestamp", sort=True):
+            self.append(region, snapshot)
+        print(f"[OK] Migrated {len(df)} new rows from {csv_path} → {self.root} ({region})")
+        return len(df)
+
+    def seed(self, region: str):
+        """Migrate csv_dir/prices_<region>.csv once; a marker records that it completed."""
+        if self.csv_dir is None:
+            return
+        csv_path = os.path.join(self.csv_dir, f"prices_{region}.csv")
+        marker = os.path.join(self.root, f"region={region}", SEEDED_MARKER)
+        if os.path.exists(marker) or not os.path.exists(csv_path):
+            return
+        self.migrate_csv(csv_path, region)
+        os.makedirs(os.path.dirname(marker), exist_ok=True)
+        open(marker, "w").close()
+
+    def migrate_csv_dir(self, prices_dir: str) -> int:
+        total = 0
+        for csv_path in sorted(glob.glob(os.path.join(prices_dir, "prices_*.csv"))):
+            total += self.migrate_csv(csv_path)
+        return total
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Copy prices_<region>.csv snapshots missing from the history store (safe to re-run)")
+    parser.add_argument("prices_dir", help="directory holding prices_<region>.csv files")
+    parser.add_argument("--store", help="history store root (default: history/ next to prices_dir, "
+                                        "where the collector writes it)")
+    args = parser.parse_args()
+
+    store = args.store or os.path.join(os.path.dirname(os.path.abspath(args.prices_dir)), HISTORY_DIR)
+    PriceHistoryStore(store).migrate_csv_dir(args.prices_dir)
@@ -0,0 +1,331 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from common.metrics import SIZE_BUCKETS, metrics as default_metrics
+from common.throttle import THROTTLE_STATUSES, AdaptiveLimiter, backoff_delay, retry_after
+
+DEFAULT_TIMEOUT = 15
+DEFAULT_POOL_SIZE = 10
+DEFAULT_RATE_PER_HOST = 4.0
+DEFAULT_RETRIES = 3
+CONNECT_TIMEOUT = 5
+HTTP_CACHE_DB = "http_cache.sqlite"
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity is not None else max(self.rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Take `tokens` if available and return 0, otherwise return the seconds until they are."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0.0
+            return (tokens - self.tokens) / self.rate
+
+    def acquire(self, tokens: float = 1.0):
+        while True:
+            wait = self.try_acquire(tokens)
+            if not wait:
+                return
+            time.sleep(wait)
+
+
+class PooledSession:
+    """Keep-alive `requests.Session` shared between worker threads, rate limited per host.
+
+    `rate_per_host` (requests/s, None for no ceiling) is a fixed upper bound; below it an
+    AdaptiveLimiter per host decides how many requests may be in flight, up to `pool_size`.
+    Throttled and failed requests are retried `retries` times with jittered backoff, and
+    when no timeout is passed the read timeout follows the host's observed latency.
+    Every request sent is recorded in `metrics` (latency, response size, status, errors, retries).
+    """
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, rate_per_host: float = DEFAULT_RATE_PER_HOST,
+                 burst: float = None, timeout: float = DEFAULT_TIMEOUT, retries: int = DEFAULT_RETRIES,
+                 initial_concurrency: int = 2, metrics=None):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.rate_per_host = rate_per_host
+        self.burst = burst
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retries = retries
+        self.initial_concurrency = initial_concurrency
+        self.buckets = {}
+        self.controllers = {}
+        self.lock = threading.Lock()
+        self.metrics = metrics if metrics is not None else default_metrics
+
+    def limiter(self, url: str) -> TokenBucket:
+        host = urlsplit(url).netloc
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.rate_per_host, self.burst) if self.rate_per_host else None
+            return self.buckets[host]
+
+    def controller(self, url: str) -> AdaptiveLimiter:
+        host = urlsplit(url).netloc
+        with self.lock:
+            controller = self.controllers.get(host)
+            if controller is None:
+                controller = AdaptiveLimiter(initial=self.initial_concurrency, max_limit=self.pool_size,
+                                             max_timeout=self.timeout)
+                self.controllers[host] = controller
+            return controller
+
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        host = urlsplit(url).netloc
+        bucket = self.limiter(url)
+        controller = self.controller(url)
+        fixed_timeout = kwargs.pop("timeout", None)
+
+        network_seconds = 0.0
+        for attempt in range(self.retries + 1):
+            controller.acquire()
+            r = None
+            start = time.perf_counter()
+            try:
+                if bucket is not None:
+                    bucket.acquire()
+                timeout = fixed_timeout or (CONNECT_TIMEOUT, controller.timeout())
+                start = time.perf_counter()
+                r = self.session.request(method, url, timeout=timeout, **kwargs)
+            except requests.RequestException as e:
+                self.metrics.inc("http_errors_total", help="Requests that failed without a response",
+                                 host=host, error=type(e).__name__)
+                if attempt == self.retries or not isinstance(e, (requests.ConnectionError, requests.Timeout)):
+                    raise
+                reason, wait = type(e).__name__, 0.0
+            finally:
+                elapsed = time.perf_counter() - start
+                if r is None:
+                    self._backed_off(host, controller.release(elapsed))
+                else:
+                    self._backed_off(host, controller.release(elapsed, r.status_code, r.headers))
+            network_seconds += elapsed
+
+            if r is not None:
+                self.metrics.observe("http_request_seconds", elapsed,
+                                     help="Network time per request, rate-limit waits excluded",
+                                     host=host, method=method)
+                self.metrics.observe("http_response_bytes", len(r.content), buckets=SIZE_BUCKETS,
+                                     help="Response body size", host=host)
+                self.metrics.inc("http_requests_total", help="Requests sent by status", host=host, method=method,
+                                 status=r.status_code)
+                if r.status_code not in THROTTLE_STATUSES or attempt == self.retries:
+                    # time spent in session.request over all attempts, without slot, token or backoff waits
+                    r.network_seconds = network_seconds
+                    return r
+                reason, wait = f"HTTP {r.status_code}", retry_after(r.headers)
+
+            self.metrics.inc("http_retries_total", help="Requests repeated after throttling or a transport error",
+                             host=host, reason=reason)
+            time.sleep(backoff_delay(attempt, minimum=wait))
+
+    def _backed_off(self, host: str, reason):
+        if reason is not None:
+            self.metrics.inc("http_backoffs_total", help="Times the concurrency window was cut",
+                             host=host, reason=reason)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self._send("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self._send("POST", url, **kwargs)
+
+    def summary(self) -> str:
+        with self.lock:
+            controllers = dict(self.controllers)
+        return "\n".join(f"{host}: {c.summary()}" for host, c in controllers.items())
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _expires_at(headers, now: float):
+    cache_control = headers.get("Cache-Control", "")
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        return None
+    match = _MAX_AGE.search(cache_control)
+    if match:
+        return now + int(match.group(1))
+    if "Expires" in headers:
+        try:
+            return parsedate_to_datetime(headers["Expires"]).timestamp()
+        except (TypeError, ValueError):
+            return None
+    return None
+
+
+class HttpCache:
+    """SQLite store of GET response bodies with their validators (ETag / Last-Modified / Expires)."""
+
+    def __init__(self, path: str = HTTP_CACHE_DB):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "url TEXT PRIMARY KEY, headers TEXT NOT NULL, body BLOB NOT NULL, "
+                "etag TEXT, last_modified TEXT, expires_at REAL)"
+            )
+            self.conn.commit()
+
+    def get(self, url: str):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT headers, body, etag, last_modified, expires_at FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        headers, body, etag, last_modified, expires_at = row
+        return {"headers": CaseInsensitiveDict(json.loads(headers)), "body": body, "etag": etag,
+                "last_modified": last_modified, "expires_at": expires_at}
+
+    def put(self, url: str, headers: CaseInsensitiveDict, body: bytes, expires_at):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (url, headers, body, etag, last_modified, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, json.dumps(dict(headers)), body, headers.get("ETag"), headers.get("Last-Modified"), expires_at)
+            )
+            self.conn.commit()
+
+    def refresh(self, url: str, headers: CaseInsensitiveDict, expires_at):
+        """Store the headers merged from a 304, including any new validators it carried."""
+        with self.lock:
+            self.conn.execute(
+                "UPDATE responses SET headers = ?, etag = ?, last_modified = ?, expires_at = ? WHERE url = ?",
+                (json.dumps(dict(headers)), headers.get("ETag"), headers.get("Last-Modified"), expires_at, url)
+            )
+            self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class CacheStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.fresh_hits = 0
+        self.revalidated = 0
+        self.downloads = 0
+        self.bytes_downloaded = 0
+        self.bytes_saved = 0
+        self.network_seconds = 0.0
+
+    def record(self, kind: str, size: int = 0, elapsed: float = 0.0):
+        with self.lock:
+            self.network_seconds += elapsed
+            if kind == "fresh":
+                self.fresh_hits += 1
+                self.bytes_saved += size
+            elif kind == "revalidated":
+                self.revalidated += 1
+                self.bytes_saved += size
+            else:
+                self.downloads += 1
+                self.bytes_downloaded += size
+
+    def summary(self) -> str:
+        requests_sent = self.revalidated + self.downloads
+        text = (f"HTTP cache: {self.fresh_hits} fresh hits (no request), {self.revalidated} not modified, "
+                f"{self.downloads} downloads | {self.bytes_downloaded / 1e6:.2f} MB downloaded, "
+                f"{self.bytes_saved / 1e6:.2f} MB saved | {self.network_seconds:.1f}s on the network")
+        if requests_sent and self.fresh_hits:
+            avg_latency = self.network_seconds / requests_sent
+            text += f", ~{self.fresh_hits * avg_latency:.1f}s skipped"
+        return text
+
+
+class CachingSession(PooledSession):
+    """PooledSession that serves fresh entries from an HttpCache and revalidates stale ones."""
+
+    def __init__(self, cache_path: str = HTTP_CACHE_DB, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = HttpCache(cache_path)
+        self.stats = CacheStats()
+
+    def get(self, url: str, params=None, **kwargs) -> requests.Response:
+        full_url = requests.Request("GET", url, params=params).prepare().url
+        entry = self.cache.get(full_url)
+        now = time.time()
+
+        if entry is not None and entry["expires_at"] is not None and entry["expires_at"] > now:
+            self.stats.record("fresh", len(entry["body"]))
+            self._count_cache("fresh", full_url)
+            return self._cached_response(full_url, entry["headers"], entry["body"])
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        if entry is not None:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        r = self._send("GET", full_url, headers=headers, **kwargs)
+        elapsed = r.network_seconds
+
+        if r.status_code == 304 and entry is not None:
+            merged = CaseInsensitiveDict(entry["headers"])
+            merged.update(r.headers)
+            self.cache.refresh(full_url, merged, _expires_at(merged, now))
+            self.stats.record("revalidated", len(entry["body"]), elapsed)
+            self._count_cache("revalidated", full_url)
+            return self._cached_response(full_url, merged, entry["body"])
+
+        self.stats.record("download", len(r.content), elapsed)
+        self._count_cache("download", full_url)
+        if r.status_code == 200 and "no-store" not in r.headers.get("Cache-Control", ""):
+            expires_at = _expires_at(r.headers, now)
+            if expires_at is not None or "ETag" in r.headers or "Last-Modified" in r.headers:
+                self.cache.put(full_url, CaseInsensitiveDict(r.headers), r.content, expires_at)
+        return r
+
+    def _count_cache(self, result: str, url: str):
+        self.metrics.inc("http_cache_total", help="GETs by cache outcome", host=urlsplit(url).netloc, result=result)
+
+    @staticmethod
+    def _cached_response(url: str, headers: CaseInsensitiveDict, body: bytes) -> requests.Response:
+        r = requests.Response()
+        r.status_code = 200
+        r.url = url
+        r.headers = CaseInsensitiveDict(headers)
+        r.encoding = get_encoding_from_headers(r.headers)
+        r._content = body
+        return r
+
+    def close(self):
+        super().close()
+        self.cache.close()
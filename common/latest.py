@@ -0,0 +1,68 @@
+import os
+
+import pandas as pd
+
+LATEST_CSV = "latest.csv"
+
+
+class LatestPrices:
+    """Latest price row per (Region, <key>), upserted on every collected snapshot."""
+
+    def __init__(self, path: str = LATEST_CSV, key: str = "Item"):
+        self.path = path
+        self.key = key
+
+    def load(self, regions=None) -> pd.DataFrame:
+        if not os.path.exists(self.path):
+            return pd.DataFrame(columns=["Region", self.key])
+        df = pd.read_csv(self.path)
+        if regions is not None:
+            df = df[df["Region"].isin(list(regions))].reset_index(drop=True)
+        return df
+
+    def update(self, snapshot: pd.DataFrame) -> pd.DataFrame:
+        existing = self.load()
+        if existing.empty:
+            combined = snapshot.copy()
+        else:
+            combined = pd.concat([existing, snapshot], ignore_index=True)
+        combined["_ts"] = pd.to_datetime(combined["Timestamp"], errors="coerce")
+        latest = (
+            combined
+            .sort_values("_ts", kind="stable")
+            .drop_duplicates(subset=["Region", self.key], keep="last")
+            .drop(columns="_ts")
+            .sort_values(["Region", self.key])
+            .reset_index(drop=True)
+        )
+        self._write(latest)
+        return latest
+
+    def rebuild(self, frames) -> pd.DataFrame:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        latest = None
+        for df in frames:
+            latest = self.update(df)
+        return latest
+
+    def _write(self, df: pd.DataFrame):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, self.path)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rebuild the latest-price table from collected price files")
+    parser.add_argument("csv_files", nargs="+", help="price history or snapshot CSV files")
+    parser.add_argument("--out", default=LATEST_CSV)
+    parser.add_argument("--key", default="Item", help="item name column (Item for fuel, Name for ore/minerals)")
+    args = parser.parse_args()
+
+    table = LatestPrices(args.out, key=args.key).rebuild(pd.read_csv(path) for path in args.csv_files)
+    print(f"[OK] {len(table)} latest rows → {args.out}")
@@ -0,0 +1,142 @@
+import os
+import threading
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    ENGINE = "pyarrow"
+except ImportError:  # pyarrow is optional, the C parser stays the fallback
+    ENGINE = "c"
+
+PRICE_STATS = ["Sell_Min", "Sell_Median", "Sell_Average", "Sell_1st Percentile", "Sell_Standard Deviation",
+               "Buy_Max", "Buy_Median", "Buy_Average", "Buy_99th Percentile", "Buy_Standard Deviation"]
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+# The resolution pd.to_datetime gives in this pandas version: pyarrow infers seconds, and
+# frames from both paths have to merge
+DATETIME_DTYPE = pd.Series(pd.to_datetime(["2000-01-01"])).dtype
+
+# Per file kind: categorical name columns, float32 columns (quotes with two decimals stay exact
+# to the cent below ~160k ISK; loaded as float64 when compact=False), integer columns and
+# date columns with their format. Columns a file does not have are ignored.
+SCHEMAS = {
+    "prices": {
+        "category": ["Item", "Name", "Region"],
+        "float32": PRICE_STATS,
+        "int": {"TypeID": "int32"},
+        "dates": {"Timestamp": TIMESTAMP_FORMAT},
+    },
+    "inventory": {
+        "category": ["Item", "Operation", "Region", "Target"],
+        "float32": [],
+        "int": {"OperationID": "int64", "Quantity": "int64"},
+        "dates": {"Date": "%m/%d/%Y"},
+    },
+    # A few dozen rows: names stay strings so the list merges and indexes like any frame
+    "items": {
+        "category": [],
+        "float32": [],
+        "int": {"ID": "int32"},
+        "dates": {},
+    },
+}
+
+
+class TableCache:
+    """In-process cache of loaded tables keyed by path and options, invalidated by mtime and size."""
+
+    def __init__(self):
+        self.tables = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, stamp):
+        with self.lock:
+            entry = self.tables.get(key)
+            if entry is None or entry[0] != stamp:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, stamp, df):
+        with self.lock:
+            self.tables[key] = (stamp, df)
+
+    def clear(self):
+        with self.lock:
+            self.tables.clear()
+            self.hits = self.misses = 0
+
+
+table_cache = TableCache()
+
+
+def _dtypes(schema: dict, columns, compact: bool) -> dict:
+    dtypes = {}
+    for column in columns:
+        if column in schema["category"]:
+            dtypes[column] = "category"
+        elif column in schema["float32"]:
+            dtypes[column] = "float32" if compact else "float64"
+        elif column in schema["int"]:
+            dtypes[column] = schema["int"][column]
+    return dtypes
+
+
+def cast_table(df: pd.DataFrame, kind: str, compact: bool = True) -> pd.DataFrame:
+    """Apply the dtypes of SCHEMAS[kind] to a frame read from elsewhere (e.g. Parquet)."""
+    schema = SCHEMAS[kind]
+    for column, fmt in schema["dates"].items():
+        if column not in df.columns:
+            continue
+        if pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = df[column].astype(DATETIME_DTYPE)
+        else:
+            df[column] = pd.to_datetime(df[column], format=fmt, errors="coerce")
+    # Casting after the read keeps integer columns with gaps as floats instead of failing
+    for column, dtype in _dtypes(schema, df.columns, compact).items():
+        if dtype.startswith("int") and df[column].isna().any():
+            continue
+        df[column] = df[column].astype(dtype)
+    return df
+
+
+def _read(path: str, kind: str, columns, compact: bool) -> pd.DataFrame:
+    usecols = None
+    if columns is not None:
+        usecols = [c for c in pd.read_csv(path, nrows=0).columns if c in columns]
+    return cast_table(pd.read_csv(path, engine=ENGINE, usecols=usecols), kind, compact)
+
+
+def load_table(path: str, kind: str, columns=None, compact: bool = True, cache: TableCache = table_cache) -> pd.DataFrame:
+    """Read a price, inventory or items CSV with the dtypes of SCHEMAS[kind].
+
+    Repeated loads of an unchanged file come from `cache`; every call returns its own copy.
+    """
+    if kind not in SCHEMAS:
+        raise ValueError(f"Unknown table kind '{kind}', available: {', '.join(SCHEMAS)}")
+    if cache is None:
+        return _read(path, kind, columns, compact)
+
+    st = os.stat(path)
+    key = (os.path.abspath(path), kind, tuple(columns) if columns is not None else None, compact)
+    stamp = (st.st_mtime_ns, st.st_size)
+    df = cache.get(key, stamp)
+    if df is None:
+        df = _read(path, kind, columns, compact)
+        cache.put(key, stamp, df)
+    return df.copy()
+
+
+def load_prices(path: str, **kwargs) -> pd.DataFrame:
+    return load_table(path, "prices", **kwargs)
+
+
+def load_inventory(path: str, **kwargs) -> pd.DataFrame:
+    return load_table(path, "inventory", **kwargs)
+
+
+def load_items(path: str, **kwargs) -> pd.DataFrame:
+    return load_table(path, "items", **kwargs)
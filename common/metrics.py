@@ -0,0 +1,160 @@
+import bisect
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+METRICS_DIR = "metrics"
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (1e3, 1e4, 5e4, 1e5, 5e5, 1e6, 1e7)
+
+
+class Histogram:
+    """Fixed-bucket histogram; `counts[i]` holds observations <= buckets[i], the last slot +Inf."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Estimate by linear interpolation inside the bucket holding the q-th observation."""
+        if not self.count:
+            return math.nan
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.buckets[i - 1] if i > 0 else min(self.min, self.buckets[0])
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                lower, upper = max(lower, self.min), min(upper, self.max)
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.max
+
+    def summary(self) -> dict:
+        if not self.count:
+            return {"count": 0, "sum": 0.0}
+        return {"count": self.count, "sum": self.sum, "mean": self.sum / self.count, "min": self.min,
+                "p50": self.quantile(0.5), "p95": self.quantile(0.95), "max": self.max}
+
+
+class MetricsRegistry:
+    """Thread-safe labelled counters and histograms for one collection run.
+
+    Exports a JSON summary and a Prometheus text-format file.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.counters = {}
+            self.histograms = {}
+            self.help = {}
+            self.started = time.time()
+
+    @staticmethod
+    def _key(labels: dict) -> tuple:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name: str, amount: float = 1, help: str = None, **labels):
+        with self.lock:
+            if help:
+                self.help.setdefault(name, help)
+            series = self.counters.setdefault(name, {})
+            key = self._key(labels)
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, buckets=LATENCY_BUCKETS, help: str = None, **labels):
+        with self.lock:
+            if help:
+                self.help.setdefault(name, help)
+            series = self.histograms.setdefault(name, {})
+            key = self._key(labels)
+            if key not in series:
+                series[key] = Histogram(buckets)
+            series[key].observe(value)
+
+    @contextmanager
+    def timer(self, name: str, help: str = None, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, help=help, **labels)
+
+    # --- Export ---
+
+    def to_dict(self) -> dict:
+        with self.lock:
+            return {
+                "started": datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+                "duration_seconds": time.time() - self.started,
+                "counters": {name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                             for name, series in sorted(self.counters.items())},
+                "histograms": {name: [{"labels": dict(key), **hist.summary()} for key, hist in series.items()]
+                               for name, series in sorted(self.histograms.items())},
+            }
+
+    def to_prometheus(self) -> str:
+        def fmt(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+        lines = []
+        with self.lock:
+            for name, series in sorted(self.counters.items()):
+                if name in self.help:
+                    lines.append(f"# HELP {name} {self.help[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{fmt(key)} {value}")
+            for name, series in sorted(self.histograms.items()):
+                if name in self.help:
+                    lines.append(f"# HELP {name} {self.help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, hist in series.items():
+                    cumulative = 0
+                    for bound, n in zip(hist.buckets + (math.inf,), hist.counts):
+                        cumulative += n
+                        le = "+Inf" if bound == math.inf else repr(float(bound))
+                        lines.append(f"{name}_bucket{fmt(key, [('le', le)])} {cumulative}")
+                    lines.append(f"{name}_sum{fmt(key)} {hist.sum}")
+                    lines.append(f"{name}_count{fmt(key)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, run_name: str, directory: str = METRICS_DIR) -> tuple:
+        """Write <run_name>.json and <run_name>.prom, replacing the previous run's files."""
+        os.makedirs(directory, exist_ok=True)
+        json_path = os.path.join(directory, f"{run_name}.json")
+        prom_path = os.path.join(directory, f"{run_name}.prom")
+        for path, text in ((json_path, json.dumps(self.to_dict(), indent=2)), (prom_path, self.to_prometheus())):
+            with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(f"{path}.tmp", path)
+        return json_path, prom_path
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = MetricsRegistry()
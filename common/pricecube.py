@@ -0,0 +1,204 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from common.history import HISTORY_DIR, PriceHistoryStore
+from common.loader import PRICE_STATS
+
+CUBE_DIR = "pricecube"
+INDEX_FILE = "index.json"
+SLOT_FREQ = "1h"
+INDEX_VERSION = 2
+VALUE_DTYPE = np.float64
+
+
+class PriceCubeStore:
+    """Price history as one float64 memmap laid out (region, item, time slot, field).
+
+    `index.json` holds the region, item and field names, the slot start times (epoch
+    seconds, sorted) and the name of the current values file. One (region, item) history
+    is a contiguous block, so series() returns a zero-copy view into the page cache and
+    opening the store costs the same whatever the history size. Snapshots are floored to
+    `freq` slots, the latest one in a slot wins, and cells never written are NaN.
+
+    Capacity grows by doubling. Growth and out-of-order slots are written to a new values
+    file, which the index switches to atomically; appends in place only touch free cells.
+    """
+
+    def __init__(self, root: str = CUBE_DIR, fields=PRICE_STATS, freq: str = SLOT_FREQ):
+        self.root = root
+        self.index = self._load_index() or {
+            "version": INDEX_VERSION, "freq": freq, "fields": list(fields), "regions": [], "items": [],
+            "slots": [], "capacity": [0, 0, 0], "file": None,
+        }
+        self._map = None
+        self._map_file = None
+
+    # --- Index ---
+
+    @property
+    def regions(self) -> list:
+        return self.index["regions"]
+
+    @property
+    def items(self) -> list:
+        return self.index["items"]
+
+    @property
+    def fields(self) -> list:
+        return self.index["fields"]
+
+    @property
+    def times(self) -> pd.DatetimeIndex:
+        return pd.to_datetime(self.index["slots"], unit="s")
+
+    def _load_index(self):
+        path = os.path.join(self.root, INDEX_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            index = json.load(f)
+        return index if index.get("version") == INDEX_VERSION else None
+
+    def _save_index(self):
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, INDEX_FILE)
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(self.index, f)
+        os.replace(f"{path}.tmp", path)
+
+    # --- Values file ---
+
+    def _shape(self, capacity=None) -> tuple:
+        return tuple(capacity or self.index["capacity"]) + (len(self.fields),)
+
+    def values(self, mode: str = "r") -> np.ndarray:
+        """(region × item × slot × field) view of the used part of the file."""
+        if self.index["file"] is None:
+            return np.full((0, 0, 0, len(self.fields)), np.nan, dtype=VALUE_DTYPE)
+        if self._map is None or self._map_file != (self.index["file"], mode):
+            path = os.path.join(self.root, self.index["file"])
+            self._map = np.memmap(path, dtype=VALUE_DTYPE, mode=mode, shape=self._shape())
+            self._map_file = (self.index["file"], mode)
+        return self._map[:len(self.regions), :len(self.items), :len(self.index["slots"])]
+
+    def _relayout(self, n_regions: int, n_items: int, slots: list, slot_map: np.ndarray):
+        """Write a new values file for `slots`, old slot k moved to slot_map[k]."""
+        capacity = [max(c, 1) for c in self.index["capacity"]]
+        for axis, needed in enumerate((n_regions, n_items, len(slots))):
+            while capacity[axis] < needed:
+                capacity[axis] *= 2
+
+        os.makedirs(self.root, exist_ok=True)
+        name = f"values-{capacity[0]}x{capacity[1]}x{capacity[2]}-{len(slots)}.f64"
+        new = np.memmap(os.path.join(self.root, name), dtype=VALUE_DTYPE, mode="w+", shape=self._shape(capacity))
+        new[:] = np.nan
+        old = self.values()
+        if old.size:
+            new[:old.shape[0], :old.shape[1], slot_map] = old
+        new.flush()
+        del new
+
+        previous = self.index["file"]
+        self._map = None
+        self.index.update(capacity=capacity, file=name, slots=slots)
+        self._save_index()
+        if previous and previous != name:
+            os.remove(os.path.join(self.root, previous))
+
+    def _positions(self, key: str, names) -> np.ndarray:
+        known = {name: i for i, name in enumerate(self.index[key])}
+        for name in names:
+            if name not in known:
+                known[name] = len(self.index[key])
+                self.index[key].append(name)
+        return np.asarray([known[name] for name in names], dtype=np.intp)
+
+    # --- Writing ---
+
+    def append(self, region: str, df: pd.DataFrame) -> int:
+        """Store snapshot rows (Item, Timestamp and price fields) of one region; returns rows written."""
+        timestamps = pd.to_datetime(df["Timestamp"], errors="coerce")
+        df = df[timestamps.notna()]
+        if df.empty:
+            return 0
+        seconds = (timestamps[df.index].dt.floor(self.index["freq"]) - pd.Timestamp(0)) // pd.Timedelta(seconds=1)
+        order = np.argsort(seconds.to_numpy(), kind="stable")       # latest row of a slot is written last
+        df, seconds = df.iloc[order], seconds.to_numpy()[order]
+
+        r = self._positions("regions", [region])[0]
+        i = self._positions("items", [str(item) for item in df["Item"]])
+        slots = self.index["slots"]
+        new_slots = sorted(set(seconds.tolist()) - set(slots))
+        capacity = self.index["capacity"]
+        if (new_slots and slots and new_slots[0] < slots[-1]) or self.index["file"] is None \
+                or len(self.regions) > capacity[0] or len(self.items) > capacity[1] \
+                or len(slots) + len(new_slots) > capacity[2]:
+            merged = sorted(set(slots) | set(new_slots))
+            self._relayout(len(self.regions), len(self.items), merged, np.searchsorted(merged, slots))
+        else:
+            slots.extend(new_slots)
+        t = np.searchsorted(self.index["slots"], seconds)
+
+        values = self.values(mode="r+")
+        values[r, i, t] = df.reindex(columns=self.fields).to_numpy(dtype=VALUE_DTYPE)
+        self._map.flush()
+        self._save_index()
+        return len(df)
+
+    def build_from_history(self, history: PriceHistoryStore, regions=None) -> int:
+        total = 0
+        for region in regions or history.regions():
+            # Full precision: float32 quotes would read back as e.g. 896.700012
+            written = self.append(region, history.read(region, compact=False))
+            print(f"[OK] {written} rows from {history.root} → {self.root} ({region})")
+            total += written
+        return total
+
+    # --- Reading ---
+
+    def _slot_range(self, start=None, end=None) -> slice:
+        slots = self.index["slots"]
+        lo = np.searchsorted(slots, pd.Timestamp(start).floor(self.index["freq"]).timestamp()) if start is not None else 0
+        hi = np.searchsorted(slots, pd.Timestamp(end).timestamp(), side="right") if end is not None else len(slots)
+        return slice(int(lo), int(hi))
+
+    def series(self, region: str, item: str, start=None, end=None):
+        """(slot times, slot × field view) for one region and item; no data is copied."""
+        if region not in self.regions or item not in self.items:
+            raise KeyError(f"No history for {item} in {region}")
+        span = self._slot_range(start, end)
+        view = self.values()[self.regions.index(region), self.items.index(item), span]
+        return self.times[span], view
+
+    def history(self, region: str, item: str, start=None, end=None, fields=None) -> pd.DataFrame:
+        """One item's history in one region as a frame, slots without a snapshot dropped."""
+        times, view = self.series(region, item, start, end)
+        df = pd.DataFrame(np.asarray(view), columns=self.fields).assign(Timestamp=times)
+        df = df[~np.isnan(view).all(axis=1)].reset_index(drop=True)
+        return df[["Timestamp"] + list(fields or self.fields)]
+
+    def slice(self, regions=None, items=None, start=None, end=None, field: str = None) -> np.ndarray:
+        """(region × item × slot [× field]) block; a view unless regions/items pick non-adjacent rows."""
+        values = self.values()[:, :, self._slot_range(start, end)]
+        if field is not None:
+            values = values[..., self.fields.index(field)]
+        if regions is not None:
+            values = values[[self.regions.index(r) for r in regions]]
+        if items is not None:
+            values = values[:, [self.items.index(i) for i in items]]
+        return values
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the memory-mapped price cube from the price history store")
+    parser.add_argument("history_dir", nargs="?", default=HISTORY_DIR, help="history store root")
+    parser.add_argument("--prices-dir", help="prices_<region>.csv files to seed regions missing from the store")
+    parser.add_argument("--store", default=CUBE_DIR, help="price cube directory")
+    args = parser.parse_args()
+
+    PriceCubeStore(args.store).build_from_history(PriceHistoryStore(args.history_dir, csv_dir=args.prices_dir))
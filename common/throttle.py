@@ -0,0 +1,143 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# 420 is ESI's "error limited", the rest are the usual overload answers
+THROTTLE_STATUSES = frozenset({420, 429, 500, 502, 503, 504})
+ERROR_LIMIT_REMAIN = "X-ESI-Error-Limit-Remain"
+ERROR_LIMIT_RESET = "X-ESI-Error-Limit-Reset"
+ERROR_LIMIT_FLOOR = 20          # ESI allows 100 errors per window; back off well before it
+DEFAULT_MAX_CONCURRENCY = 16
+MIN_TIMEOUT = 3.0
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 30.0
+
+
+def retry_after(headers) -> float:
+    """Seconds the server asked us to wait (Retry-After or the ESI error-limit reset), 0 if none."""
+    if headers is None:
+        return 0.0
+    value = headers.get("Retry-After")
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    if ERROR_LIMIT_RESET in headers and _error_limit_remain(headers) <= ERROR_LIMIT_FLOOR:
+        try:
+            return max(0.0, float(headers[ERROR_LIMIT_RESET]))
+        except ValueError:
+            pass
+    return 0.0
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_CAP, minimum: float = 0.0) -> float:
+    """Full-jitter exponential backoff: uniform in [0, base · 2^attempt], capped, never below `minimum`."""
+    return max(minimum, random.uniform(0, min(cap, base * 2 ** attempt)))
+
+
+def _error_limit_remain(headers) -> int:
+    try:
+        return int(headers.get(ERROR_LIMIT_REMAIN))
+    except (TypeError, ValueError):
+        return ERROR_LIMIT_FLOOR + 1
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency window for one host.
+
+    Until the first back-off each healthy response grows the window by one (slow start,
+    doubling per round trip); after it by 1/limit, about +1 per round trip. A throttling
+    answer (420/429/5xx), a transport error, a low ESI error budget or short-term latency
+    inflating past `latency_tolerance` × the long-term average cuts it by `decrease`, at
+    most once per round trip. Retry-After and the ESI error-limit reset
+    also pause new requests to the host until they expire. The latency estimate doubles as
+    an adaptive read timeout.
+    """
+
+    def __init__(self, initial: float = 2, min_limit: float = 1, max_limit: float = DEFAULT_MAX_CONCURRENCY,
+                 decrease: float = 0.5, latency_tolerance: float = 2.0, max_timeout: float = 15):
+        self.limit = float(min(max(initial, min_limit), max_limit))
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit)
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.max_timeout = max_timeout
+        self.inflight = 0
+        self.paused_until = 0.0
+        self.recovering_until = 0.0
+        self.srtt = None            # smoothed latency (TCP-style, alpha 1/8)
+        self.rttvar = None
+        self.long_rtt = None        # slow average the short-term latency is compared with
+        self.peak = self.limit
+        self.slow_start = True
+        self.cond = threading.Condition()
+
+    def acquire(self):
+        with self.cond:
+            while True:
+                wait = self.paused_until - time.monotonic()
+                if wait <= 0 and self.inflight < int(self.limit):
+                    self.inflight += 1
+                    return
+                self.cond.wait(wait if wait > 0 else None)
+
+    def release(self, latency: float, status: int = None, headers=None) -> str:
+        """Record a finished request; returns the back-off reason, or None if the window did not shrink."""
+        with self.cond:
+            self.inflight -= 1
+            now = time.monotonic()
+            reason = None
+            if status is None:
+                reason = "error"
+            elif status in THROTTLE_STATUSES:
+                reason = f"HTTP {status}"
+            elif _error_limit_remain(headers or {}) <= ERROR_LIMIT_FLOOR:
+                reason = "error limit"
+            else:
+                self._observe(latency)
+                if self.srtt > self.latency_tolerance * self.long_rtt:
+                    reason = "latency"
+
+            pause = retry_after(headers)
+            if pause:
+                self.paused_until = max(self.paused_until, now + pause)
+
+            if reason is not None and now >= self.recovering_until:
+                self.limit = max(self.min_limit, self.limit * self.decrease)
+                self.slow_start = False
+                self.recovering_until = now + (self.srtt or latency)
+                if reason == "latency":
+                    # Restart the comparison from the new operating point
+                    self.long_rtt = self.srtt
+            elif reason is None:
+                self.limit = min(self.max_limit, self.limit + (1 if self.slow_start else 1 / self.limit))
+                self.peak = max(self.peak, self.limit)
+            else:
+                reason = None
+            self.cond.notify_all()
+            return reason
+
+    def _observe(self, latency: float):
+        if self.srtt is None:
+            self.srtt, self.rttvar, self.long_rtt = latency, latency / 2, latency
+            return
+        self.rttvar += (abs(self.srtt - latency) - self.rttvar) / 4
+        self.srtt += (latency - self.srtt) / 8
+        self.long_rtt += (latency - self.long_rtt) / 64
+
+    def timeout(self) -> float:
+        """Read timeout: smoothed latency plus four deviations, within [MIN_TIMEOUT, max_timeout]."""
+        with self.cond:
+            if self.srtt is None:
+                return self.max_timeout
+            return min(self.max_timeout, max(MIN_TIMEOUT, self.srtt + 4 * self.rttvar))
+
+    def summary(self) -> str:
+        with self.cond:
+            latency = f", ~{self.srtt * 1000:.0f} ms/request" if self.srtt is not None else ""
+            return f"concurrency {self.limit:.1f} (peak {self.peak:.1f}, max {self.max_limit:g}){latency}"
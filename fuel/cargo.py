@@ -1,23 +1,32 @@
 import pandas as pd
 import os
+from common.history import PriceHistoryStore
+from common.latest import LatestPrices
+from common.loader import load_items
 
 ITEMS_CSV = "items.csv"
-PRICES_JITA = r"prices/prices_jita.csv"
-PRICES_CJ6MT = r"prices/prices_C-J6MT.csv"
+PRICES_DIR = "prices"
+HISTORY_DIR = "history"
+PRICES_LATEST = r"prices/latest.csv"
 
-def compare_buy_prices_with_shipping(shipping_cost_per_m3=1200):
-    # --- Load data ---
-    items_df = pd.read_csv(ITEMS_CSV)
-    jita_df = pd.read_csv(PRICES_JITA)
-    cj6_df = pd.read_csv(PRICES_CJ6MT)
 
-    # --- Keep only latest price per item ---
-    if "Timestamp" in jita_df.columns:
-        jita_df["Timestamp"] = pd.to_datetime(jita_df["Timestamp"], errors="coerce")
-        jita_df = jita_df.sort_values("Timestamp").groupby("Item").tail(1)
-    if "Timestamp" in cj6_df.columns:
-        cj6_df["Timestamp"] = pd.to_datetime(cj6_df["Timestamp"], errors="coerce")
-        cj6_df = cj6_df.sort_values("Timestamp").groupby("Item").tail(1)
+def latest_region_prices(region):
+    # Maintained by the collector; scanning the full history is only a fallback
+    latest_df = LatestPrices(PRICES_LATEST).load([region])
+    if not latest_df.empty:
+        return latest_df
+
+    df = PriceHistoryStore(HISTORY_DIR, csv_dir=PRICES_DIR).read(region, compact=False)
+    if "Timestamp" in df.columns:
+        df = df.sort_values("Timestamp").groupby("Item").tail(1)
+    return df
+
+
+def compare_buy_prices_with_shipping(shipping_cost_per_m3=1200):
+    # --- Load data (latest price per item) ---
+    items_df = load_items(ITEMS_CSV)
+    jita_df = latest_region_prices("jita")
+    cj6_df = latest_region_prices("C-J6MT")
 
     jita_df = jita_df[["Item", "Buy_Max"]].rename(columns={"Buy_Max": "Buy_Jita"})
     cj6_df = cj6_df[["Item", "Buy_Max"]].rename(columns={"Buy_Max": "Buy_CJ6MT"})
@@ -63,7 +72,3 @@ def compare_buy_prices_with_shipping(shipping_cost_per_m3=1200):
     print(result.to_string(index=False))
 
     return result
-
-
-if __name__ == "__main__":
-    compare_buy_prices_with_shipping(shipping_cost_per_m3=1200)
@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+RENDER_VERSION = 1
+MANIFEST_FILE = ".render_manifest.json"
+N_COLS = 4
+
+
+def figure_hash(job: dict) -> str:
+    payload = pickle.dumps((RENDER_VERSION, job["kind"], job["data"]), protocol=4)
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _setup_style():
+    import matplotlib
+    matplotlib.use("Agg")
+    import seaborn as sns
+    sns.set(style="whitegrid", context="talk")
+
+
+def _grid(plt, n_items):
+    n_rows = max(int(np.ceil(n_items / N_COLS)), 1)
+    fig, axs = plt.subplots(n_rows, N_COLS, figsize=(18, n_rows * 4))
+    return fig, axs.flatten()
+
+
+def _finish_grid(plt, axs, n_items, path):
+    for j in range(n_items, len(axs)):
+        axs[j].axis("off")
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+def _render_line_grid(data, path):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    fig, axs = _grid(plt, len(data["series"]))
+    for i, (item, by_region) in enumerate(data["series"].items()):
+        for region, color in data["regions"]:
+            values = by_region.get(region)
+            if values is None or len(values) == 0:
+                continue
+            sns.lineplot(ax=axs[i], x=range(len(values)), y=values, color=color, label=region)
+        axs[i].set_title(item)
+        axs[i].set_ylabel(data["ylabel"])
+        axs[i].set_xlabel("Time index")
+        axs[i].legend()
+    _finish_grid(plt, axs, len(data["series"]), path)
+
+
+def _render_distribution_grid(data, path):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    import pandas as pd
+
+    fig, axs = _grid(plt, len(data["series"]))
+    for i, (item, by_region) in enumerate(data["series"].items()):
+        for region, color in data["regions"]:
+            values = by_region.get(region)
+            if values is None or len(values) == 0:
+                continue
+            values = pd.Series(values)
+            if values.nunique() > 1:
+                sns.kdeplot(values, ax=axs[i], color=color, fill=True, alpha=0.3, label=region, warn_singular=False)
+            else:
+                axs[i].axvline(values.mean(), color=color, linestyle="--", label=f"{region}: {values.mean():.0f}")
+        axs[i].set_title(item)
+        axs[i].set_xlabel(data["xlabel"])
+        axs[i].set_ylabel("Density")
+        axs[i].legend()
+    _finish_grid(plt, axs, len(data["series"]), path)
+
+
+def _render_qq_grid(data, path):
+    import matplotlib.pyplot as plt
+    import scipy.stats as stats
+
+    fig, axs = _grid(plt, len(data["series"]))
+    for i, (item, values) in enumerate(data["series"].items()):
+        if values is None:
+            axs[i].text(0.5, 0.5, "Not enough data", ha="center", va="center")
+            continue
+        stats.probplot(values, dist="norm", plot=axs[i])
+        axs[i].set_title(item)
+    _finish_grid(plt, axs, len(data["series"]), path)
+
+
+def _render_heatmap(data, path):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.figure(figsize=(12, 10))
+    sns.heatmap(data["corr"], cmap="coolwarm", annot=False, square=True)
+    plt.title(data["title"])
+    plt.xticks(rotation=45, ha="right")
+    plt.yticks(rotation=0)
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+RENDERERS = {
+    "line_grid": _render_line_grid,
+    "distribution_grid": _render_distribution_grid,
+    "qq_grid": _render_qq_grid,
+    "heatmap": _render_heatmap,
+}
+
+
+def _render_job(job: dict, path: str) -> str:
+    _setup_style()
+    RENDERERS[job["kind"]](job["data"], path)
+    return path
+
+
+def _load_manifest(save_dir: str) -> dict:
+    path = os.path.join(save_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_manifest(save_dir: str, manifest: dict):
+    path = os.path.join(save_dir, MANIFEST_FILE)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(f"{path}.tmp", path)
+
+
+def render_figures(jobs: list, save_dir: str, max_workers: int = None, force: bool = False) -> dict:
+    """Render chart jobs ({"file", "kind", "data"}) headlessly in a process pool.
+
+    A figure is skipped when its PNG exists and its input hash matches the last render.
+    Returns {"rendered": [...], "skipped": [...]}.
+    """
+    os.makedirs(save_dir, exist_ok=True)
+    manifest = _load_manifest(save_dir)
+
+    pending = []
+    skipped = []
+    for job in jobs:
+        digest = figure_hash(job)
+        path = os.path.join(save_dir, job["file"])
+        if not force and manifest.get(job["file"]) == digest and os.path.exists(path):
+            skipped.append(job["file"])
+        else:
+            pending.append((job, path, digest))
+
+    rendered = []
+    if pending:
+        max_workers = min(max_workers or os.cpu_count() or 1, len(pending))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [(executor.submit(_render_job, job, path), job, digest) for job, path, digest in pending]
+            for future, job, digest in futures:
+                future.result()
+                manifest[job["file"]] = digest
+                rendered.append(job["file"])
+        _save_manifest(save_dir, manifest)
+
+    return {"rendered": rendered, "skipped": skipped}
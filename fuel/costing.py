@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+
+from fuel.ledger import METHODS
+from fuel.storage import ITEMS_CSV, calculate_stock
+from common.latest import LatestPrices
+from common.loader import load_items
+
+MARKET = "MARKET"
+VALUATIONS = METHODS + (MARKET,)
+PRICES_LATEST = "prices/latest.csv"
+SUMMARY_COLUMNS = ["Unit Cost", "Materials Cost", "Job Cost", "Blueprint Cost", "Total Materials Cost",
+                   "Total Job Cost", "Total Blueprint Cost", "Total Cost"]
+
+
+class ProductionCostEngine:
+    """Batch block costing over a material × block usage matrix.
+
+    Unit costs per material are looked up once per valuation (FIFO/LIFO/AVERAGE stock of
+    `target`, or MARKET replacement cost from the latest price table) and shared by every
+    scenario evaluated on the engine.
+    """
+
+    def __init__(self, usage_df: pd.DataFrame, target: str = "Anyed", market_region: str = "jita",
+                 market_column: str = "Sell_Min", shipping_cost_per_m3: float = 0.0,
+                 prices_latest: str = PRICES_LATEST, items_csv: str = ITEMS_CSV):
+        self.usage_df = usage_df
+        self.usage = usage_df.to_numpy(dtype=float)            # materials × blocks
+        self.materials = list(usage_df.index)
+        self.blocks = list(usage_df.columns)
+        self.target = target
+        self.market_region = market_region
+        self.market_column = market_column
+        self.shipping_cost_per_m3 = shipping_cost_per_m3
+        self.prices_latest = prices_latest
+        self.items_csv = items_csv
+        self._unit_costs = {}
+
+    def unit_costs(self, valuation: str) -> np.ndarray:
+        """Unit cost per material, NaN where the valuation has no cost for it."""
+        valuation = valuation.upper()
+        if valuation not in self._unit_costs:
+            if valuation == MARKET:
+                costs = self._market_costs()
+            else:
+                stock_df = calculate_stock(target=self.target, method=valuation)
+                costs = stock_df.drop_duplicates("Item").set_index("Item")["Unit Cost"]
+            self._unit_costs[valuation] = costs.reindex(self.materials).to_numpy(dtype=float)
+        return self._unit_costs[valuation]
+
+    def _market_costs(self) -> pd.Series:
+        latest = LatestPrices(self.prices_latest).load([self.market_region])
+        prices = latest.set_index("Item")[self.market_column]
+        if self.shipping_cost_per_m3:
+            volumes = load_items(self.items_csv).set_index("Item")["Volume"]
+            prices = prices + volumes.reindex(prices.index).fillna(0) * self.shipping_cost_per_m3
+        return prices
+
+    def cost_matrix(self, valuations) -> np.ndarray:
+        """(valuation × material) unit costs; a used material without a cost is an error."""
+        matrix = np.stack([self.unit_costs(v) for v in valuations])
+        used = (self.usage != 0).any(axis=1)
+        missing = np.isnan(matrix) & used[None, :]
+        if missing.any():
+            v, m = np.argwhere(missing)[0]
+            raise ValueError(f"Материал '{self.materials[m]}' отсутствует на складе ({valuations[v]})")
+        return np.nan_to_num(matrix)
+
+    def evaluate(self, scenarios) -> pd.DataFrame:
+        """Cost every block under every scenario in one pass.
+
+        `scenarios` is a list of dicts (or a DataFrame) with keys: name, blocks_count,
+        valuation, job_cost and blueprint_cost. Costs are a {block: total} dict or one total
+        for every block. Returns one row per (scenario, block) indexed by Scenario and Block.
+        """
+        scenarios = pd.DataFrame(scenarios)
+        if "name" not in scenarios:
+            scenarios["name"] = [f"scenario_{i}" for i in range(len(scenarios))]
+        valuations = [str(v).upper() for v in scenarios.get("valuation", pd.Series(["FIFO"] * len(scenarios)))]
+        unique = list(dict.fromkeys(valuations))
+        per_valuation = self.cost_matrix(unique)                                   # V × M
+        material_costs = per_valuation[[unique.index(v) for v in valuations]]      # S × M
+        detail = material_costs[:, :, None] * self.usage[None, :, :]               # S × M × B
+
+        counts = scenarios.get("blocks_count", pd.Series([8000] * len(scenarios))).to_numpy(dtype=float)
+        job = self._per_block(scenarios.get("job_cost"), len(scenarios))
+        blueprint = self._per_block(scenarios.get("blueprint_cost"), len(scenarios))
+        materials_total = detail.sum(axis=1)                                       # S × B
+        per_block = counts[:, None]
+
+        summary = {
+            "Unit Cost": materials_total / per_block + job / per_block + blueprint / per_block,
+            "Materials Cost": materials_total / per_block,
+            "Job Cost": job / per_block,
+            "Blueprint Cost": blueprint / per_block,
+            "Total Materials Cost": materials_total,
+            "Total Job Cost": job,
+            "Total Blueprint Cost": blueprint,
+            "Total Cost": materials_total + job + blueprint,
+        }
+        index = pd.MultiIndex.from_product([scenarios["name"], self.blocks], names=["Scenario", "Block"])
+        result = pd.DataFrame({name: values.ravel() for name, values in summary.items()}, index=index)
+        result.insert(0, "Valuation", np.repeat(valuations, len(self.blocks)))
+
+        # Per-material cost per block, NaN where a block does not use the material
+        per_unit = detail / per_block[:, :, None]
+        per_unit = np.where(self.usage[None, :, :] != 0, per_unit, np.nan)
+        for m in self._material_order():
+            result[self.materials[m]] = per_unit[:, m, :].ravel()
+        return result
+
+    def _per_block(self, costs, n_scenarios: int) -> np.ndarray:
+        if costs is None:
+            return np.zeros((n_scenarios, len(self.blocks)))
+        rows = []
+        for cost in costs:
+            if isinstance(cost, dict):
+                rows.append([cost.get(block, 0) for block in self.blocks])
+            elif cost is None or (np.isscalar(cost) and pd.isna(cost)):
+                rows.append([0] * len(self.blocks))
+            else:
+                rows.append([cost] * len(self.blocks))
+        return np.asarray(rows, dtype=float)
+
+    def _material_order(self) -> list:
+        # Materials in the order blocks first use them
+        order = []
+        for b in range(len(self.blocks)):
+            for m in np.flatnonzero(self.usage[:, b]):
+                if m not in order:
+                    order.append(m)
+        return order
+
+    def block_costs(self, blocks_count: int = 8000, method: str = "FIFO", total_job_cost: dict = None,
+                    total_blueprint_cost: dict = None) -> pd.DataFrame:
+        """One scenario in the calculate_block_costs layout."""
+        result = self.evaluate([{"name": method, "blocks_count": blocks_count, "valuation": method,
+                                 "job_cost": total_job_cost, "blueprint_cost": total_blueprint_cost}])
+        return result.droplevel("Scenario").drop(columns="Valuation")
@@ -0,0 +1,206 @@
+import hashlib
+import io
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from common.loader import load_inventory
+
+INCOMING = "Incoming goods"
+OUTGOING = "Outgoing goods"
+DATE_FORMAT = "%m/%d/%Y"
+METHODS = ("FIFO", "LIFO", "AVERAGE")
+STOCK_COLUMNS = ["Item", "Quantity", "Unit Cost", "Grant Total"]
+STATE_VERSION = 2
+TAIL_BYTES = 256
+ID_WINDOW = 4096
+LOT_DTYPE = np.dtype([("day", "<i4"), ("op", "<i8"), ("qty", "<i8"), ("total", "<f8")])
+
+
+class InventoryLedger:
+    """Append-only inventory CSV plus a checkpoint of the lots received per (target, item).
+
+    The checkpoint remembers the byte offset it has consumed, so a stock query only
+    parses operations appended after it. It is a small JSON file (offset, per-item totals
+    and lot counts) next to a directory with one binary file of incoming lots per
+    (target, item). New lots are appended to those files in place; the JSON lot count is
+    the commit point, so bytes past it (an interrupted write) are ignored and overwritten.
+    FIFO and LIFO sort the lots at query time, so backdated lots need no replay.
+    A checkpoint is discarded when the bytes it ended on change; call rebuild() after
+    editing earlier rows by hand.
+    """
+
+    def __init__(self, path: str, state_path: str):
+        self.path = path
+        self.state_path = state_path
+        self.lots_dir = f"{os.path.splitext(state_path)[0]}.lots"
+
+    # --- Appending ---
+
+    def last_operation_id(self) -> int:
+        with open(self.path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - ID_WINDOW))
+            # The first line is the header or was cut by the seek (maybe mid-character)
+            lines = f.read().decode("utf-8", errors="ignore").splitlines()[1:]
+        lines = [line for line in lines if line.strip()]
+        if not lines:
+            return 0
+        return int(float(lines[-1].split(",", 1)[0]))
+
+    def append(self, row: dict):
+        columns = pd.read_csv(self.path, nrows=0).columns
+        with open(self.path, "rb+") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+        pd.DataFrame([row])[columns].to_csv(self.path, mode="a", header=False, index=False)
+
+    # --- Stock queries ---
+
+    def stock(self, target: str, method: str = "FIFO") -> pd.DataFrame:
+        method = method.upper()
+        state = self.refresh()
+        items = state["targets"].get(target, {})
+
+        rows = []
+        for item, item_state in items.items():
+            if not item_state["lots"]:
+                continue
+            in_qty = item_state["qty"]
+            remaining = max(in_qty - item_state["shipped"], 0)
+            if method == "AVERAGE":
+                unit_cost = item_state["cost"] / in_qty + item_state["fees"] / in_qty
+            else:
+                left_cost = _open_cost(self._read_lots(item_state), item_state["shipped"], method)
+                unit_cost = left_cost / remaining if remaining > 0 else 0.0
+            rows.append({"Item": item, "Quantity": remaining, "Unit Cost": float(unit_cost)})
+
+        result_df = pd.DataFrame(rows, columns=STOCK_COLUMNS[:3])
+        result_df["Grant Total"] = result_df["Quantity"] * result_df["Unit Cost"]
+        result_df = result_df.sort_values("Item").reset_index(drop=True)
+        result_df.name = f"{target}_{method}"
+        return result_df
+
+    def refresh(self) -> dict:
+        state = self._load_state()
+        if state is None or not self._checkpoint_valid(state):
+            state = self._empty_state()
+            shutil.rmtree(self.lots_dir, ignore_errors=True)
+
+        with open(self.path, "rb") as f:
+            header = f.readline()
+            f.seek(max(state["offset"], len(header)))
+            new_bytes = f.read()
+            if new_bytes and not new_bytes.endswith(b"\n"):
+                # Leave a partially written last line for the next query
+                new_bytes = new_bytes[:new_bytes.rfind(b"\n") + 1]
+            offset = max(state["offset"], len(header)) + len(new_bytes)
+
+        if new_bytes:
+            self._apply_operations(state, load_inventory(io.BytesIO(header + new_bytes), cache=None))
+
+        if new_bytes or state["offset"] != offset:
+            state["offset"] = offset
+            state["tail"] = self._tail_hash(offset)
+            self._save_state(state)
+        return state
+
+    def rebuild(self) -> dict:
+        if os.path.exists(self.state_path):
+            os.remove(self.state_path)
+        return self.refresh()
+
+    def _apply_operations(self, state: dict, ops: pd.DataFrame):
+        # Dates arrive parsed, names as categoricals (common.loader)
+        ops = ops.assign(Day=ops["Date"].map(pd.Timestamp.toordinal))
+        for (target, item), group in ops.groupby(["Target", "Item"], sort=False, observed=True):
+            incoming = group[group["Operation"] == INCOMING]
+            item_state = state["targets"].setdefault(target, {}).setdefault(item, {
+                "file": _lots_file(target, item), "lots": 0, "qty": 0, "cost": 0.0, "fees": 0.0, "shipped": 0})
+            item_state["qty"] += _py(incoming["Quantity"].sum())
+            item_state["cost"] += _py((incoming["Total"] * incoming["Quantity"]).sum())
+            item_state["fees"] += _py((incoming["Fees"] * incoming["Quantity"]).sum())
+            item_state["shipped"] += _py(group.loc[group["Operation"] == OUTGOING, "Quantity"].sum())
+            if len(incoming):
+                lots = np.empty(len(incoming), dtype=LOT_DTYPE)
+                lots["day"] = incoming["Day"]
+                lots["op"] = incoming["OperationID"]
+                lots["qty"] = incoming["Quantity"]
+                lots["total"] = incoming["Total"]
+                self._write_lots(item_state, lots)
+
+    # --- Checkpoint persistence ---
+
+    @staticmethod
+    def _empty_state() -> dict:
+        return {"version": STATE_VERSION, "offset": 0, "tail": None, "targets": {}}
+
+    def _load_state(self):
+        if not os.path.exists(self.state_path):
+            return None
+        with open(self.state_path, encoding="utf-8") as f:
+            state = json.load(f)
+        return state if state.get("version") == STATE_VERSION else None
+
+    def _save_state(self, state: dict):
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def _read_lots(self, item_state: dict) -> np.ndarray:
+        return np.fromfile(os.path.join(self.lots_dir, item_state["file"]), dtype=LOT_DTYPE,
+                           count=item_state["lots"])
+
+    def _write_lots(self, item_state: dict, lots: np.ndarray):
+        os.makedirs(self.lots_dir, exist_ok=True)
+        path = os.path.join(self.lots_dir, item_state["file"])
+        with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+            f.seek(item_state["lots"] * LOT_DTYPE.itemsize)
+            f.truncate()
+            f.write(lots.tobytes())
+        item_state["lots"] += len(lots)
+
+    def _tail_hash(self, offset: int) -> str:
+        with open(self.path, "rb") as f:
+            f.seek(max(0, offset - TAIL_BYTES))
+            return hashlib.sha1(f.read(min(offset, TAIL_BYTES))).hexdigest()
+
+    def _checkpoint_valid(self, state: dict) -> bool:
+        # The ledger must still contain the exact bytes the checkpoint ended on
+        if os.path.getsize(self.path) < state["offset"]:
+            return False
+        if state["tail"] != self._tail_hash(state["offset"]):
+            return False
+        # and every lots file at least the lots the checkpoint counted
+        for items in state["targets"].values():
+            for item_state in items.values():
+                path = os.path.join(self.lots_dir, item_state["file"])
+                if item_state["lots"] and (not os.path.exists(path) or
+                                           os.path.getsize(path) < item_state["lots"] * LOT_DTYPE.itemsize):
+                    return False
+        return True
+
+
+def _py(value):
+    return value.item() if hasattr(value, "item") else value
+
+
+def _lots_file(target: str, item: str) -> str:
+    return hashlib.sha1(f"{target}\0{item}".encode("utf-8")).hexdigest()[:16] + ".lots"
+
+
+def _open_cost(lots: np.ndarray, shipped: int, method: str) -> float:
+    # Outgoing goods drain the queue from its head; lots booked on the same day keep
+    # ledger order for both FIFO and LIFO (same as fuel.storage.stock_from_ledger)
+    day = lots["day"] if method == "FIFO" else -lots["day"]
+    lots = lots[np.lexsort((lots["op"], day))]
+    queued = np.cumsum(lots["qty"])
+    left = np.clip(queued - shipped, 0, lots["qty"])
+    return float((left * lots["total"]).sum())
@@ -0,0 +1,158 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from common.history import HISTORY_DIR, PriceHistoryStore
+
+CUBE_FIELDS = ["Sell_Min", "Buy_Max", "Sell_Median", "Buy_Median"]
+BUCKET = "1D"
+VOLATILITY_WINDOW = 7
+
+
+class MarketCube:
+    """Prices aligned on a dense (time bucket × region × item × field) array.
+
+    Missing snapshots are NaN. When a region has several snapshots in one bucket the
+    latest one is kept.
+    """
+
+    def __init__(self, times, regions, items, fields, values):
+        self.times = pd.DatetimeIndex(times)
+        self.regions = list(regions)
+        self.items = list(items)
+        self.fields = list(fields)
+        self.values = values
+
+    @classmethod
+    def from_frames(cls, frames: dict, fields: list = None, freq: str = BUCKET) -> "MarketCube":
+        fields = fields or CUBE_FIELDS
+        if not frames:
+            return cls([], [], [], fields, np.full((0, 0, 0, len(fields)), np.nan))
+        df = pd.concat([frame.assign(Region=region) for region, frame in frames.items()], ignore_index=True)
+        df["Timestamp"] = pd.to_datetime(df["Timestamp"], errors="coerce")
+        df = df.dropna(subset=["Timestamp"])
+        df["Bucket"] = df["Timestamp"].dt.floor(freq)
+        df = df.sort_values("Timestamp", kind="stable").drop_duplicates(["Bucket", "Region", "Item"], keep="last")
+
+        t_idx, times = pd.factorize(df["Bucket"], sort=True)
+        r_idx, regions = pd.factorize(df["Region"])
+        i_idx, items = pd.factorize(df["Item"], sort=True)
+        # float32 input (the compact loader) gives a float32 cube at half the memory
+        dtype = np.result_type(np.float32, *df[fields].dtypes)
+        values = np.full((len(times), len(regions), len(items), len(fields)), np.nan, dtype=dtype)
+        values[t_idx, r_idx, i_idx] = df[fields].to_numpy(dtype=dtype)
+        return cls(times, regions, items, fields, values)
+
+    def field(self, name: str) -> np.ndarray:
+        return self.values[..., self.fields.index(name)]
+
+    # --- Derived metrics, all (time × region × item) unless noted ---
+
+    def spread(self) -> np.ndarray:
+        return self.field("Sell_Min") - self.field("Buy_Max")
+
+    def spread_pct(self) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.spread() / self.field("Buy_Max") * 100
+
+    def change_pct(self, name: str = "Sell_Min") -> np.ndarray:
+        """Change against the previous bucket that has a price for the same region and item."""
+        x = self.field(name)
+        previous = _ffill(x)[:-1]
+        change = np.full_like(x, np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            change[1:] = (x[1:] / previous - 1) * 100
+        return change
+
+    def volatility(self, name: str = "Sell_Min", window: int = VOLATILITY_WINDOW) -> np.ndarray:
+        """Sample std over the trailing `window` buckets, needing at least two prices."""
+        x = self.field(name)
+        if not len(x):
+            return np.full_like(x, np.nan)
+        padded = np.concatenate([np.full((window - 1,) + x.shape[1:], np.nan), x])
+        windows = np.lib.stride_tricks.sliding_window_view(padded, window, axis=0)
+        valid = ~np.isnan(windows)
+        count = valid.sum(axis=-1)
+        filled = np.where(valid, windows, 0.0)
+        mean = filled.sum(axis=-1) / np.maximum(count, 1)
+        sq = np.where(valid, (windows - mean[..., None]) ** 2, 0.0).sum(axis=-1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            std = np.sqrt(sq / (count - 1))
+        return np.where(count >= 2, std, np.nan)
+
+    def region_diff(self, name: str = "Sell_Min") -> np.ndarray:
+        """(time × from region × to region × item): price in `to` minus price in `from`."""
+        x = self.field(name)
+        return x[:, None, :, :] - x[:, :, None, :]
+
+    def to_frame(self) -> pd.DataFrame:
+        """Long table of prices and derived metrics, one row per observed (bucket, region, item)."""
+        columns = {name: self.field(name) for name in self.fields}
+        columns["Sell_Buy_Spread"] = self.spread()
+        columns["Sell_Buy_%"] = self.spread_pct()
+        columns["Daily_Change_%"] = self.change_pct()
+        columns["Volatility_7d"] = self.volatility()
+
+        t, r, i = np.meshgrid(np.arange(len(self.times)), np.arange(len(self.regions)),
+                              np.arange(len(self.items)), indexing="ij")
+        observed = ~np.isnan(self.values).all(axis=-1)
+        df = pd.DataFrame({
+            "Timestamp": self.times[t[observed]],
+            "Region": np.asarray(self.regions, dtype=object)[r[observed]],
+            "Item": np.asarray(self.items, dtype=object)[i[observed]],
+        })
+        for name, values in columns.items():
+            df[name] = values[observed]
+        return df
+
+    def latest_region_diff(self, name: str = "Sell_Min") -> pd.DataFrame:
+        """Last known price per region and item, with every region pair's difference."""
+        if len(self.regions) < 2 or not len(self.times):
+            return pd.DataFrame(columns=["Item", "From", "To", f"{name}_From", f"{name}_To", "Diff"])
+        last = _ffill(self.field(name))[-1]
+        rows = []
+        for a, region_a in enumerate(self.regions):
+            for b, region_b in enumerate(self.regions):
+                if a != b:
+                    rows.append(pd.DataFrame({
+                        "Item": self.items, "From": region_a, "To": region_b,
+                        f"{name}_From": last[a], f"{name}_To": last[b], "Diff": last[b] - last[a],
+                    }))
+        return pd.concat(rows, ignore_index=True).dropna(subset=["Diff"])
+
+
+def _ffill(x: np.ndarray) -> np.ndarray:
+    """Forward-fill NaNs along the time axis."""
+    valid = ~np.isnan(x)
+    idx = np.where(valid, np.arange(x.shape[0]).reshape((-1,) + (1,) * (x.ndim - 1)), 0)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    filled = np.take_along_axis(x, idx, axis=0)
+    # Positions before a series' first price stay NaN
+    filled[~np.maximum.accumulate(valid, axis=0)] = np.nan
+    return filled
+
+
+def load_region_cube(regions: list, prices_dir: str = "prices", fields: list = None,
+                     freq: str = BUCKET, history_dir: str = HISTORY_DIR) -> MarketCube:
+    store = PriceHistoryStore(history_dir, csv_dir=prices_dir)
+    frames = {}
+    for region in regions:
+        df = store.read(region)
+        if df.empty:
+            print(f"No price history for {region} in {history_dir}")
+            continue
+        frames[region] = df
+    return MarketCube.from_frames(frames, fields=fields, freq=freq)
+
+
+def analyze_market_cube(regions: list, prices_dir: str = "prices", save_dir: str = "market_cube_analysis",
+                        freq: str = BUCKET) -> MarketCube:
+    os.makedirs(save_dir, exist_ok=True)
+    cube = load_region_cube(regions, prices_dir, freq=freq)
+    print(f"Cube: {len(cube.times)} buckets × {len(cube.regions)} regions × {len(cube.items)} items")
+
+    cube.to_frame().to_csv(os.path.join(save_dir, "cube_timeseries.csv"), index=False)
+    cube.latest_region_diff().to_csv(os.path.join(save_dir, "latest_region_diff.csv"), index=False)
+    print(f"Market cube analysis complete. Results saved to: {save_dir}")
+    return cube
@@ -1,279 +1,240 @@
 import pandas as pd
-import requests
 import os
-import time
 from datetime import datetime
-import matplotlib.pyplot as plt
-import seaborn as sns
-import numpy as np
-import scipy.stats as stats
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from common.http import CachingSession, DEFAULT_RATE_PER_HOST, HTTP_CACHE_DB
+from common.appraisal import APPRAISAL_URL, fetch_item_page, parse_region_tables
+from common.history import PriceHistoryStore
+from common.latest import LatestPrices
+from common.loader import load_items
+from common.pricecube import CUBE_DIR, PriceCubeStore
+from common.metrics import metrics
+from fuel.charts import render_figures
+from fuel.timeline import rebuild_timeline, update_timeline
 
 INPUT_CSV = "items.csv"
 OUTPUT_DIR = "prices"
 REGIONS = ["C-J6MT", "UALX-3", "jita", "amarr", "dodixie"]
-BASE_URL = "https://appraise.gnf.lt/item/{}#{}"
+BASE_URL = APPRAISAL_URL
+HISTORY_DIR = "history"
+METRICS_RUN = "fuel_collect"
 
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+history_store = PriceHistoryStore(HISTORY_DIR, csv_dir=OUTPUT_DIR)
+latest_prices = LatestPrices(os.path.join(OUTPUT_DIR, "latest.csv"))
 
 
-def parse_prices_from_page(type_id, region):
-    url = BASE_URL.format(type_id, region)
+def parse_prices_for_regions(type_id, regions, session=None):
     try:
-        r = requests.get(url, timeout=15)
-        r.raise_for_status()
-        soup = BeautifulSoup(r.text, "html.parser")
-
-        tab = soup.find("div", id=region)
-        if not tab:
-            print(f"Region tab {region} not found for item {type_id}")
-            return None
-
-        tables = tab.find_all("table")
-        if not tables or len(tables) < 2:
-            print(f"Missing expected tables for {region} item {type_id}")
-            return None
-
-        def extract_table_data(table):
-            result = {}
-            for row in table.find_all("tr"):
-                th = row.find("th")
-                td = row.find("td")
-                if th and td:
-                    key = th.text.strip()
-                    val = td.text.strip().replace(",", "").replace(" ISK", "")
-                    try:
-                        val = float(val)
-                    except:
-                        val = None
-                    result[key] = val
-            return result
-
-        sell_data = extract_table_data(tables[0])
-        buy_data = extract_table_data(tables[1])
+        html = fetch_item_page(type_id, session=session, url=BASE_URL)
+        with metrics.timer("parse_seconds", help="HTML extraction time per item page", collector="fuel"):
+            tables = parse_region_tables(html, regions)
+    except Exception as e:
+        metrics.inc("item_errors_total", help="Items whose page could not be fetched or parsed",
+                    collector="fuel", error=type(e).__name__)
+        print(f"Error fetching {type_id}: {e}")
+        return {region: None for region in regions}
+
+    result = {}
+    for region in regions:
+        if tables[region] is None:
+            metrics.inc("region_missing_total", help="Region tabs missing or incomplete on an item page",
+                        collector="fuel", region=region)
+            print(f"Region tab {region} not found or incomplete for item {type_id}")
+            result[region] = None
+            continue
 
+        sell_data, buy_data = tables[region]
         combined = {}
         for k, v in sell_data.items():
             combined[f"Sell_{k}"] = v
         for k, v in buy_data.items():
             combined[f"Buy_{k}"] = v
+        result[region] = combined
 
-        return combined
-
-    except Exception as e:
-        print(f"Error fetching {type_id} {region}: {e}")
-        return None
-
+    return result
 
-def update_prices_for_region(region):
-    df_items = pd.read_csv(INPUT_CSV)
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    output_data = []
 
-    print(f"\n=== Requesting data for {region} ===")
+def parse_prices_from_page(type_id, region, session=None):
+    return parse_prices_for_regions(type_id, [region], session=session)[region]
 
-    for _, row in df_items.iterrows():
-        item_name = row["Item"]
-        type_id = int(row["ID"])
-        print(f"→ {item_name} ({type_id})")
 
-        prices = parse_prices_from_page(type_id, region)
+def _snapshot_rows(by_region, item_name, type_id, timestamp):
+    for region, prices in by_region.items():
         if prices:
             prices["Item"] = item_name
             prices["TypeID"] = type_id
             prices["Region"] = region
             prices["Timestamp"] = timestamp
-            output_data.append(prices)
+            yield region, prices
+
+
+def collect_prices(regions=REGIONS):
+    metrics.reset()
+    df_items = load_items(INPUT_CSV)
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    output_data = {region: [] for region in regions}
+
+    print(f"\n=== Requesting data for {', '.join(regions)} ===")
+
+    # One request every 0.5 s; pages served from the HTTP cache cost no wait
+    with CachingSession(HTTP_CACHE_DB, pool_size=1, rate_per_host=2.0, burst=1) as session:
+        for _, row in df_items.iterrows():
+            item_name = row["Item"]
+            type_id = int(row["ID"])
+            print(f"→ {item_name} ({type_id})")
+
+            by_region = parse_prices_for_regions(type_id, regions, session)
+            for region, prices in _snapshot_rows(by_region, item_name, type_id, timestamp):
+                output_data[region].append(prices)
+        print(session.stats.summary())
+        print(session.summary())
+
+    for region in regions:
+        save_region_prices(region, output_data[region])
+    print(f"Metrics written to {', '.join(metrics.export(METRICS_RUN))}")
 
-        time.sleep(0.5)
 
+def update_prices_for_region(region):
+    collect_prices([region])
+
+
+def save_region_prices(region, output_data):
     if output_data:
         new_df = pd.DataFrame(output_data)
+        with metrics.timer("write_seconds", help="Time spent writing collected rows",
+                           collector="fuel", target="history"):
+            history_store.append(region, new_df)
+        with metrics.timer("write_seconds", collector="fuel", target="latest"):
+            latest_prices.update(new_df)
+        with metrics.timer("write_seconds", collector="fuel", target="cube"):
+            cube = PriceCubeStore(CUBE_DIR)
+            if cube.regions:
+                cube.append(region, new_df)
+            else:
+                # A new cube starts from the whole history, this snapshot included
+                cube.build_from_history(history_store)
 
+        # Append-only CSV export of the history; it also seeds a history store created later
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
         output_file = os.path.join(OUTPUT_DIR, f"prices_{region}.csv")
 
-        if os.path.exists(output_file):
-            old_df = pd.read_csv(output_file)
-            combined_df = pd.concat([old_df, new_df], ignore_index=True)
-        else:
-            combined_df = new_df
-
-        combined_df.to_csv(output_file, index=False)
-        print(f"Data saved/appended to {output_file}")
+        with metrics.timer("write_seconds", collector="fuel", target="csv"):
+            if not os.path.exists(output_file):
+                new_df.to_csv(output_file, index=False)
+            else:
+                header = pd.read_csv(output_file, nrows=0).columns.tolist()
+                if set(header) == set(new_df.columns):
+                    new_df[header].to_csv(output_file, mode="a", header=False, index=False)
+                else:
+                    old_df = pd.read_csv(output_file)
+                    pd.concat([old_df, new_df], ignore_index=True).to_csv(output_file, index=False)
+        metrics.inc("rows_written_total", len(new_df), help="Price rows saved per region",
+                    collector="fuel", region=region)
+        print(f"Data saved/appended to {output_file} and {history_store.root}")
     else:
         print(f"No data collected for {region}")
 
 
-def get_all_prices():
-    for region in REGIONS:
-        update_prices_for_region(region)
-        time.sleep(1)
+def collect_prices_concurrently(regions=REGIONS, max_workers=8, rate_per_host=DEFAULT_RATE_PER_HOST):
+    metrics.reset()
+    # One timestamp for the whole run so snapshots of all regions line up
+    df_items = load_items(INPUT_CSV)
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    items = [(row["Item"], int(row["ID"])) for _, row in df_items.iterrows()]
+    results = {region: [None] * len(items) for region in regions}
+
+    print(f"\n=== Requesting data for {', '.join(regions)} ({max_workers} workers) ===")
+
+    with CachingSession(HTTP_CACHE_DB, pool_size=max_workers, rate_per_host=rate_per_host) as session:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(parse_prices_for_regions, type_id, regions, session): pos
+                for pos, (_, type_id) in enumerate(items)
+            }
+            for future in as_completed(futures):
+                pos = futures[future]
+                item_name, type_id = items[pos]
+                for region, prices in _snapshot_rows(future.result(), item_name, type_id, timestamp):
+                    results[region][pos] = prices
+                print(f"→ {item_name} ({type_id})")
+        print(session.stats.summary())
+        print(session.summary())
+
+    for region in regions:
+        save_region_prices(region, [row for row in results[region] if row])
+    print(f"Metrics written to {', '.join(metrics.export(METRICS_RUN))}")
+
+
+def get_all_prices(concurrent=False, **kwargs):
+    if concurrent:
+        collect_prices_concurrently(**kwargs)
+    else:
+        collect_prices(**kwargs)
 
 
-def analyze_market_timeline(jita_path: str, cj_path: str, save_dir: str = "market_timeline_analysis"):
+def analyze_market_timeline(jita_region: str = "jita", cj_region: str = "C-J6MT",
+                            save_dir: str = "market_timeline_analysis", max_workers: int = None,
+                            force_render: bool = False, incremental: bool = False):
     os.makedirs(save_dir, exist_ok=True)
-    sns.set(style="whitegrid", context="talk")
 
-    df_jita = pd.read_csv(jita_path)
-    df_cj = pd.read_csv(cj_path)
+    # Full precision: the timeline republishes the raw prices
+    df_jita = history_store.read(jita_region, compact=False)
+    df_cj = history_store.read(cj_region, compact=False)
 
     for df, region in [(df_jita, "Jita"), (df_cj, "C-J6MT")]:
         df["Region"] = region
-        df["Timestamp"] = pd.to_datetime(df["Timestamp"], errors="coerce")
         df.sort_values("Timestamp", inplace=True)
 
-    df_all = pd.concat([df_jita, df_cj], ignore_index=True)
-
-    df_all["Sell_Buy_Spread"] = df_all["Sell_Min"] - df_all["Buy_Max"]
-    df_all["Sell_Buy_%"] = (df_all["Sell_Buy_Spread"] / df_all["Buy_Max"]) * 100
-    df_all["Daily_Change_%"] = df_all.groupby(["Region", "Item"])["Sell_Min"].pct_change() * 100
-    df_all["Volatility_7d"] = df_all.groupby(["Region", "Item"])["Sell_Min"].transform(
-        lambda x: x.rolling(7, min_periods=2).std()
-    )
-
-    merged = pd.merge_asof(
-        df_jita.sort_values("Timestamp"),
-        df_cj.sort_values("Timestamp"),
-        on="Timestamp",
-        by="Item",
-        suffixes=("_Jita", "_CJ"),
-        tolerance=pd.Timedelta("12h"),
-        direction="nearest"
-    )
+    if incremental:
+        df_all, merged = update_timeline(df_jita, df_cj, save_dir)
+    else:
+        df_all, merged = rebuild_timeline(df_jita, df_cj, save_dir)
 
     if merged.empty:
         print("No timestamp matches even within tolerance.")
         return None
 
-    merged["Sell_Diff"] = merged["Sell_Min_CJ"] - merged["Sell_Min_Jita"]
-    merged["Buy_Diff"] = merged["Buy_Max_CJ"] - merged["Buy_Max_Jita"]
-
     items = sorted(df_all["Item"].unique())
-    n_items = len(items)
-    n_cols = 4
-    n_rows = int(np.ceil(n_items / n_cols))
-
-    fig, axs = plt.subplots(n_rows, n_cols, figsize=(18, n_rows * 4))
-    axs = axs.flatten()
-    for i, item in enumerate(items):
-        df_item = df_all[df_all["Item"] == item]
-        for region, color in [("Jita", "blue"), ("C-J6MT", "red")]:
-            data = df_item[df_item["Region"] == region]["Sell_Min"].dropna()
-            if len(data) == 0:
-                continue
-            sns.lineplot(ax=axs[i], x=range(len(data)), y=data.values, color=color, label=region)
-        axs[i].set_title(item)
-        axs[i].set_ylabel("Sell_Min (ISK)")
-        axs[i].set_xlabel("Time index")
-        axs[i].legend()
-    for j in range(i+1, len(axs)):
-        axs[j].axis("off")
-    plt.tight_layout()
-    plt.savefig(os.path.join(save_dir, "average_sell_price_grid.png"))
-    plt.close()
-
-    fig, axs = plt.subplots(n_rows, n_cols, figsize=(18, n_rows * 4))
-    axs = axs.flatten()
-    for i, item in enumerate(items):
-        df_item = df_all[df_all["Item"] == item]
-        for region, color in [("Jita", "blue"), ("C-J6MT", "red")]:
-            data = df_item[df_item["Region"] == region]["Buy_Max"].dropna()
-            if len(data) == 0:
-                continue
-            sns.lineplot(ax=axs[i], x=range(len(data)), y=data.values, color=color, label=region)
-        axs[i].set_title(item)
-        axs[i].set_ylabel("Buy_Max (ISK)")
-        axs[i].set_xlabel("Time index")
-        axs[i].legend()
-    for j in range(i+1, len(axs)):
-        axs[j].axis("off")
-    plt.tight_layout()
-    plt.savefig(os.path.join(save_dir, "average_buy_price_grid.png"))
-    plt.close()
-
-    fig, axs = plt.subplots(n_rows, n_cols, figsize=(18, n_rows * 4))
-    axs = axs.flatten()
-    for i, item in enumerate(items):
-        df_item = df_all[df_all["Item"] == item]
-        for region, color in [("Jita", "blue"), ("C-J6MT", "red")]:
-            data = df_item[df_item["Region"] == region]["Sell_Min"].dropna()
-            if len(data) == 0:
-                continue
-            if data.nunique() > 1:
-                sns.kdeplot(data, ax=axs[i], color=color, fill=True, alpha=0.3, label=region, warn_singular=False)
-            else:
-                axs[i].axvline(data.mean(), color=color, linestyle="--", label=f"{region}: {data.mean():.0f}")
-        axs[i].set_title(item)
-        axs[i].set_xlabel("Sell_Min (ISK)")
-        axs[i].set_ylabel("Density")
-        axs[i].legend()
-    for j in range(i+1, len(axs)):
-        axs[j].axis("off")
-    plt.tight_layout()
-    plt.savefig(os.path.join(save_dir, "distribution_grid.png"))
-    plt.close()
-
-    fig, axs = plt.subplots(n_rows, n_cols, figsize=(18, n_rows * 4))
-    axs = axs.flatten()
-    for i, item in enumerate(items):
+    regions = [("Jita", "blue"), ("C-J6MT", "red")]
+
+    def region_series(column):
+        series = {}
+        for item in items:
+            df_item = df_all[df_all["Item"] == item]
+            series[item] = {region: df_item[df_item["Region"] == region][column].dropna().values
+                            for region, _ in regions}
+        return series
+
+    qq_series = {}
+    for item in items:
         df_item_jita = df_jita[df_jita["Item"] == item]["Sell_Min"].dropna()
         df_item_cj = df_cj[df_cj["Item"] == item]["Sell_Min"].dropna()
         min_len = min(len(df_item_jita), len(df_item_cj))
-        if min_len < 2:
-            axs[i].text(0.5, 0.5, "Not enough data", ha="center", va="center")
-            continue
-        stats.probplot(df_item_jita.iloc[:min_len], dist="norm", plot=axs[i])
-        axs[i].set_title(item)
-    for j in range(i+1, len(axs)):
-        axs[j].axis("off")
-    plt.tight_layout()
-    plt.savefig(os.path.join(save_dir, "qqplot_grid.png"))
-    plt.close()
-
-    fig, axs = plt.subplots(n_rows, n_cols, figsize=(18, n_rows * 4))
-    axs = axs.flatten()
-    for i, item in enumerate(items):
-        df_item = df_all[df_all["Item"] == item]
-        for region, color in [("Jita", "blue"), ("C-J6MT", "red")]:
-            data = df_item[df_item["Region"] == region]["Sell_Buy_Spread"].dropna()
-            if len(data) == 0:
-                continue
-            sns.lineplot(ax=axs[i], x=range(len(data)), y=data.values, color=color, label=region)
-        axs[i].set_title(item)
-        axs[i].set_xlabel("Time index")
-        axs[i].set_ylabel("Spread (ISK)")
-        axs[i].legend()
-    for j in range(i+1, len(axs)):
-        axs[j].axis("off")
-    plt.tight_layout()
-    plt.savefig(os.path.join(save_dir, "spread_grid.png"))
-    plt.close()
+        qq_series[item] = df_item_jita.iloc[:min_len].values if min_len >= 2 else None
 
     corr_data = merged.pivot_table(index="Timestamp", columns="Item",
                                    values=["Sell_Min_Jita", "Sell_Min_CJ"]).dropna()
     corr_jita = corr_data["Sell_Min_Jita"].corr()
     corr_cj = corr_data["Sell_Min_CJ"].corr()
 
-    plt.figure(figsize=(12, 10))
-    sns.heatmap(corr_jita, cmap="coolwarm", annot=False, square=True)
-    plt.title("Item-to-Item Correlation (Jita Sell_Min, pearson)")
-    plt.xticks(rotation=45, ha="right")
-    plt.yticks(rotation=0)
-    plt.tight_layout()
-    plt.savefig(os.path.join(save_dir, "correlation_matrix_jita.png"))
-    plt.close()
-
-    plt.figure(figsize=(12, 10))
-    sns.heatmap(corr_cj, cmap="coolwarm", annot=False, square=True)
-    plt.title("Item-to-Item Correlation (C-J6MT Sell_Min, pearson)")
-    plt.xticks(rotation=45, ha="right")
-    plt.yticks(rotation=0)
-    plt.tight_layout()
-    plt.savefig(os.path.join(save_dir, "correlation_matrix_cj.png"))
-    plt.close()
-
-    merged.to_csv(os.path.join(save_dir, "region_comparison_timeline.csv"), index=False)
-    df_all.to_csv(os.path.join(save_dir, "full_timeseries.csv"), index=False)
+    sell_series = region_series("Sell_Min")
+    jobs = [
+        {"file": "average_sell_price_grid.png", "kind": "line_grid",
+         "data": {"series": sell_series, "regions": regions, "ylabel": "Sell_Min (ISK)"}},
+        {"file": "average_buy_price_grid.png", "kind": "line_grid",
+         "data": {"series": region_series("Buy_Max"), "regions": regions, "ylabel": "Buy_Max (ISK)"}},
+        {"file": "distribution_grid.png", "kind": "distribution_grid",
+         "data": {"series": sell_series, "regions": regions, "xlabel": "Sell_Min (ISK)"}},
+        {"file": "qqplot_grid.png", "kind": "qq_grid", "data": {"series": qq_series}},
+        {"file": "spread_grid.png", "kind": "line_grid",
+         "data": {"series": region_series("Sell_Buy_Spread"), "regions": regions, "ylabel": "Spread (ISK)"}},
+        {"file": "correlation_matrix_jita.png", "kind": "heatmap",
+         "data": {"corr": corr_jita, "title": "Item-to-Item Correlation (Jita Sell_Min, pearson)"}},
+        {"file": "correlation_matrix_cj.png", "kind": "heatmap",
+         "data": {"corr": corr_cj, "title": "Item-to-Item Correlation (C-J6MT Sell_Min, pearson)"}},
+    ]
+    render = render_figures(jobs, save_dir, max_workers=max_workers, force=force_render)
+    print(f"Charts: {len(render['rendered'])} rendered, {len(render['skipped'])} unchanged")
 
     print(f"Market analysis complete. Results saved to: {save_dir}")
 
@@ -283,11 +244,3 @@ def analyze_market_timeline(jita_path: str, cj_path: str, save_dir: str = "marke
         "corr_jita": corr_jita,
         "corr_cj": corr_cj
     }
-
-
-if __name__ == "__main__":
-    get_all_prices()
-    result = analyze_market_timeline(
-        jita_path="prices/prices_jita.csv",
-        cj_path="prices/prices_C-J6MT.csv"
-    )
\ No newline at end of file
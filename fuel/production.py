@@ -1,6 +1,6 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-from fuel.storage import calculate_stock
+from fuel.costing import VALUATIONS, ProductionCostEngine
+from fuel.risk import HORIZON_DAYS, BlockMarginRisk
 
 pd.set_option('display.max_rows', None)
 pd.set_option('display.max_columns', None)
@@ -10,50 +10,26 @@ pd.set_option('display.width', None)
 
 def calculate_block_costs(usage_df: pd.DataFrame, blocks_count: int = 8000,
                           target: str = "Anyed", method: str = "FIFO",
-                          total_job_cost: dict = None, total_blueprint_cost: dict = None) -> pd.DataFrame:
-    if total_job_cost is None:
-        total_job_cost = {block: 0 for block in usage_df.columns}
-    if total_blueprint_cost is None:
-        total_blueprint_cost = {block: 0 for block in usage_df.columns}
-
-    stock_df = calculate_stock(target=target, method=method)
-    result = []
-
-    for block in usage_df.columns:
-        total_materials_cost = 0
-        material_costs = {}
-
-        for material, qty in usage_df[block].items():
-            if qty == 0:
-                continue
-            stock_row = stock_df[stock_df["Item"] == material]
-            if stock_row.empty:
-                raise ValueError(f"Материал '{material}' отсутствует на складе")
-            unit_cost = stock_row["Unit Cost"].values[0]
-            cost = qty * unit_cost
-            total_materials_cost += cost
-            material_costs[material] = cost
-
-        job_cost = total_job_cost.get(block, 0)
-        blueprint_cost = total_blueprint_cost.get(block, 0)
-
-        result.append({
-            "Block": block,
-            "Unit Cost": total_materials_cost / blocks_count + job_cost / blocks_count + blueprint_cost / blocks_count,
-            "Materials Cost": total_materials_cost / blocks_count,
-            "Job Cost": job_cost / blocks_count,
-            "Blueprint Cost": blueprint_cost / blocks_count,
-            "Total Materials Cost": total_materials_cost,
-            "Total Job Cost": job_cost,
-            "Total Blueprint Cost": blueprint_cost,
-            "Total Cost": total_materials_cost + job_cost + blueprint_cost,
-            **{mat: cost / blocks_count for mat, cost in material_costs.items()}
-        })
-
-    return pd.DataFrame(result).set_index("Block")
+                          total_job_cost: dict = None, total_blueprint_cost: dict = None,
+                          engine: ProductionCostEngine = None) -> pd.DataFrame:
+    engine = engine or ProductionCostEngine(usage_df, target=target)
+    return engine.block_costs(blocks_count, method, total_job_cost, total_blueprint_cost)
+
+
+def compare_valuations(usage_df: pd.DataFrame, blocks_count: int, target: str,
+                       total_job_cost: dict = None, total_blueprint_cost: dict = None,
+                       valuations=VALUATIONS, engine: ProductionCostEngine = None) -> pd.DataFrame:
+    # One engine, so each stock valuation is computed once for all scenarios
+    engine = engine or ProductionCostEngine(usage_df, target=target)
+    scenarios = [{"name": v, "blocks_count": blocks_count, "valuation": v,
+                  "job_cost": total_job_cost, "blueprint_cost": total_blueprint_cost} for v in valuations]
+    result = engine.evaluate(scenarios)
+    return result["Unit Cost"].unstack("Scenario")[list(valuations)]
 
 
 def plot_block_costs_breakdown(block_costs_df: pd.DataFrame):
+    import matplotlib.pyplot as plt
+
     blocks = block_costs_df.index.tolist()
     n_blocks = len(blocks)
     fig, axes = plt.subplots(2, 2, figsize=(14, 10))
@@ -99,7 +75,7 @@ def plot_block_costs_breakdown(block_costs_df: pd.DataFrame):
 def print_pretty_df(df: pd.DataFrame, title: str):
     print(f"\n{title}")
     print("=" * 80)
-    formatted = df.copy().applymap(lambda x: f"{x:,.2f}" if isinstance(x, (int, float)) else x)
+    formatted = df.copy().map(lambda x: f"{x:,.2f}" if isinstance(x, (int, float)) else x)
     print(formatted.to_string())
     print("=" * 80 + "\n")
 
@@ -107,7 +83,7 @@ def print_pretty_df(df: pd.DataFrame, title: str):
 # ---------------------------
 # Anyed
 # ---------------------------
-def anyed_production_cost():
+def anyed_production_cost(plot: bool = True, compare: bool = False, risk: bool = False):
     usage_data = {
         "Helium Fuel Block": [957, 392, 174, 174, 50, 15219, 7392, 870, 19567, 0, 0, 0],
         "Hydrogen Fuel Block": [957, 392, 174, 174, 50, 15219, 7392, 870, 0, 19567, 0, 0],
@@ -128,16 +104,26 @@ def anyed_production_cost():
     }
     blueprint_costs = {b: 50_000 for b in usage_df.columns}
 
+    # Shared with the valuation comparison, so the FIFO stock is computed once
+    engine = ProductionCostEngine(usage_df, target="Anyed")
     df = calculate_block_costs(usage_df, blocks_count=2000, target="Anyed",
-                               total_job_cost=job_costs, total_blueprint_cost=blueprint_costs)
+                               total_job_cost=job_costs, total_blueprint_cost=blueprint_costs, engine=engine)
     print_pretty_df(df, "Anyed Production Cost per Block")
-    plot_block_costs_breakdown(df)
+    if compare:
+        print_pretty_df(compare_valuations(usage_df, 2000, "Anyed", job_costs, blueprint_costs, engine=engine),
+                        "Anyed Unit Cost by Valuation")
+    if risk:
+        risk_model = BlockMarginRisk(usage_df, 2000, job_costs, blueprint_costs)
+        print_pretty_df(risk_model.simulate(), f"Anyed Block Margin Risk ({HORIZON_DAYS}-day horizon)")
+    if plot:
+        plot_block_costs_breakdown(df)
+    return df
 
 
 # ---------------------------
 # RYC
 # ---------------------------
-def ryc_production_cost():
+def ryc_production_cost(plot: bool = True, compare: bool = False, risk: bool = False):
     usage_data = {
         "Helium Fuel Block": [3723, 1523, 677, 677, 200, 59227, 28768, 3385, 76149, 0, 0, 0],
         "Hydrogen Fuel Block": [3723, 1523, 677, 677, 200, 59227, 28768, 3385, 0, 76149, 0, 0],
@@ -163,12 +149,17 @@ def ryc_production_cost():
         "Oxygen Fuel Block": 203_168
     }
 
+    # Shared with the valuation comparison, so the FIFO stock is computed once
+    engine = ProductionCostEngine(usage_df, target="RYC")
     df = calculate_block_costs(usage_df, blocks_count=8000, target="RYC",
-                               total_job_cost=job_costs, total_blueprint_cost=blueprint_costs)
+                               total_job_cost=job_costs, total_blueprint_cost=blueprint_costs, engine=engine)
     print_pretty_df(df, "RYC Production Cost per Block")
-    plot_block_costs_breakdown(df)
-
-
-if __name__ == "__main__":
-    anyed_production_cost()
-    ryc_production_cost()
+    if compare:
+        print_pretty_df(compare_valuations(usage_df, 8000, "RYC", job_costs, blueprint_costs, engine=engine),
+                        "RYC Unit Cost by Valuation")
+    if risk:
+        risk_model = BlockMarginRisk(usage_df, 8000, job_costs, blueprint_costs)
+        print_pretty_df(risk_model.simulate(), f"RYC Block Margin Risk ({HORIZON_DAYS}-day horizon)")
+    if plot:
+        plot_block_costs_breakdown(df)
+    return df
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+from common.latest import LatestPrices
+from fuel.market_cube import load_region_cube
+
+N_SCENARIOS = 100_000
+HORIZON_DAYS = 7
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+PRICES_LATEST = "prices/latest.csv"
+
+
+def log_returns(cube, series: list, field: str = "Sell_Min") -> pd.DataFrame:
+    """Per-bucket log returns for (region, item) series, gaps forward-filled first."""
+    values = cube.field(field)
+    columns = {}
+    for region, item in series:
+        if region not in cube.regions or item not in cube.items:
+            raise ValueError(f"No price history for {item} in {region}")
+        columns[(region, item)] = values[:, cube.regions.index(region), cube.items.index(item)]
+    prices = pd.DataFrame(columns, index=cube.times).ffill()
+    return np.log(prices).diff().iloc[1:]
+
+
+def nearest_psd(cov: np.ndarray) -> np.ndarray:
+    # Pairwise covariance from a short, gappy history need not be positive semi-definite
+    w, v = np.linalg.eigh((cov + cov.T) / 2)
+    return (v * np.clip(w, 0, None)) @ v.T
+
+
+def simulate_prices(base: np.ndarray, cov: np.ndarray, n: int = N_SCENARIOS, horizon: int = HORIZON_DAYS,
+                    seed: int = None) -> np.ndarray:
+    """(n × series) correlated lognormal price scenarios after `horizon` buckets, zero drift."""
+    rng = np.random.default_rng(seed)
+    scaled = nearest_psd(cov) * horizon
+    w, v = np.linalg.eigh(scaled)
+    factor = v * np.sqrt(np.clip(w, 0, None))
+    z = rng.standard_normal((n, len(base))) @ factor.T
+    return base * np.exp(z - 0.5 * np.diag(scaled))
+
+
+def margin_quantiles(margins: np.ndarray, blocks: list, quantiles=QUANTILES) -> pd.DataFrame:
+    report = pd.DataFrame({
+        "Mean": margins.mean(axis=0),
+        "Std": margins.std(axis=0),
+        "P(Loss)": (margins < 0).mean(axis=0),
+    }, index=pd.Index(blocks, name="Block"))
+    for q, values in zip(quantiles, np.quantile(margins, quantiles, axis=0)):
+        report[f"Q{q * 100:g}"] = values
+    return report
+
+
+class BlockMarginRisk:
+    """Monte Carlo margin distribution per fuel block.
+
+    Input materials are bought at `input_column` in `input_region` and blocks are sold at
+    `output_column` in `output_region`. All prices move jointly with the covariance of their
+    log returns over the collected history (the covariance behind the timeline correlation
+    matrices), starting from the latest collected prices.
+    """
+
+    def __init__(self, usage_df: pd.DataFrame, blocks_count: int, total_job_cost: dict = None,
+                 total_blueprint_cost: dict = None, input_region: str = "jita", input_column: str = "Sell_Min",
+                 output_region: str = "C-J6MT", output_column: str = "Sell_Min",
+                 prices_dir: str = "prices", prices_latest: str = PRICES_LATEST):
+        self.usage = usage_df.to_numpy(dtype=float)                # materials × blocks
+        self.materials = list(usage_df.index)
+        self.blocks = list(usage_df.columns)
+        self.blocks_count = blocks_count
+        fixed = [(total_job_cost or {}).get(b, 0) + (total_blueprint_cost or {}).get(b, 0) for b in self.blocks]
+        self.fixed_per_block = np.asarray(fixed, dtype=float) / blocks_count
+
+        self.series = [(input_region, m) for m in self.materials] + [(output_region, b) for b in self.blocks]
+        cube = load_region_cube(sorted({input_region, output_region}), prices_dir,
+                                fields=sorted({input_column, output_column}))
+        returns = pd.concat([
+            log_returns(cube, self.series[:len(self.materials)], input_column),
+            log_returns(cube, self.series[len(self.materials):], output_column),
+        ], axis=1)
+        self.cov = returns.cov().fillna(0).to_numpy()
+
+        latest = LatestPrices(prices_latest).load([input_region, output_region]).set_index(["Region", "Item"])
+        base = pd.concat([latest[input_column].reindex(self.series[:len(self.materials)]),
+                          latest[output_column].reindex(self.series[len(self.materials):])])
+        if base.isna().any():
+            missing = [f"{item} ({region})" for region, item in base[base.isna()].index]
+            raise ValueError(f"No latest price for: {', '.join(missing)}")
+        self.base = base.to_numpy(dtype=float)
+
+    def margins(self, prices: np.ndarray) -> np.ndarray:
+        """(scenario × block) margin per block for (scenario × series) prices."""
+        n_materials = len(self.materials)
+        unit_cost = prices[:, :n_materials] @ self.usage / self.blocks_count + self.fixed_per_block
+        return prices[:, n_materials:] - unit_cost
+
+    def simulate(self, n: int = N_SCENARIOS, horizon: int = HORIZON_DAYS, seed: int = None,
+                 quantiles=QUANTILES) -> pd.DataFrame:
+        prices = simulate_prices(self.base, self.cov, n=n, horizon=horizon, seed=seed)
+        report = margin_quantiles(self.margins(prices), self.blocks, quantiles)
+        report.insert(0, "Current Margin", self.margins(self.base[None, :])[0])
+        return report
@@ -0,0 +1,231 @@
+import heapq
+import json
+import os
+import signal
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from common.http import CachingSession, HTTP_CACHE_DB, TokenBucket
+from common.latest import LatestPrices
+from common.loader import load_items
+from common.metrics import metrics
+from fuel.market_cube import load_region_cube
+from fuel.prices import (INPUT_CSV, OUTPUT_DIR, REGIONS, _snapshot_rows, latest_prices, parse_prices_for_regions,
+                         save_region_prices)
+
+STATE_FILE = "scheduler_state.json"
+STATE_VERSION = 1
+METRICS_RUN = "scheduler"
+REQUESTS_PER_HOUR = 600
+MIN_INTERVAL = 15 * 60
+MAX_INTERVAL = 12 * 3600
+SCORE_SCALE = 2.0           # a score of SCORE_SCALE halves the refresh interval of a flat item
+RETRY_INTERVAL = 5 * 60
+RESCORE_SECONDS = 3600
+FLUSH_SECONDS = 300
+
+
+def refresh_interval(score: float, min_interval: float = MIN_INTERVAL, max_interval: float = MAX_INTERVAL) -> float:
+    return float(np.clip(max_interval / (1 + score / SCORE_SCALE), min_interval, max_interval))
+
+
+def _last_valid(x: np.ndarray) -> np.ndarray:
+    """Last non-NaN value along the time axis of a (time × region × item) array."""
+    flat = pd.DataFrame(x.reshape(x.shape[0], -1)).ffill()
+    return flat.iloc[-1].to_numpy(dtype=float).reshape(x.shape[1:])
+
+
+def volatility_scores(regions, prices_dir: str = OUTPUT_DIR) -> dict:
+    """{(region, item): score} from the daily cube: Volatility_7d as % of price plus |Daily_Change_%|."""
+    cube = load_region_cube(list(regions), prices_dir, fields=["Sell_Min", "Buy_Max"])
+    if not cube.regions:
+        return {}
+    price = _last_valid(cube.field("Sell_Min"))
+    volatility = _last_valid(cube.volatility())
+    change = _last_valid(cube.change_pct())
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score = np.nan_to_num(volatility / price * 100) + np.nan_to_num(np.abs(change))
+    return {(region, item): float(score[r, i])
+            for r, region in enumerate(cube.regions) for i, item in enumerate(cube.items)}
+
+
+class CollectionScheduler:
+    """Long-running collector refreshing (region, type_id) jobs from a priority queue.
+
+    A job is due `interval` seconds after its last refresh, and its interval shrinks with the
+    item's recent volatility and daily change in that region, so volatile inputs come back
+    often and flat ones rarely. Jobs are taken in due order within a global budget of
+    `requests_per_hour` page fetches. One appraisal page carries every region, so fetching
+    it refreshes all regions of that type_id at once.
+
+    Rows are buffered and saved every `flush_seconds`; job state is persisted to
+    `state_path` on every flush and on shutdown (SIGINT/SIGTERM), and picked up by the next
+    run. Jobs without state start from the latest-price table.
+    """
+
+    def __init__(self, regions=REGIONS, requests_per_hour: float = REQUESTS_PER_HOUR,
+                 min_interval: float = MIN_INTERVAL, max_interval: float = MAX_INTERVAL,
+                 state_path: str = STATE_FILE, items_csv: str = INPUT_CSV, flush_seconds: float = FLUSH_SECONDS):
+        self.regions = list(regions)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.state_path = state_path
+        self.flush_seconds = flush_seconds
+        df_items = load_items(items_csv)
+        self.items = {int(type_id): name for name, type_id in zip(df_items["Item"], df_items["ID"])}
+        # At most one minute's worth of budget in a burst
+        self.budget = TokenBucket(requests_per_hour / 3600, max(1.0, requests_per_hour / 60))
+        self.jobs = {}
+        self.heap = []
+        self.buffer = {region: [] for region in self.regions}
+        self.stopping = threading.Event()
+        self.load_state()
+
+    # --- Queue ---
+
+    def _push(self, key):
+        job = self.jobs[key]
+        job["version"] += 1
+        heapq.heappush(self.heap, (self.due(key), job["version"], key))
+
+    def due(self, key) -> float:
+        job = self.jobs[key]
+        if job.get("retry_at"):
+            return job["retry_at"]
+        return (job["last"] or 0.0) + job["interval"]
+
+    def _peek(self):
+        # Entries superseded by a later push are dropped lazily
+        while self.heap:
+            due, version, key = self.heap[0]
+            if version == self.jobs[key]["version"]:
+                return due, key
+            heapq.heappop(self.heap)
+        return None
+
+    def rescore(self):
+        scores = volatility_scores(self.regions)
+        for key, job in self.jobs.items():
+            region, type_id = key
+            job["interval"] = refresh_interval(scores.get((region, self.items[type_id]), 0.0),
+                                               self.min_interval, self.max_interval)
+            self._push(key)
+
+    # --- State ---
+
+    def load_state(self):
+        saved = {}
+        if os.path.exists(self.state_path):
+            with open(self.state_path, encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("version") == STATE_VERSION:
+                saved = state["jobs"]
+
+        known = {}
+        latest = LatestPrices(latest_prices.path).load(self.regions)
+        if not latest.empty:
+            stamps = pd.to_datetime(latest["Timestamp"], errors="coerce")
+            for region, item, stamp in zip(latest["Region"], latest["Item"], stamps):
+                if not pd.isna(stamp):
+                    known[(region, item)] = stamp.to_pydatetime().timestamp()
+
+        for type_id, name in self.items.items():
+            for region in self.regions:
+                job = saved.get(f"{region}|{type_id}", {})
+                self.jobs[(region, type_id)] = {
+                    "last": job.get("last", known.get((region, name))),
+                    "interval": job.get("interval", self.max_interval),
+                    "retry_at": None,
+                    "version": 0,
+                }
+
+    def save_state(self):
+        state = {"version": STATE_VERSION, "saved": datetime.now().isoformat(timespec="seconds"),
+                 "jobs": {f"{region}|{type_id}": {"last": job["last"], "interval": job["interval"]}
+                          for (region, type_id), job in self.jobs.items()}}
+        with open(f"{self.state_path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(f"{self.state_path}.tmp", self.state_path)
+
+    # --- Running ---
+
+    def refresh(self, type_id: int, session) -> bool:
+        timestamp = datetime.now()
+        by_region = parse_prices_for_regions(type_id, self.regions, session)
+        rows = dict(_snapshot_rows(by_region, self.items[type_id], type_id, timestamp.strftime("%Y-%m-%d %H:%M:%S")))
+        now = timestamp.timestamp()
+        for region in self.regions:
+            job = self.jobs[(region, type_id)]
+            if region in rows:
+                metrics.observe("scheduler_staleness_seconds", now - (job["last"] or now),
+                                buckets=(300, 900, 1800, 3600, 7200, 14400, 43200, 86400),
+                                help="Age of a job's previous snapshot when it is refreshed", region=region)
+                self.buffer[region].append(rows[region])
+                job["last"], job["retry_at"] = now, None
+            else:
+                job["retry_at"] = now + RETRY_INTERVAL
+            self._push((region, type_id))
+        metrics.inc("scheduler_fetches_total", help="Item pages fetched by the scheduler", ok=bool(rows))
+        return bool(rows)
+
+    def flush(self):
+        for region in self.regions:
+            if self.buffer[region]:
+                save_region_prices(region, self.buffer[region])
+                self.buffer[region] = []
+        self.save_state()
+        metrics.export(METRICS_RUN)
+
+    def stop(self, *_):
+        self.stopping.set()
+
+    def run(self, duration: float = None):
+        metrics.reset()
+        handlers = {}
+        if threading.current_thread() is threading.main_thread():
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                handlers[sig] = signal.signal(sig, self.stop)
+
+        started = time.monotonic()
+        next_rescore = next_flush = 0.0
+        print(f"=== Scheduling {len(self.jobs)} jobs ({len(self.items)} items × {len(self.regions)} regions) ===")
+        with CachingSession(HTTP_CACHE_DB, pool_size=1, rate_per_host=2.0, burst=1) as session:
+            try:
+                while not self.stopping.is_set():
+                    clock = time.monotonic()
+                    if duration is not None and clock - started >= duration:
+                        break
+                    if clock >= next_rescore:
+                        self.rescore()
+                        next_rescore = clock + RESCORE_SECONDS
+                    if clock >= next_flush:
+                        self.flush()
+                        next_flush = clock + self.flush_seconds
+
+                    head = self._peek()
+                    if head is None:
+                        break
+                    due, key = head
+                    # The budget is only charged once the job is due
+                    wait = due - time.time()
+                    if wait <= 0:
+                        wait = self.budget.try_acquire()
+                    if wait > 0:
+                        if duration is not None:
+                            wait = min(wait, started + duration - clock)
+                        self.stopping.wait(min(wait, next_flush - clock, next_rescore - clock))
+                        continue
+                    metrics.observe("scheduler_lateness_seconds", time.time() - due,
+                                    help="Time between a job falling due and its fetch")
+                    print(f"→ {self.items[key[1]]} ({key[1]}), due for {key[0]}")
+                    self.refresh(key[1], session)
+            finally:
+                self.flush()
+                print(session.stats.summary())
+                for sig, handler in handlers.items():
+                    signal.signal(sig, handler)
+        print(f"Scheduler stopped, state saved to {self.state_path}")
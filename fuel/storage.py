@@ -1,9 +1,10 @@
 import pandas as pd
 from datetime import datetime
-import matplotlib.pyplot as plt
-import matplotlib.ticker as mtick
+from common.loader import load_inventory, load_items
+from fuel.ledger import DATE_FORMAT, INCOMING, OUTGOING, STOCK_COLUMNS, InventoryLedger
 
 INVENTORY_CSV = "inventory.csv"
+INVENTORY_STATE = "inventory_state.json"
 ITEMS_CSV = "items.csv"
 
 pd.set_option('display.max_rows', None)
@@ -13,18 +14,15 @@ pd.set_option('display.width', None)
 
 
 def add_inventory_entry(item, operation, quantity, region, price, target):
-    df = pd.read_csv(INVENTORY_CSV)
-    items_df = pd.read_csv(ITEMS_CSV)
+    ledger = InventoryLedger(INVENTORY_CSV, INVENTORY_STATE)
+    items_df = load_items(ITEMS_CSV)
 
     item_volume_map = dict(zip(items_df["Item"], items_df["Volume"]))
 
-    today = datetime.today().strftime("%m/%d/%Y")
+    today = datetime.today().strftime(DATE_FORMAT)
 
     #OperationID
-    if df.empty:
-        operation_id = 1
-    else:
-        operation_id = df["OperationID"].max() + 1
+    operation_id = ledger.last_operation_id() + 1
 
     # Fees per unit
     volume_per_unit = item_volume_map.get(item, 0)
@@ -54,87 +52,91 @@ def add_inventory_entry(item, operation, quantity, region, price, target):
         "Grant Total": grant_total
     }
 
-    df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-
-    df.to_csv(INVENTORY_CSV, index=False)
+    ledger.append(new_row)
     print(f"Added {operation} for {item} on {today}")
-    print(df.tail(1))
+    print(pd.DataFrame([new_row], index=[operation_id - 1]))
+
+
+def stock_from_ledger(df: pd.DataFrame, target: str, method: str = "FIFO") -> pd.DataFrame:
+    method = method.upper()
+    df_target = df[df["Target"] == target]
+    incoming = df_target[df_target["Operation"] == INCOMING]
+    # observed=True: with a categorical Item (common.loader) only items present in the ledger count
+    out_qty = df_target.loc[df_target["Operation"] == OUTGOING].groupby("Item", observed=True)["Quantity"].sum()
+
+    if incoming.empty:
+        result_df = pd.DataFrame(columns=STOCK_COLUMNS)
+        result_df.name = f"{target}_{method}"
+        return result_df
+
+    lots = pd.DataFrame({
+        "Item": incoming["Item"].values,
+        "Quantity": incoming["Quantity"].values,
+        "Total": incoming["Total"].values,
+        "Fees": incoming["Fees"].values,
+        "Date": pd.to_datetime(incoming["Date"], format=DATE_FORMAT).values,
+        "OperationID": incoming["OperationID"].values,
+    })
+
+    if method == "AVERAGE":
+        lots["Cost"] = lots["Total"] * lots["Quantity"]
+        lots["Fee Cost"] = lots["Fees"] * lots["Quantity"]
+        grouped = lots.groupby("Item", observed=True)[["Quantity", "Cost", "Fee Cost"]].sum()
+        in_qty = grouped["Quantity"]
+        unit_cost = grouped["Cost"] / in_qty + grouped["Fee Cost"] / in_qty
+        remaining = (in_qty - out_qty.reindex(in_qty.index, fill_value=0)).clip(lower=0)
+    else:
+        # Outgoing goods always drain the queue from its head, so the units left in a lot
+        # only depend on the total shipped out and the units queued ahead of it.
+        # Lots booked on the same day keep ledger order for both FIFO and LIFO.
+        ascending = method == "FIFO"
+        lots = lots.sort_values(["Item", "Date", "OperationID"],
+                                ascending=[True, ascending, True], kind="stable")
+        queued = lots.groupby("Item", observed=True)["Quantity"].cumsum()
+        # Mapping a categorical can return a categorical of quantities
+        shipped = lots["Item"].map(out_qty).astype(float).fillna(0)
+        left = (queued - shipped).clip(lower=0, upper=lots["Quantity"])
+        lots["Left"] = left.astype(lots["Quantity"].dtype)
+        lots["Left Cost"] = lots["Left"] * lots["Total"]
+        grouped = lots.groupby("Item", observed=True)[["Left", "Left Cost"]].sum()
+        remaining = grouped["Left"]
+        unit_cost = (grouped["Left Cost"] / remaining).where(remaining > 0, 0.0)
+
+    items = remaining.index
+    if isinstance(items, pd.CategoricalIndex):
+        items = items.astype(items.categories.dtype)
+    result_df = pd.DataFrame({
+        "Item": items,
+        "Quantity": remaining.values,
+        "Unit Cost": unit_cost.values.astype(float),
+    })
+    result_df["Grant Total"] = result_df["Quantity"] * result_df["Unit Cost"]
+    result_df = result_df.sort_values("Item").reset_index(drop=True)
+    result_df.name = f"{target}_{method}"
+    return result_df
 
 
 def calculate_stock(target: str, method: str = "FIFO") -> pd.DataFrame:
-    df = pd.read_csv(INVENTORY_CSV)
-    df_target = df[df["Target"] == target].copy()
-
-    items = df_target["Item"].unique()
-    result_rows = []
-
-    for item in items:
-        incoming = df_target[(df_target["Item"] == item) &
-                             (df_target["Operation"] == "Incoming goods")].sort_values("Date")
-        outgoing = df_target[(df_target["Item"] == item) &
-                             (df_target["Operation"] == "Outgoing goods")].sort_values("Date")
-
-        if incoming.empty:
-            continue
-
-        if method.upper() == "AVERAGE":
-            total_units = incoming["Quantity"].sum()
-            avg_price = (incoming["Total"] * incoming["Quantity"]).sum() / total_units
-            avg_fees = (incoming["Fees"] * incoming["Quantity"]).sum() / total_units
-            unit_cost = avg_price + avg_fees
-        else:
-            ascending = True if method.upper() == "FIFO" else False
-            incoming_sorted = incoming.sort_values("Date", ascending=ascending)
-            incoming_list = incoming_sorted[["Quantity", "Total"]].to_dict("records")
-
-            qty_total = outgoing["Quantity"].sum() if not outgoing.empty else 0
-            for _, row in outgoing.iterrows():
-                qty_needed = row["Quantity"]
-                while qty_needed > 0 and incoming_list:
-                    batch = incoming_list[0]
-                    take_qty = min(batch["Quantity"], qty_needed)
-                    batch["Quantity"] -= take_qty
-                    qty_needed -= take_qty
-                    if batch["Quantity"] == 0:
-                        incoming_list.pop(0)
-
-            remaining_qty = sum(batch["Quantity"] for batch in incoming_list)
-            if remaining_qty > 0:
-                total_cost = sum(batch["Quantity"] * batch["Total"] for batch in incoming_list)
-                unit_cost = total_cost / remaining_qty
-            else:
-                remaining_qty = 0
-                unit_cost = 0
-
-        if method.upper() == "AVERAGE":
-            remaining_qty = incoming["Quantity"].sum() - outgoing["Quantity"].sum() if not outgoing.empty else incoming[
-                "Quantity"].sum()
-            remaining_qty = max(remaining_qty, 0)
-            unit_cost = unit_cost
-
-        grant_total = remaining_qty * unit_cost
-        result_rows.append({
-            "Item": item,
-            "Quantity": remaining_qty,
-            "Unit Cost": unit_cost,
-            "Grant Total": grant_total
-        })
-
-    result_df = pd.DataFrame(result_rows)
-    result_df = result_df.sort_values("Item").reset_index(drop=True)
-    result_df.name = f"{target}_{method.upper()}"
-    return result_df
+    # Replays only operations appended since the last checkpoint
+    return InventoryLedger(INVENTORY_CSV, INVENTORY_STATE).stock(target, method)
+
+
+def calculate_stock_full(target: str, method: str = "FIFO") -> pd.DataFrame:
+    df = load_inventory(INVENTORY_CSV)
+    return stock_from_ledger(df, target, method)
 
 
 def print_pretty_df(df: pd.DataFrame, title: str):
     print(f"\n{title}")
     print("=" * 80)
-    formatted = df.copy().applymap(lambda x: f"{x:,.2f}" if isinstance(x, (int, float)) else x)
+    formatted = df.copy().map(lambda x: f"{x:,.2f}" if isinstance(x, (int, float)) else x)
     print(formatted.to_string())
     print("=" * 80 + "\n")
 
 
 def plot_stock(stock_df: pd.DataFrame, title: str = None):
+    import matplotlib.pyplot as plt
+    import matplotlib.ticker as mtick
 
     if stock_df.empty:
         print("Пустой DataFrame, нечего отображать.")
@@ -165,12 +167,3 @@ def plot_stock(stock_df: pd.DataFrame, title: str = None):
 
     plt.tight_layout()
     plt.show()
-
-Anyed_fifo = calculate_stock(target="Anyed", method="FIFO")
-RYC_fifo = calculate_stock(target="RYC", method="FIFO")
-
-print_pretty_df(Anyed_fifo, "Anyed FIFO Stock")
-print_pretty_df(RYC_fifo, "RYC FIFO Stock")
-
-plot_stock(Anyed_fifo, title="Anyed FIFO Stock Overview")
-plot_stock(RYC_fifo, title="RYC FIFO Stock Overview")
@@ -0,0 +1,212 @@
+import io
+import json
+import os
+
+import pandas as pd
+
+from common.loader import load_prices
+
+STATE_FILE = ".timeline_state.json"
+FULL_TIMESERIES_CSV = "full_timeseries.csv"
+COMPARISON_CSV = "region_comparison_timeline.csv"
+ROLLING_WINDOW = 7
+MERGE_TOLERANCE = pd.Timedelta("12h")
+STATE_VERSION = 2
+# Row order of the two tables, the same whether they were rebuilt or updated
+FULL_ORDER = ["Timestamp", "Region", "Item"]
+COMPARISON_ORDER = ["Timestamp", "Item"]
+
+
+def add_derived_metrics(df_all: pd.DataFrame, tails: dict = None) -> pd.DataFrame:
+    """Add spread, daily change and 7-sample volatility columns.
+
+    `tails` holds the last Sell_Min values per (region, item) that precede df_all, so
+    the rolling metrics of new rows come out the same as over the full history.
+    """
+    df_all["Sell_Buy_Spread"] = df_all["Sell_Min"] - df_all["Buy_Max"]
+    df_all["Sell_Buy_%"] = (df_all["Sell_Buy_Spread"] / df_all["Buy_Max"]) * 100
+
+    work = df_all[["Region", "Item", "Sell_Min"]].assign(_new=True)
+    if tails:
+        seed = pd.DataFrame(
+            [(region, item, value) for region, items in tails.items()
+             for item, values in items.items() for value in values],
+            columns=["Region", "Item", "Sell_Min"]
+        ).assign(_new=False)
+        work = pd.concat([seed, work], ignore_index=True)
+
+    grouped = work.groupby(["Region", "Item"])["Sell_Min"]
+    work["Daily_Change_%"] = grouped.pct_change() * 100
+    work["Volatility_7d"] = grouped.transform(lambda x: x.rolling(ROLLING_WINDOW, min_periods=2).std())
+
+    new_rows = work[work["_new"]]
+    df_all["Daily_Change_%"] = new_rows["Daily_Change_%"].values
+    df_all["Volatility_7d"] = new_rows["Volatility_7d"].values
+    return df_all
+
+
+def compare_regions(df_jita: pd.DataFrame, df_cj: pd.DataFrame) -> pd.DataFrame:
+    merged = pd.merge_asof(
+        df_jita.sort_values("Timestamp"),
+        df_cj.sort_values("Timestamp"),
+        on="Timestamp",
+        by="Item",
+        suffixes=("_Jita", "_CJ"),
+        tolerance=MERGE_TOLERANCE,
+        direction="nearest"
+    )
+    merged["Sell_Diff"] = merged["Sell_Min_CJ"] - merged["Sell_Min_Jita"]
+    merged["Buy_Diff"] = merged["Buy_Max_CJ"] - merged["Buy_Max_Jita"]
+    return merged
+
+
+def _tails(df_all: pd.DataFrame, previous: dict = None) -> dict:
+    tails = {region: {item: list(values) for item, values in items.items()}
+             for region, items in (previous or {}).items()}
+    for (region, item), values in df_all.groupby(["Region", "Item"])["Sell_Min"]:
+        kept = tails.setdefault(region, {}).get(item, []) + values.tolist()
+        tails[region][item] = kept[-(ROLLING_WINDOW - 1):]
+    return tails
+
+
+def _append_by_timestamp(path: str, df: pd.DataFrame, columns: list, offsets: list):
+    """Append rows grouped by Timestamp, recording the byte offset where each group starts."""
+    write_header = not os.path.exists(path) or os.path.getsize(path) == 0
+    with open(path, "a", encoding="utf-8", newline="") as f:
+        if write_header:
+            f.write(",".join(columns) + "\n")
+        for timestamp, group in df.groupby("Timestamp", sort=True):
+            offsets.append([timestamp.isoformat(), f.tell()])
+            group[columns].to_csv(f, header=False, index=False)
+
+
+def _load_state(save_dir: str):
+    path = os.path.join(save_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        state = json.load(f)
+    if state.get("version") != STATE_VERSION:
+        return None
+    for name in (FULL_TIMESERIES_CSV, COMPARISON_CSV):
+        if not os.path.exists(os.path.join(save_dir, name)):
+            return None
+    return state
+
+
+def _save_state(save_dir: str, state: dict):
+    path = os.path.join(save_dir, STATE_FILE)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def _read_table(path: str) -> pd.DataFrame:
+    return load_prices(path, compact=False)
+
+
+def _sorted(df: pd.DataFrame, order: list) -> pd.DataFrame:
+    return df.sort_values(order, kind="stable").reset_index(drop=True)
+
+
+def rebuild_timeline(df_jita: pd.DataFrame, df_cj: pd.DataFrame, save_dir: str):
+    df_all = _sorted(add_derived_metrics(pd.concat([df_jita, df_cj], ignore_index=True)), FULL_ORDER)
+    merged = _sorted(compare_regions(df_jita, df_cj), COMPARISON_ORDER)
+
+    full_path = os.path.join(save_dir, FULL_TIMESERIES_CSV)
+    comparison_path = os.path.join(save_dir, COMPARISON_CSV)
+    for path in (full_path, comparison_path):
+        if os.path.exists(path):
+            os.remove(path)
+    full_offsets, comparison_offsets = [], []
+    _append_by_timestamp(full_path, df_all, list(df_all.columns), full_offsets)
+    _append_by_timestamp(comparison_path, merged, list(merged.columns), comparison_offsets)
+
+    _save_state(save_dir, {
+        "version": STATE_VERSION,
+        "last_timestamp": {region: group["Timestamp"].max().isoformat()
+                           for region, group in df_all.groupby("Region")},
+        "tails": _tails(df_all),
+        "full_offsets": full_offsets,
+        "comparison_offsets": comparison_offsets,
+    })
+    return df_all, merged
+
+
+def update_timeline(df_jita: pd.DataFrame, df_cj: pd.DataFrame, save_dir: str):
+    """Process only snapshots newer than the saved state and append their derived rows.
+
+    Falls back to a full rebuild when there is no usable state. Returns the full
+    derived timeseries and region comparison tables.
+    """
+    state = _load_state(save_dir)
+    if state is None:
+        print("No incremental timeline state, rebuilding derived tables")
+        return rebuild_timeline(df_jita, df_cj, save_dir)
+
+    full_path = os.path.join(save_dir, FULL_TIMESERIES_CSV)
+    comparison_path = os.path.join(save_dir, COMPARISON_CSV)
+
+    def newer(df, region):
+        last = state["last_timestamp"].get(region)
+        return df if last is None else df[df["Timestamp"] > pd.Timestamp(last)]
+
+    new_jita = newer(df_jita, "Jita")
+    new_cj = newer(df_cj, "C-J6MT")
+    if new_jita.empty and new_cj.empty:
+        print("Timeline is up to date")
+        return _read_table(full_path), _read_table(comparison_path)
+
+    full_columns = pd.read_csv(full_path, nrows=0).columns.tolist()
+    new_all = add_derived_metrics(pd.concat([new_jita, new_cj], ignore_index=True), state["tails"])
+    if set(full_columns) != set(new_all.columns):
+        print("Price columns changed, rebuilding derived tables")
+        return rebuild_timeline(df_jita, df_cj, save_dir)
+
+    # Usually every new snapshot is later than the file's last one and rows are only appended.
+    # Rows of the other region at or after the first new snapshot are read back and re-sorted
+    # in, their derived values unchanged.
+    full_offsets = state["full_offsets"]
+    keep_full = [entry for entry in full_offsets if pd.Timestamp(entry[0]) < new_all["Timestamp"].min()]
+    moved = full_offsets[len(keep_full):]
+    if moved:
+        with open(full_path, "r+", encoding="utf-8", newline="") as f:
+            f.seek(moved[0][1])
+            tail = pd.read_csv(io.StringIO(f.read()), names=full_columns, float_precision="round_trip")
+            f.truncate(moved[0][1])
+        tail["Timestamp"] = pd.to_datetime(tail["Timestamp"])
+        rewrite = pd.concat([tail, new_all[full_columns]], ignore_index=True)
+    else:
+        rewrite = new_all
+    _append_by_timestamp(full_path, _sorted(rewrite, FULL_ORDER), full_columns, keep_full)
+
+    # Comparison rows are keyed on Jita snapshots: a new C-J6MT snapshot can change the
+    # nearest match of Jita rows up to MERGE_TOLERANCE before it, so those are redone
+    starts = []
+    if not new_jita.empty:
+        starts.append(new_jita["Timestamp"].min())
+    if not new_cj.empty:
+        starts.append(new_cj["Timestamp"].min() - MERGE_TOLERANCE)
+    cutoff = min(starts)
+
+    offsets = state["comparison_offsets"]
+    keep = [entry for entry in offsets if pd.Timestamp(entry[0]) < cutoff]
+    drop = offsets[len(keep):]
+    comparison_columns = pd.read_csv(comparison_path, nrows=0).columns.tolist()
+    if drop:
+        with open(comparison_path, "r+", encoding="utf-8") as f:
+            f.truncate(drop[0][1])
+
+    redo = _sorted(compare_regions(df_jita[df_jita["Timestamp"] >= cutoff],
+                                   df_cj[df_cj["Timestamp"] >= cutoff - MERGE_TOLERANCE]), COMPARISON_ORDER)
+    _append_by_timestamp(comparison_path, redo, comparison_columns, keep)
+
+    for region, group in new_all.groupby("Region"):
+        state["last_timestamp"][region] = group["Timestamp"].max().isoformat()
+    state["tails"] = _tails(new_all, state["tails"])
+    state["full_offsets"] = keep_full
+    state["comparison_offsets"] = keep
+    _save_state(save_dir, state)
+    print(f"Timeline updated: {len(new_all)} new rows, {len(redo)} comparison rows recomputed")
+
+    return _read_table(full_path), _read_table(comparison_path)
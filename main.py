@@ -1,5 +1,266 @@
+import argparse
+import contextlib
+import os
+import shutil
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+FUEL_DIR = os.path.join(ROOT, "fuel")
+TRADE_DIR = os.path.join(ROOT, "trade")
+
+# Data files are referenced relative to fuel/ and trade/; every command runs from its directory
+sys.path.insert(0, ROOT)
+
+
+def cmd_collect(args):
+    if args.source == "ore":
+        from trade.ore import get_all_prices
+        with contextlib.chdir(TRADE_DIR):
+            get_all_prices()
+        return
+
+    from fuel.prices import get_all_prices
+    kwargs = {"max_workers": args.workers} if args.concurrent else {}
+    with contextlib.chdir(FUEL_DIR):
+        get_all_prices(concurrent=args.concurrent, **kwargs)
+
+
+def cmd_schedule(args):
+    from fuel.prices import REGIONS
+    from fuel.scheduler import CollectionScheduler
+    with contextlib.chdir(FUEL_DIR):
+        scheduler = CollectionScheduler(args.regions or REGIONS, requests_per_hour=args.budget,
+                                        min_interval=args.min_interval * 60, max_interval=args.max_interval * 60)
+        scheduler.run(duration=args.duration * 60 if args.duration else None)
+
+
+def cmd_stock(args):
+    from fuel.storage import calculate_stock, print_pretty_df, plot_stock
+    with contextlib.chdir(FUEL_DIR):
+        stock_df = calculate_stock(target=args.target, method=args.method)
+    print_pretty_df(stock_df, f"{args.target} {args.method.upper()} Stock")
+    if args.plot:
+        plot_stock(stock_df, title=f"{args.target} {args.method.upper()} Stock Overview")
+
+
+def cmd_add(args):
     from fuel.storage import add_inventory_entry
+    with contextlib.chdir(FUEL_DIR):
+        add_inventory_entry(args.item, args.operation, args.quantity, args.region, args.price, args.target)
+
+
+def cmd_production(args):
+    from fuel.production import anyed_production_cost, ryc_production_cost
+    with contextlib.chdir(FUEL_DIR):
+        if args.target in ("all", "anyed"):
+            anyed_production_cost(plot=args.plot, compare=args.compare, risk=args.risk)
+        if args.target in ("all", "ryc"):
+            ryc_production_cost(plot=args.plot, compare=args.compare, risk=args.risk)
+
+
+def cmd_shipping(args):
+    from fuel.cargo import compare_buy_prices_with_shipping
+    with contextlib.chdir(FUEL_DIR):
+        compare_buy_prices_with_shipping(shipping_cost_per_m3=args.cost_per_m3)
+
+
+def cmd_ore(args):
+    from trade.ore import compare_buy_profit, ores_profit_analysis
+    with contextlib.chdir(TRADE_DIR):
+        if args.minerals:
+            compare_buy_profit(
+                minerals_csv="minerals.csv",
+                jita_csv="prices/mineral_min_prices_jita.csv",
+                cj_csv="prices/mineral_min_prices_C-J6MT.csv"
+            )
+        else:
+            ores_profit_analysis(
+                ores_csv="ores.csv",
+                minerals_csv="minerals.csv",
+                ore_jita_csv="prices/ore_min_prices_jita.csv",
+                mineral_cj_csv="prices/mineral_min_prices_C-J6MT.csv"
+            )
+
+
+def cmd_orders(args):
+    from trade.orders import export_top_items
+    with contextlib.chdir(TRADE_DIR):
+        export_top_items(region_id=args.region_id, top_n=args.top)
+
+
+def cmd_refine(args):
+    from trade.ore import REGIONS
+    from trade.refining import refining_sweep
+    with contextlib.chdir(TRADE_DIR):
+        ranked = refining_sweep(args.regions or REGIONS, yields=args.yields, delivery_cost_per_m3=args.cost_per_m3)
+    print(ranked.head(args.top).to_string(index=False))
+
+
+def cmd_mix(args):
+    import pandas as pd
+    from trade.mix import OreMixSolver
+    demand = {}
+    for pair in args.demand:
+        mineral, _, quantity = pair.partition("=")
+        demand[mineral] = float(quantity)
+    with contextlib.chdir(TRADE_DIR):
+        solver = OreMixSolver(pd.read_csv("ores.csv"), pd.read_csv(f"prices/ore_min_prices_{args.region}.csv"),
+                              yield_=args.yield_)
+    result = solver.solve(demand, cargo_m3=args.cargo, integer=args.integer)
+    if result["plan"] is None:
+        print(f"No purchase mix: {result['status']}")
+        return
+    print(f"Total cost: {result['total_cost']:,.0f} ISK")
+    print(result["plan"].to_string(index=False))
+    print(result["minerals"].to_string(index=False))
+
+
+def cmd_analyze(args):
+    from fuel.prices import analyze_market_timeline
+    with contextlib.chdir(FUEL_DIR):
+        analyze_market_timeline(incremental=args.incremental)
+
+
+def cmd_cube(args):
+    from fuel.market_cube import analyze_market_cube
+    from fuel.prices import REGIONS
+    with contextlib.chdir(FUEL_DIR):
+        analyze_market_cube(args.regions or REGIONS, freq=args.freq)
+
+
+def cmd_history(args):
+    from common.pricecube import CUBE_DIR, PriceCubeStore
+    from fuel.prices import history_store
+    with contextlib.chdir(FUEL_DIR):
+        store = PriceCubeStore(CUBE_DIR)
+        if args.build or not store.regions:
+            store = PriceCubeStore(CUBE_DIR + ".new")
+            store.build_from_history(history_store)
+            if os.path.isdir(CUBE_DIR):
+                shutil.rmtree(CUBE_DIR)
+            os.replace(CUBE_DIR + ".new", CUBE_DIR)
+            store = PriceCubeStore(CUBE_DIR)
+        history = store.history(args.region, args.item, start=args.start, end=args.end, fields=args.fields)
+    print(history.to_string(index=False))
+
+
+def cmd_arbitrage(args):
+    import pandas as pd
+    from common.arbitrage import scan_arbitrage
+    from common.loader import load_items
+    if args.source == "ore":
+        with contextlib.chdir(TRADE_DIR):
+            latest = pd.read_csv("prices/latest.csv")
+            minerals = pd.read_csv("minerals.csv").set_index("Mineral")["Volume"]
+            ores = pd.read_csv("ores.csv").set_index("Ore Type")["m3"]
+        volumes, key = pd.concat([minerals, ores]), "Name"
+    else:
+        with contextlib.chdir(FUEL_DIR):
+            latest = pd.read_csv("prices/latest.csv")
+            volumes, key = load_items("items.csv").set_index("Item")["Volume"], "Item"
+
+    result = scan_arbitrage(latest, volumes, default_cost=args.cost_per_m3, key=key,
+                            buy_column=args.buy, sell_column=args.sell, top_k=args.top)
+    print(result.to_string(index=False))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="evetrade", description="EVE fuel and ore trading tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("collect", help="collect appraisal prices")
+    p.add_argument("--source", choices=["fuel", "ore"], default="fuel")
+    p.add_argument("--concurrent", action="store_true", help="fetch items in parallel (fuel only)")
+    p.add_argument("--workers", type=int, default=8)
+    p.set_defaults(func=cmd_collect)
+
+    p = sub.add_parser("schedule", help="keep prices fresh, volatile items first, until stopped (Ctrl+C)")
+    p.add_argument("--regions", nargs="+")
+    p.add_argument("--budget", type=float, default=600, help="page fetches per hour across all jobs")
+    p.add_argument("--min-interval", type=float, default=15, help="minutes between refreshes of the most volatile items")
+    p.add_argument("--max-interval", type=float, default=720, help="minutes between refreshes of flat items")
+    p.add_argument("--duration", type=float, help="stop after this many minutes")
+    p.set_defaults(func=cmd_schedule)
+
+    p = sub.add_parser("stock", help="show remaining stock valuation")
+    p.add_argument("--target", default="RYC")
+    p.add_argument("--method", default="FIFO", choices=["FIFO", "LIFO", "AVERAGE", "fifo", "lifo", "average"])
+    p.add_argument("--plot", action="store_true")
+    p.set_defaults(func=cmd_stock)
+
+    p = sub.add_parser("add", help="append an inventory operation")
+    p.add_argument("item")
+    p.add_argument("operation", choices=["Incoming goods", "Outgoing goods"])
+    p.add_argument("quantity", type=int)
+    p.add_argument("region")
+    p.add_argument("price", type=float)
+    p.add_argument("target")
+    p.set_defaults(func=cmd_add)
+
+    p = sub.add_parser("production", help="fuel block production cost")
+    p.add_argument("--target", choices=["all", "anyed", "ryc"], default="all")
+    p.add_argument("--plot", action="store_true")
+    p.add_argument("--compare", action="store_true", help="unit cost under FIFO, LIFO, AVERAGE and market prices")
+    p.add_argument("--risk", action="store_true", help="Monte Carlo margin quantiles from price history")
+    p.set_defaults(func=cmd_production)
+
+    p = sub.add_parser("shipping", help="buy fuel inputs in C-J6MT or ship them from Jita, at latest prices")
+    p.add_argument("--cost-per-m3", type=float, default=1200)
+    p.set_defaults(func=cmd_shipping)
+
+    p = sub.add_parser("ore", help="ore refining / mineral trade profit")
+    p.add_argument("--minerals", action="store_true", help="compare mineral buy prices instead of ore refining")
+    p.set_defaults(func=cmd_ore)
+
+    p = sub.add_parser("orders", help="most traded item types by ESI order volume, saved to trade/top_10000_items.csv")
+    p.add_argument("--region-id", type=int, default=10000002, help="ESI region id (default: The Forge)")
+    p.add_argument("--top", type=int, default=10000)
+    p.set_defaults(func=cmd_orders)
+
+    p = sub.add_parser("refine", help="rank ore refining over buy regions × sell regions × yields")
+    p.add_argument("--regions", nargs="+", help="regions with ore/mineral price files (default: all collected)")
+    p.add_argument("--yields", nargs="+", type=float, default=[0.8])
+    p.add_argument("--cost-per-m3", type=float, default=1200)
+    p.add_argument("--top", type=int, default=30)
+    p.set_defaults(func=cmd_refine)
+
+    p = sub.add_parser("mix", help="cheapest ore purchase covering a mineral shopping list")
+    p.add_argument("demand", nargs="+", help="Mineral=quantity, e.g. Tritanium=1000000")
+    p.add_argument("--region", default="jita", help="region whose ore prices are used")
+    p.add_argument("--cargo", type=float, help="compressed cargo cap in m3")
+    p.add_argument("--yield", dest="yield_", type=float, default=0.8)
+    p.add_argument("--integer", action="store_true", help="whole refining portions only")
+    p.set_defaults(func=cmd_mix)
+
+    p = sub.add_parser("analyze", help="market timeline analysis and charts")
+    p.add_argument("--incremental", action="store_true", help="only derive metrics for new snapshots")
+    p.set_defaults(func=cmd_analyze)
+
+    p = sub.add_parser("cube", help="metrics across any set of regions on an aligned price cube")
+    p.add_argument("--regions", nargs="+", help="regions to load (default: all collected)")
+    p.add_argument("--freq", default="1D", help="time bucket size, pandas offset alias")
+    p.set_defaults(func=cmd_cube)
+
+    p = sub.add_parser("history", help="one item's price history in one region from the memory-mapped cube")
+    p.add_argument("item")
+    p.add_argument("--region", default="jita")
+    p.add_argument("--start", help="first timestamp, e.g. 2025-11-01")
+    p.add_argument("--end")
+    p.add_argument("--fields", nargs="+", default=["Sell_Min", "Buy_Max"])
+    p.add_argument("--build", action="store_true", help="rebuild the cube from the price history first")
+    p.set_defaults(func=cmd_history)
+
+    p = sub.add_parser("arbitrage", help="top inter-region opportunities from the latest prices")
+    p.add_argument("--source", choices=["fuel", "ore"], default="fuel")
+    p.add_argument("--cost-per-m3", type=float, default=1200)
+    p.add_argument("--buy", default="Buy_Max", help="price column paid in the source region")
+    p.add_argument("--sell", default="Buy_Max", help="price column received in the destination region")
+    p.add_argument("--top", type=int, default=20)
+    p.set_defaults(func=cmd_arbitrage)
+
+    return parser
+
 
-# add_inventory_entry("Heavy Water", "Incoming goods", 1000, "Jita", 500.0, "RYC")
-# add_inventory_entry("Oxygen", "Outgoing goods", 13398, "", 0, "Anyed")
-add_inventory_entry("Heavy Water", "Incoming goods", 460288, "C-J6MT", 23.03, "RYC")
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    args.func(args)
@@ -0,0 +1,168 @@
+import http.server
+import json
+import random
+import threading
+import time
+
+REGIONS = ["C-J6MT", "UALX-3", "jita", "amarr", "dodixie"]
+SELL_STATS = ["Min", "Median", "Average", "1st Percentile", "Standard Deviation"]
+BUY_STATS = ["Max", "Median", "Average", "99th Percentile", "Standard Deviation"]
+
+
+class StubServer(http.server.ThreadingHTTPServer):
+    """Local HTTP server on a free port, serving from a background thread while in a `with` block."""
+
+    daemon_threads = True
+
+    def __init__(self, handler):
+        super().__init__(("127.0.0.1", 0), handler)
+        self.hits = []
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def record(self, path: str):
+        with self.lock:
+            self.hits.append(path)
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def reply(self, status: int, body: bytes, headers: dict = None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def appraisal_prices(type_id: int, region: str) -> dict:
+    """The (sell, buy) tables the appraisal stub serves for one item and region."""
+    rnd = random.Random(f"{type_id}/{region}")
+    return ({k: round(rnd.uniform(1, 20_000), 2) for k in SELL_STATS},
+            {k: round(rnd.uniform(1, 20_000), 2) for k in BUY_STATS})
+
+
+def appraisal_page(type_id: int, regions=REGIONS) -> str:
+    out = ["<html><body><ul class='tabs'>"]
+    out += [f"<li><a href='#{r}'>{r}</a></li>" for r in regions]
+    out.append("</ul>")
+    for region in regions:
+        sell, buy = appraisal_prices(type_id, region)
+        out.append(f"<div id='{region}' class='tab'><h3>Sell</h3><table>")
+        out += [f"<tr><th>{k}</th><td>{v:,.2f} ISK</td></tr>" for k, v in sell.items()]
+        out.append("</table><h3>Buy</h3><table>")
+        out += [f"<tr><th>{k}</th><td>{v:,.2f} ISK</td></tr>" for k, v in buy.items()]
+        out.append("</table></div>")
+    out.append("</body></html>")
+    return "\n".join(out)
+
+
+class AppraisalServer(StubServer):
+    """Item pages at /item/<type_id>; ids in `failing` answer `status`, ids in `delays` wait that many seconds."""
+
+    def __init__(self, failing=(), status=500, delays=None):
+        super().__init__(AppraisalHandler)
+        self.failing = set(failing)
+        self.status = status
+        self.delays = delays or {}
+
+    @property
+    def url(self) -> str:
+        return self.base_url + "/item/{}"
+
+
+class AppraisalHandler(StubHandler):
+    def do_GET(self):
+        self.server.record(self.path)
+        type_id = int(self.path.rstrip("/").split("/")[-1])
+        time.sleep(self.server.delays.get(type_id, 0))
+        if type_id in self.server.failing:
+            self.reply(self.server.status, b"upstream error")
+        else:
+            self.reply(200, appraisal_page(type_id).encode(), {"Content-Type": "text/html; charset=utf-8"})
+
+
+class EsiServer(StubServer):
+    """Paged /markets/<region>/orders/ plus POST /universe/names/.
+
+    `pages` maps page number to its order list; pages in `failing` answer 500 and pages
+    in `malformed` return a truncated JSON body.
+    """
+
+    def __init__(self, pages: dict, failing=(), malformed=()):
+        super().__init__(EsiHandler)
+        self.pages = pages
+        self.failing = set(failing)
+        self.malformed = set(malformed)
+
+    @property
+    def url(self) -> str:
+        return self.base_url + "/latest"
+
+
+class EsiHandler(StubHandler):
+    def do_GET(self):
+        self.server.record(self.path)
+        page = int(self.path.split("page=")[-1]) if "page=" in self.path else 1
+        headers = {"X-Pages": str(len(self.server.pages)), "Content-Type": "application/json"}
+        if page in self.server.failing:
+            self.reply(500, b'{"error": "Internal server error"}', headers)
+        elif page in self.server.malformed:
+            self.reply(200, json.dumps(self.server.pages[page]).encode()[:50], headers)
+        elif page in self.server.pages:
+            self.reply(200, json.dumps(self.server.pages[page]).encode(), headers)
+        else:
+            self.reply(404, b'{"error": "Requested page does not exist!"}', headers)
+
+    def do_POST(self):
+        self.server.record("POST " + self.path)
+        ids = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        names = [{"id": i, "name": f"Type {i}", "category": "inventory_type"} for i in ids]
+        self.reply(200, json.dumps(names).encode(), {"Content-Type": "application/json"})
+
+
+class CacheServer(StubServer):
+    """One document whose validators and cache headers are sent in lower case, as some CDNs do.
+
+    Answers 304 when If-None-Match matches `etag`; bump `etag` to make the next revalidation
+    carry a new one. `max_age` (seconds) adds a cache-control header.
+    """
+
+    def __init__(self, etag: str = '"v1"', max_age: int = None):
+        super().__init__(CacheHandler)
+        self.etag = etag
+        self.max_age = max_age
+        self.body = b'{"price": 1}'
+
+    @property
+    def url(self) -> str:
+        return self.base_url + "/doc"
+
+
+class CacheHandler(StubHandler):
+    def do_GET(self):
+        self.server.record(self.path)
+        headers = {"etag": self.server.etag, "content-type": "application/json"}
+        if self.server.max_age is not None:
+            headers["cache-control"] = f"max-age={self.server.max_age}"
+        if self.headers.get("If-None-Match") == self.server.etag:
+            self.reply(304, b"", headers)
+        else:
+            self.reply(200, self.server.body, headers)
@@ -0,0 +1,16 @@
+import pytest
+import requests
+
+from common.appraisal import PageCache, fetch_item_page
+from stubs import AppraisalServer
+
+
+def test_page_cache_keeps_sites_apart():
+    cache = PageCache()
+    with AppraisalServer() as first, AppraisalServer(failing={3683}, status=404) as second:
+        html = fetch_item_page(3683, url=first.url, cache=cache)
+        assert fetch_item_page(3683, url=first.url, cache=cache) == html
+        # Same type_id, other site: not served from the first site's entry
+        with pytest.raises(requests.HTTPError):
+            fetch_item_page(3683, url=second.url, cache=cache)
+    assert (len(first.hits), len(second.hits)) == (1, 1)
@@ -0,0 +1,46 @@
+import pandas as pd
+import pytest
+
+import fuel.prices
+from common.appraisal import page_cache
+from common.metrics import metrics
+from fuel.prices import collect_prices_concurrently
+from stubs import AppraisalServer, appraisal_prices
+
+ITEMS = {"Oxygen": 3683, "Coolant": 9832, "Heavy Water": 16272, "Liquid Ozone": 16273,
+         "Helium Isotopes": 16274, "Strontium Clathrates": 16275, "Oxygen Isotopes": 17887,
+         "Nitrogen Isotopes": 17888}
+FAILING = {9832, 16275}
+REGIONS = ["jita", "C-J6MT"]
+
+
+@pytest.fixture
+def checkout(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    pd.DataFrame({"Item": list(ITEMS), "ID": list(ITEMS.values())}).to_csv("items.csv", index=False)
+    page_cache.clear()
+    yield tmp_path
+    page_cache.clear()
+    metrics.reset()
+
+
+def test_rows_keep_item_order_and_one_timestamp(checkout, monkeypatch):
+    # Earlier items answer later, so pages complete in reverse order
+    delays = {type_id: 0.05 * (len(ITEMS) - pos) for pos, type_id in enumerate(ITEMS.values())}
+    with AppraisalServer(failing=FAILING, status=404, delays=delays) as server:
+        monkeypatch.setattr(fuel.prices, "BASE_URL", server.url)
+        collect_prices_concurrently(REGIONS, max_workers=8, rate_per_host=None)
+        errors = metrics.to_dict()["counters"]["item_errors_total"]
+
+    assert len(server.hits) == len(ITEMS)
+    expected = [item for item, type_id in ITEMS.items() if type_id not in FAILING]
+    timestamps = set()
+    for region in REGIONS:
+        saved = pd.read_csv(f"prices/prices_{region}.csv")
+        assert saved["Item"].tolist() == expected
+        timestamps.update(saved["Timestamp"])
+        sell, _ = appraisal_prices(ITEMS["Oxygen"], region)
+        assert saved.loc[0, "Sell_Min"] == sell["Min"]
+    assert len(timestamps) == 1
+
+    assert [(e["labels"]["error"], e["value"]) for e in errors] == [("HTTPError", len(FAILING))]
@@ -0,0 +1,70 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from common.http import CachingSession, PooledSession
+from common.metrics import MetricsRegistry
+from stubs import CacheServer
+
+
+@pytest.fixture
+def session(tmp_path):
+    with CachingSession(cache_path=str(tmp_path / "cache.sqlite"), metrics=MetricsRegistry()) as s:
+        yield s
+
+
+def test_lowercase_max_age_is_a_fresh_hit(session):
+    with CacheServer(max_age=60) as server:
+        first = session.get(server.url)
+        second = session.get(server.url)
+    assert len(server.hits) == 1
+    assert second.content == first.content
+    assert second.headers["ETag"] == '"v1"'
+    assert (session.stats.downloads, session.stats.fresh_hits) == (1, 1)
+
+
+def test_lowercase_etag_revalidates_and_refreshes_validators(session):
+    with CacheServer() as server:
+        session.get(server.url)
+        assert session.cache.get(server.url)["etag"] == '"v1"'
+
+        assert session.get(server.url).content == server.body
+        assert session.stats.revalidated == 1
+
+        server.etag = '"v2"'
+        session.get(server.url)
+        assert session.stats.downloads == 2
+
+        server.max_age = 0
+        session.get(server.url)
+    entry = session.cache.get(server.url)
+    assert (entry["etag"], entry["headers"]["Cache-Control"]) == ('"v2"', "max-age=0")
+    assert session.stats.revalidated == 2
+
+
+def test_network_time_excludes_rate_limit_waits(session):
+    session.rate_per_host, session.burst = 4.0, 1.0
+    with CacheServer() as server:
+        start = time.perf_counter()
+        for _ in range(5):
+            session.get(server.url + f"?n={_}")
+        wall = time.perf_counter() - start
+    assert wall >= 0.9
+    assert session.stats.network_seconds < wall / 3
+
+
+def test_slot_released_when_request_raises():
+    session = PooledSession(rate_per_host=None, metrics=MetricsRegistry())
+    calls = threading.local()
+
+    def broken(*args, **kwargs):
+        calls.n = getattr(calls, "n", 0) + 1
+        raise KeyboardInterrupt if calls.n == 1 else requests.exceptions.InvalidURL("bad")
+
+    session.session.request = broken
+    for _ in range(2):
+        with pytest.raises((KeyboardInterrupt, requests.exceptions.InvalidURL)):
+            session.get("http://127.0.0.1:9/doc")
+    assert session.controller("http://127.0.0.1:9/doc").inflight == 0
@@ -0,0 +1,85 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from benchmarks import synthetic
+from fuel.ledger import METHODS, InventoryLedger
+from fuel.storage import stock_from_ledger
+
+TARGETS = ("Anyed", "RYC")
+
+
+def full_stock(path, target, method):
+    return stock_from_ledger(pd.read_csv(path), target, method)
+
+
+def assert_same_stock(ledger, path):
+    for target in TARGETS:
+        for method in METHODS:
+            pd.testing.assert_frame_equal(ledger.stock(target, method), full_stock(path, target, method),
+                                          check_dtype=False, rtol=1e-9)
+
+
+@pytest.fixture
+def rows():
+    return synthetic.inventory_ledger(synthetic.BASE_LEDGER_ROWS * 3)
+
+
+@pytest.fixture
+def ledger(tmp_path, rows):
+    path = tmp_path / "inventory.csv"
+    rows.iloc[:len(rows) // 2].to_csv(path, index=False)
+    ledger = InventoryLedger(str(path), str(tmp_path / "inventory_state.json"))
+    ledger.rebuild()
+    return ledger
+
+
+def test_appends_match_full_replay(ledger, rows):
+    for start in range(len(rows) // 2, len(rows), 40):
+        for row in rows.iloc[start:start + 40].to_dict("records"):
+            ledger.append(row)
+        assert_same_stock(ledger, ledger.path)
+
+
+def test_backdated_lot_matches_full_replay(ledger, rows):
+    assert_same_stock(ledger, ledger.path)
+    backdated = rows.iloc[0].to_dict()
+    backdated["OperationID"] = ledger.last_operation_id() + 1
+    ledger.append(backdated)
+    assert_same_stock(ledger, ledger.path)
+
+
+def test_edited_history_discards_checkpoint(ledger):
+    assert_same_stock(ledger, ledger.path)
+    df = pd.read_csv(ledger.path)
+    df.loc[len(df) - 1, "Quantity"] += 1
+    df.to_csv(ledger.path, index=False)
+    assert_same_stock(ledger, ledger.path)
+
+
+def test_interrupted_lot_write_is_ignored(ledger, rows):
+    state = ledger.refresh()
+    for item_state in state["targets"]["RYC"].values():
+        with open(os.path.join(ledger.lots_dir, item_state["file"]), "ab") as f:
+            f.write(b"\xff" * 100)
+    for row in rows.iloc[len(rows) // 2:len(rows) // 2 + 40].to_dict("records"):
+        ledger.append(row)
+    assert_same_stock(ledger, ledger.path)
+
+
+def test_missing_lots_rebuild_checkpoint(ledger):
+    shutil.rmtree(ledger.lots_dir)
+    assert_same_stock(ledger, ledger.path)
+
+
+def test_last_operation_id_with_multibyte_text(tmp_path, rows):
+    path = tmp_path / "inventory.csv"
+    rows = rows.iloc[:200].assign(Region="Ĵita ✓ " * 40)
+    rows.to_csv(path, index=False)
+    ledger = InventoryLedger(str(path), str(tmp_path / "inventory_state.json"))
+    assert ledger.last_operation_id() == rows["OperationID"].iloc[-1]
+
+    rows.iloc[:0].to_csv(path, index=False)
+    assert ledger.last_operation_id() == 0
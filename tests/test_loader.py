@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks import synthetic
+from common.loader import TableCache, load_inventory, load_prices
+from fuel.ledger import METHODS, InventoryLedger
+from fuel.storage import stock_from_ledger
+
+TARGETS = ("Anyed", "RYC")
+
+
+@pytest.fixture
+def inventory_csv(tmp_path):
+    path = tmp_path / "inventory.csv"
+    synthetic.inventory_ledger(synthetic.BASE_LEDGER_ROWS * 3).to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture
+def prices_csv(tmp_path):
+    path = tmp_path / "prices_jita.csv"
+    synthetic.price_history(synthetic.BASE_SNAPSHOTS, regions=["jita"])["jita"].to_csv(path, index=False)
+    return path
+
+
+def test_typed_inventory_gives_the_same_stock(inventory_csv):
+    typed = load_inventory(str(inventory_csv), cache=None)
+    assert isinstance(typed["Item"].dtype, pd.CategoricalDtype)
+    plain = pd.read_csv(inventory_csv)
+    for target in TARGETS:
+        for method in METHODS:
+            pd.testing.assert_frame_equal(stock_from_ledger(typed, target, method),
+                                          stock_from_ledger(plain, target, method))
+
+
+def test_full_stock_matches_incremental_ledger(tmp_path, inventory_csv):
+    ledger = InventoryLedger(str(inventory_csv), str(tmp_path / "inventory_state.json"))
+    typed = load_inventory(str(inventory_csv), cache=None)
+    for target in TARGETS:
+        for method in METHODS:
+            pd.testing.assert_frame_equal(stock_from_ledger(typed, target, method), ledger.stock(target, method),
+                                          check_dtype=False, rtol=1e-9)
+
+
+def test_price_precision(prices_csv):
+    plain = pd.read_csv(prices_csv)
+    full = load_prices(str(prices_csv), compact=False, cache=None)
+    compact = load_prices(str(prices_csv), cache=None)
+    assert full["Timestamp"].equals(pd.to_datetime(plain["Timestamp"]))
+    assert compact["Sell_Min"].dtype == np.float32
+    np.testing.assert_array_equal(full["Sell_Min"].to_numpy(), plain["Sell_Min"].to_numpy())
+    np.testing.assert_allclose(compact["Sell_Min"].to_numpy(), plain["Sell_Min"].to_numpy(), rtol=1e-6)
+
+
+def test_cache_follows_appends(prices_csv):
+    cache = TableCache()
+    first = load_prices(str(prices_csv), compact=False, cache=cache)
+    copy = load_prices(str(prices_csv), compact=False, cache=cache)
+    copy["Sell_Min"] = 0.0
+    pd.testing.assert_frame_equal(load_prices(str(prices_csv), compact=False, cache=cache), first)
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    more = synthetic.price_history(synthetic.BASE_SNAPSHOTS + 1, regions=["jita"], seed=1)["jita"].tail(16)
+    more.to_csv(prices_csv, mode="a", header=False, index=False)
+    reloaded = load_prices(str(prices_csv), compact=False, cache=cache)
+    assert len(reloaded) == len(first) + len(more)
+    pd.testing.assert_frame_equal(reloaded, load_prices(str(prices_csv), compact=False, cache=None))
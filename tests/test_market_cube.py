@@ -0,0 +1,23 @@
+import numpy as np
+
+from benchmarks import synthetic
+from fuel.market_cube import MarketCube, load_region_cube
+
+
+def test_no_history_gives_an_empty_cube(tmp_path):
+    cube = load_region_cube(["jita", "C-J6MT"], prices_dir=str(tmp_path / "prices"),
+                            history_dir=str(tmp_path / "history"))
+    assert (cube.times.empty, cube.regions, cube.items) == (True, [], [])
+    assert cube.values.shape == (0, 0, 0, len(cube.fields))
+    assert cube.to_frame().empty
+    assert cube.latest_region_diff().empty
+
+
+def test_cube_matches_frames():
+    frames = synthetic.price_history(synthetic.BASE_SNAPSHOTS, regions=["jita", "amarr"])
+    cube = MarketCube.from_frames(frames)
+    assert sorted(cube.regions) == ["amarr", "jita"]
+    assert len(cube.times) == synthetic.BASE_SNAPSHOTS
+    jita = frames["jita"]
+    last = jita[jita["Timestamp"] == jita["Timestamp"].max()].set_index("Item")["Sell_Min"]
+    np.testing.assert_array_equal(cube.field("Sell_Min")[-1, cube.regions.index("jita")], last.reindex(cube.items).to_numpy())
@@ -0,0 +1,47 @@
+import pytest
+
+import trade.orders
+from common.http import CachingSession
+from common.metrics import metrics
+from stubs import EsiServer
+from trade.orders import fetch_order_volumes
+
+PAGES = {
+    1: [{"type_id": 34, "volume_total": 100}, {"type_id": 35, "volume_total": 5}],
+    2: [{"type_id": 34, "volume_total": 50}],
+    3: [{"type_id": 36, "volume_total": 7}],
+    4: [{"type_id": 35, "volume_total": 1}, {"type_id": 36, "volume_total": 3}],
+    5: [{"type_id": 37, "volume_total": 9}],
+}
+
+
+@pytest.fixture
+def session(tmp_path):
+    metrics.reset()
+    with CachingSession(str(tmp_path / "cache.sqlite"), rate_per_host=None, retries=0) as s:
+        yield s
+    metrics.reset()
+
+
+def page_errors():
+    series = metrics.to_dict()["counters"].get("page_errors_total", [])
+    return {s["labels"]["error"]: s["value"] for s in series}
+
+
+def test_failing_and_malformed_pages_are_skipped_and_counted(session, monkeypatch):
+    with EsiServer(PAGES, failing={3}, malformed={4}) as server:
+        monkeypatch.setattr(trade.orders, "ESI_URL", server.url)
+        volumes = fetch_order_volumes(10000002, session=session, max_workers=4)
+
+    assert volumes == {34: 150, 35: 5, 37: 9}
+    assert sorted(server.hits) == sorted(f"/latest/markets/10000002/orders/?page={p}" for p in PAGES)
+    assert page_errors() == {"HTTP 500": 1, "JSONDecodeError": 1}
+
+
+def test_malformed_first_page_returns_nothing(session, monkeypatch):
+    with EsiServer(PAGES, malformed={1}) as server:
+        monkeypatch.setattr(trade.orders, "ESI_URL", server.url)
+        assert fetch_order_volumes(10000002, session=session) == {}
+
+    assert len(server.hits) == 1
+    assert page_errors() == {"JSONDecodeError": 1}
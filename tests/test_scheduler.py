@@ -0,0 +1,42 @@
+import json
+
+import pandas as pd
+import pytest
+
+import fuel.prices
+from common.appraisal import page_cache
+from fuel.scheduler import CollectionScheduler, volatility_scores
+from stubs import AppraisalServer
+
+ITEMS = {"Oxygen": 3683, "Coolant": 9832, "Heavy Water": 16272}
+REGIONS = ["jita", "C-J6MT"]
+
+
+@pytest.fixture
+def fresh_checkout(tmp_path, monkeypatch):
+    """An items table and nothing else: no prices, no history, no scheduler state."""
+    monkeypatch.chdir(tmp_path)
+    pd.DataFrame({"Item": list(ITEMS), "ID": list(ITEMS.values())}).to_csv("items.csv", index=False)
+    page_cache.clear()
+    yield tmp_path
+    page_cache.clear()
+
+
+def test_no_history_scores_nothing(fresh_checkout):
+    assert volatility_scores(REGIONS) == {}
+
+
+def test_scheduler_runs_without_history(fresh_checkout, monkeypatch):
+    with AppraisalServer() as server:
+        monkeypatch.setattr(fuel.prices, "BASE_URL", server.url)
+        scheduler = CollectionScheduler(REGIONS, requests_per_hour=36_000, flush_seconds=60)
+        scheduler.run(duration=3)
+
+    assert len(server.hits) == len(ITEMS)
+    assert all(job["interval"] == scheduler.max_interval for job in scheduler.jobs.values())
+    for region in REGIONS:
+        saved = pd.read_csv(f"prices/prices_{region}.csv")
+        assert sorted(saved["Item"]) == sorted(ITEMS)
+    with open("scheduler_state.json", encoding="utf-8") as f:
+        state = json.load(f)
+    assert all(job["last"] is not None for job in state["jobs"].values())
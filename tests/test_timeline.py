@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+
+from benchmarks import synthetic
+from fuel.timeline import COMPARISON_CSV, FULL_TIMESERIES_CSV, rebuild_timeline, update_timeline
+
+
+def region_frame(df, region):
+    df = df.assign(Region=region, Timestamp=pd.to_datetime(df["Timestamp"]))
+    return df.sort_values("Timestamp", kind="stable").reset_index(drop=True)
+
+
+@pytest.fixture
+def frames():
+    history = synthetic.price_history(synthetic.BASE_SNAPSHOTS, regions=["jita", "C-J6MT"])
+    return region_frame(history["jita"], "Jita"), region_frame(history["C-J6MT"], "C-J6MT")
+
+
+def read_outputs(save_dir):
+    return [pd.read_csv(save_dir / name, float_precision="round_trip") for name in (FULL_TIMESERIES_CSV, COMPARISON_CSV)]
+
+
+def assert_same_outputs(incremental_dir, full_dir):
+    for incremental, full in zip(read_outputs(incremental_dir), read_outputs(full_dir)):
+        # Same rows in the same order; rolling std and integer formatting may differ in the last digit
+        pd.testing.assert_frame_equal(incremental, full, check_dtype=False, rtol=1e-9)
+
+
+@pytest.mark.parametrize("cj_lag", [0, 2])
+def test_updates_match_rebuild(tmp_path, frames, cj_lag):
+    df_jita, df_cj = frames
+    full_dir, incremental_dir = tmp_path / "full", tmp_path / "incremental"
+    full_dir.mkdir()
+    incremental_dir.mkdir()
+    rebuild_timeline(df_jita, df_cj, str(full_dir))
+
+    # Snapshots arrive one at a time, C-J6MT `cj_lag` snapshots behind Jita
+    times = sorted(df_jita["Timestamp"].unique())
+    first = 5
+    rebuild_timeline(df_jita[df_jita["Timestamp"] <= times[first]],
+                     df_cj[df_cj["Timestamp"] <= times[first - cj_lag]], str(incremental_dir))
+    for k in range(first + 1, len(times)):
+        update_timeline(df_jita[df_jita["Timestamp"] <= times[k]],
+                        df_cj[df_cj["Timestamp"] <= times[k - cj_lag]], str(incremental_dir))
+    update_timeline(df_jita, df_cj, str(incremental_dir))
+
+    assert_same_outputs(incremental_dir, full_dir)
+
+
+def test_update_without_new_snapshots_changes_nothing(tmp_path, frames):
+    df_jita, df_cj = frames
+    rebuild_timeline(df_jita, df_cj, str(tmp_path))
+    before = [(tmp_path / name).read_bytes() for name in (FULL_TIMESERIES_CSV, COMPARISON_CSV)]
+    update_timeline(df_jita, df_cj, str(tmp_path))
+    assert [(tmp_path / name).read_bytes() for name in (FULL_TIMESERIES_CSV, COMPARISON_CSV)] == before
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+from scipy.optimize import linprog
+
+from trade.refining import (DELIVERY_COST_PER_M3, MIN_PROCESS_QUANTITY, MINERAL_COLUMNS, REPROCESSING_YIELD,
+                            price_vector, yield_matrix)
+
+
+class OreMixSolver:
+    """Cheapest ore purchase that refines into at least a given mineral shopping list.
+
+    Decision variables are refining portions (MIN_PROCESS_QUANTITY units) per ore. The cost
+    of a portion is its buy price plus DELIVERY_COST_PER_M3 × compressed m3. Ores without a
+    price or without a compressed volume are not considered. The problem matrices are built
+    once, so solving many demand vectors only re-runs the LP.
+    """
+
+    def __init__(self, df_ores: pd.DataFrame, ore_prices: pd.DataFrame, yield_: float = REPROCESSING_YIELD,
+                 delivery_cost_per_m3: float = DELIVERY_COST_PER_M3, quantity: int = MIN_PROCESS_QUANTITY,
+                 column: str = "Buy_Max"):
+        ores = df_ores["Ore Type"].tolist()
+        price = price_vector(ore_prices, ores, column)
+        volume = df_ores["Compressed m3"].to_numpy(dtype=float) * quantity
+        usable = ~np.isnan(price) & ~np.isnan(volume)
+
+        self.quantity = quantity
+        self.ores = [ore for ore, ok in zip(ores, usable) if ok]
+        self.minerals = list(MINERAL_COLUMNS.values())
+        self.volume = volume[usable]
+        self.cost = price[usable] * quantity + self.volume * delivery_cost_per_m3
+        self.output = yield_matrix(df_ores)[usable] * yield_        # portions -> minerals, O × M
+
+    def demand_vector(self, demand) -> np.ndarray:
+        unknown = set(demand) - set(self.minerals)
+        if unknown:
+            raise ValueError(f"Unknown minerals: {sorted(unknown)}")
+        return np.array([float(demand.get(m, 0)) for m in self.minerals])
+
+    def solve(self, demand, cargo_m3: float = None, integer: bool = False) -> dict:
+        """Solve for one {mineral: quantity} demand. Returns status, cost, plan and mineral balance."""
+        need = self.demand_vector(demand)
+        a_ub = [-self.output.T]
+        b_ub = [-need]
+        if cargo_m3 is not None:
+            a_ub.append(self.volume[None, :])
+            b_ub.append([cargo_m3])
+
+        res = linprog(self.cost, A_ub=np.vstack(a_ub), b_ub=np.concatenate(b_ub), bounds=(0, None),
+                      method="highs", integrality=np.ones(len(self.ores)) if integer else None)
+        if res.status != 0:
+            return {"status": res.message, "total_cost": None, "plan": None, "minerals": None}
+
+        portions = res.x
+        used = portions > 1e-9
+        plan = pd.DataFrame({
+            "Ore": np.asarray(self.ores, dtype=object)[used],
+            "Portions": portions[used],
+            "Units": portions[used] * self.quantity,
+            "Volume_m3": portions[used] * self.volume[used],
+            "Cost": portions[used] * self.cost[used],
+        }).sort_values("Cost", ascending=False).reset_index(drop=True)
+        minerals = pd.DataFrame({
+            "Mineral": self.minerals,
+            "Demand": need,
+            "Refined": portions @ self.output,
+        })
+        minerals["Surplus"] = minerals["Refined"] - minerals["Demand"]
+        return {"status": "optimal", "total_cost": float(res.fun), "plan": plan, "minerals": minerals}
+
+    def solve_batch(self, demands: pd.DataFrame, cargo_m3: float = None, integer: bool = False) -> pd.DataFrame:
+        """One row per demand row (mineral columns): total cost, volume and portions per ore."""
+        rows = []
+        for index, demand in demands.fillna(0).iterrows():
+            result = self.solve(demand.to_dict(), cargo_m3=cargo_m3, integer=integer)
+            row = {"Demand": index, "Status": result["status"], "Total_Cost": result["total_cost"]}
+            if result["plan"] is not None:
+                row["Volume_m3"] = result["plan"]["Volume_m3"].sum()
+                row.update(dict(zip(result["plan"]["Ore"], result["plan"]["Portions"])))
+            rows.append(row)
+        return pd.DataFrame(rows).fillna({ore: 0 for ore in self.ores})
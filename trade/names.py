@@ -0,0 +1,87 @@
+import sqlite3
+
+import requests
+
+from common.http import DEFAULT_TIMEOUT
+
+NAMES_DB = "type_names.sqlite"
+NAMES_BATCH = 1000  # ESI /universe/names/ accepts at most 1000 ids per call
+SQLITE_CHUNK = 900
+
+
+class TypeNameCache:
+    """Persistent type_id → name map backed by SQLite."""
+
+    def __init__(self, path: str = NAMES_DB):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS type_names (type_id INTEGER PRIMARY KEY, name TEXT NOT NULL)")
+        self.conn.commit()
+
+    def get_many(self, type_ids) -> dict:
+        type_ids = list(type_ids)
+        found = {}
+        for i in range(0, len(type_ids), SQLITE_CHUNK):
+            chunk = type_ids[i:i + SQLITE_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT type_id, name FROM type_names WHERE type_id IN ({placeholders}) AND name != ''", chunk
+            )
+            found.update(rows)
+        return found
+
+    def put_many(self, names: dict):
+        self.conn.executemany("INSERT OR REPLACE INTO type_names (type_id, name) VALUES (?, ?)", names.items())
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _post_names(session, url, type_ids) -> dict:
+    if session is not None:
+        r = session.post(url, json=type_ids)
+    else:
+        r = requests.post(url, json=type_ids, timeout=DEFAULT_TIMEOUT)
+
+    if r.status_code == 404:
+        # ESI rejects the whole batch when any id is unknown: bisect to isolate it
+        if len(type_ids) == 1:
+            return {type_ids[0]: ""}
+        middle = len(type_ids) // 2
+        names = _post_names(session, url, type_ids[:middle])
+        names.update(_post_names(session, url, type_ids[middle:]))
+        return names
+
+    r.raise_for_status()
+    names = {entry["id"]: entry["name"] for entry in r.json()}
+    for type_id in type_ids:
+        names.setdefault(type_id, "")
+    return names
+
+
+def resolve_type_names(type_ids, esi_url: str, session=None, cache: TypeNameCache = None) -> dict:
+    type_ids = sorted({int(t) for t in type_ids})
+    names = cache.get_many(type_ids) if cache is not None else {}
+    missing = [t for t in type_ids if t not in names]
+
+    url = f"{esi_url}/universe/names/"
+    for i in range(0, len(missing), NAMES_BATCH):
+        batch = missing[i:i + NAMES_BATCH]
+        try:
+            batch_names = _post_names(session, url, batch)
+        except requests.RequestException as e:
+            print(f"[ERROR] Name lookup failed for {len(batch)} types: {e}")
+            continue
+        names.update(batch_names)
+        if cache is not None:
+            # Unresolved ids (possibly a transient 404) are looked up again next run
+            cache.put_many({type_id: name for type_id, name in batch_names.items() if name})
+        print(f"Resolved {min(i + NAMES_BATCH, len(missing))}/{len(missing)} new type names")
+
+    return names
@@ -0,0 +1,129 @@
+import requests
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from common.http import CachingSession, HTTP_CACHE_DB
+from common.metrics import metrics
+from trade.names import NAMES_DB, TypeNameCache, resolve_type_names
+
+REGION_ID = 10000002  # Jita
+TOP_N = 10000
+TOP_ITEMS_CSV = "top_10000_items.csv"
+
+ESI_URL = "https://esi.evetech.net/latest"
+MAX_WORKERS = 16
+METRICS_RUN = "esi_orders"
+# ESI limits errors, not request rate: the session's adaptive window finds the pace
+ESI_RATE_PER_HOST = None
+
+
+def orders_url(region_id):
+    return f"{ESI_URL}/markets/{region_id}/orders/"
+
+
+def add_order_volumes(volume_map, orders):
+    for order in orders:
+        type_id = order['type_id']
+        volume_map[type_id] = volume_map.get(type_id, 0) + order['volume_total']
+    metrics.inc("orders_total", len(orders), help="Market orders aggregated", collector="esi")
+    return len(orders)
+
+
+def page_failed(page, error):
+    metrics.inc("page_errors_total", help="Order pages that could not be used", collector="esi", error=error)
+    print(f"[ERROR] Orders page {page} failed: {error}")
+
+
+def page_orders(resp, page):
+    """Decoded orders of a page, or None (counted in page_errors_total) if the page is unusable."""
+    if resp.status_code != 200:
+        page_failed(page, f"HTTP {resp.status_code}")
+        return None
+    try:
+        return resp.json()
+    except ValueError as e:
+        # Truncated or garbled body; requests' JSONDecodeError is a ValueError
+        page_failed(page, type(e).__name__)
+        return None
+
+
+def fetch_order_volumes(region_id=REGION_ID, session=None, max_workers=MAX_WORKERS):
+    url = orders_url(region_id)
+    own_session = session is None
+    if own_session:
+        session = CachingSession(HTTP_CACHE_DB, pool_size=max_workers, rate_per_host=ESI_RATE_PER_HOST)
+
+    volume_map = {}
+    n_orders = 0
+    try:
+        r = session.get(url, params={"page": 1})
+        orders = page_orders(r, 1)
+        if orders is None:
+            print(f"[ERROR] No orders for region {region_id}")
+            return volume_map
+        n_orders += add_order_volumes(volume_map, orders)
+
+        if "X-Pages" in r.headers:
+            pages = int(r.headers["X-Pages"])
+            # Pages are aggregated on this thread as they complete, so no full order list is kept
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {executor.submit(session.get, url, params={"page": page}): page
+                           for page in range(2, pages + 1)}
+                for future in as_completed(futures):
+                    page = futures[future]
+                    try:
+                        resp = future.result()
+                    except requests.RequestException as e:
+                        page_failed(page, type(e).__name__)
+                        continue
+                    with metrics.timer("parse_seconds", help="JSON decoding and aggregation per page",
+                                       collector="esi"):
+                        orders = page_orders(resp, page)
+                        if orders is not None:
+                            n_orders += add_order_volumes(volume_map, orders)
+        else:
+            # No page count advertised: walk pages until an empty one
+            page = 2
+            while True:
+                r = session.get(url, params={"page": page})
+                if r.status_code != 200:
+                    break
+                data = page_orders(r, page)
+                if data == []:
+                    break
+                if data is not None:
+                    n_orders += add_order_volumes(volume_map, data)
+                page += 1
+    finally:
+        if own_session:
+            print(session.stats.summary())
+            print(session.summary())
+            session.close()
+
+    print(f"Found {n_orders} orders")
+    return volume_map
+
+
+def resolve_names(volume_map, session=None):
+    with TypeNameCache(NAMES_DB) as cache:
+        names = resolve_type_names(volume_map.keys(), ESI_URL, session=session, cache=cache)
+    return [{"name": names.get(type_id, ""), "type_id": type_id, "volume": volume}
+            for type_id, volume in volume_map.items()]
+
+
+def export_top_items(region_id=REGION_ID, top_n=TOP_N, output_csv=TOP_ITEMS_CSV):
+    metrics.reset()
+    # Order pages and name lookups share one pool and one adaptive window for the ESI host
+    with CachingSession(HTTP_CACHE_DB, pool_size=MAX_WORKERS, rate_per_host=ESI_RATE_PER_HOST) as session:
+        volume_map = fetch_order_volumes(region_id, session=session)
+        records = resolve_names(volume_map, session=session)
+        print(session.stats.summary())
+        print(session.summary())
+
+    df = pd.DataFrame(records)
+    df = df.sort_values("volume", ascending=False).head(top_n)
+    with metrics.timer("write_seconds", help="Time spent writing collected rows", collector="esi", target="csv"):
+        df.to_csv(output_csv, index=False)
+    metrics.inc("rows_written_total", len(df), help="Rows saved", collector="esi")
+    print(f"CSV saved as {output_csv}")
+    print(f"Metrics written to {', '.join(metrics.export(METRICS_RUN))}")
+    return df
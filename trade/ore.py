@@ -1,131 +1,133 @@
 import pandas as pd
-import requests
 import os
-import time
 from datetime import datetime
-from bs4 import BeautifulSoup
-import matplotlib.pyplot as plt
+from common.http import CachingSession, HTTP_CACHE_DB
+from common.appraisal import APPRAISAL_URL, fetch_item_page, parse_region_tables
+from common.latest import LatestPrices
+from common.metrics import metrics
+from trade.refining import DELIVERY_COST_PER_M3, MIN_PROCESS_QUANTITY, refining_grid
 
 
 ORES_CSV = "ores.csv"
 MINERALS_CSV = "minerals.csv"
 OUTPUT_DIR = "prices"
 REGIONS = ["jita", "C-J6MT"]
-BASE_URL = "https://appraise.gnf.lt/item/{}#{}"
+BASE_URL = APPRAISAL_URL
+METRICS_RUN = "ore_collect"
 
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+latest_prices = LatestPrices(os.path.join(OUTPUT_DIR, "latest.csv"), key="Name")
 
 
-def parse_prices_from_page(type_id, region):
-    url = BASE_URL.format(type_id, region)
-    try:
-        r = requests.get(url, timeout=15)
-        r.raise_for_status()
-        soup = BeautifulSoup(r.text, "html.parser")
-
-        tab = soup.find("div", id=region)
-        if not tab:
-            print(f"[WARN] Region tab {region} not found for item {type_id}")
-            return None
-
-        tables = tab.find_all("table")
-        if not tables or len(tables) < 2:
-            print(f"[WARN] Missing expected tables for {region} item {type_id}")
-            return None
-
-        def extract_sell_price(table):
-            for row in table.find_all("tr"):
-                th = row.find("th")
-                td = row.find("td")
-                if th and th.text.strip().lower() == "min":
-                    val = td.text.strip().replace(",", "").replace(" ISK", "")
-                    try:
-                        return float(val)
-                    except:
-                        return None
-            return None
-
-        def extract_buy_price(table):
-            for row in table.find_all("tr"):
-                th = row.find("th")
-                td = row.find("td")
-                if th and th.text.strip().lower() == "max":
-                    val = td.text.strip().replace(",", "").replace(" ISK", "")
-                    try:
-                        return float(val)
-                    except:
-                        return None
-            return None
-
-        sell_price = extract_sell_price(tables[0])
-        buy_price = extract_buy_price(tables[1])
-
-        return {
-            "Sell_Min": sell_price,
-            "Buy_Max": buy_price
-        }
-
-    except Exception as e:
-        print(f"[ERROR] Fetch failed for {type_id} ({region}): {e}")
-        return None
-
-
-def fetch_prices(input_csv, name_column, id_column, prefix, region):
-    df = pd.read_csv(input_csv)
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    output_data = []
-
-    print(f"\n=== Fetching {prefix} prices for region: {region} ===")
+def _find_price(data, label):
+    for key, val in data.items():
+        if key.lower() == label:
+            return val
+    return None
 
-    for _, row in df.iterrows():
-        item_name = row[name_column]
-        type_id = row[id_column]
 
-        if pd.isna(type_id):
-            print(f"[SKIP] No Type ID for {item_name}")
+def parse_prices_for_regions(type_id, regions, session=None):
+    try:
+        html = fetch_item_page(type_id, session=session, url=BASE_URL)
+        with metrics.timer("parse_seconds", help="HTML extraction time per item page", collector="ore"):
+            tables = parse_region_tables(html, regions)
+    except Exception as e:
+        metrics.inc("item_errors_total", help="Items whose page could not be fetched or parsed",
+                    collector="ore", error=type(e).__name__)
+        print(f"[ERROR] Fetch failed for {type_id}: {e}")
+        return {region: None for region in regions}
+
+    result = {}
+    for region in regions:
+        if tables[region] is None:
+            metrics.inc("region_missing_total", help="Region tabs missing or incomplete on an item page",
+                        collector="ore", region=region)
+            print(f"[WARN] Region tab {region} not found or incomplete for item {type_id}")
+            result[region] = None
             continue
 
-        try:
-            type_id = int(type_id)
-        except:
-            print(f"[SKIP] Invalid Type ID for {item_name}")
-            continue
+        sell_data, buy_data = tables[region]
+        result[region] = {
+            "Sell_Min": _find_price(sell_data, "min"),
+            "Buy_Max": _find_price(buy_data, "max")
+        }
+
+    return result
 
-        print(f"→ {item_name} (ID: {type_id})")
 
-        prices = parse_prices_from_page(type_id, region)
-        if prices:
-            prices.update({
-                "Name": item_name,
-                "TypeID": type_id,
-                "Region": region,
-                "Timestamp": timestamp
-            })
-            output_data.append(prices)
+def parse_prices_from_page(type_id, region, session=None):
+    return parse_prices_for_regions(type_id, [region], session=session)[region]
 
-        time.sleep(0.5)
 
-    if output_data:
-        df_out = pd.DataFrame(output_data)
-        output_file = os.path.join(OUTPUT_DIR, f"{prefix}_min_prices_{region}.csv")
-        df_out.to_csv(output_file, index=False)
-        print(f"[OK] Saved {len(df_out)} entries → {output_file}")
-    else:
-        print(f"[WARN] No data collected for {prefix} ({region})")
+def fetch_prices(input_csv, name_column, id_column, prefix, regions):
+    if isinstance(regions, str):
+        regions = [regions]
+    df = pd.read_csv(input_csv)
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    output_data = {region: [] for region in regions}
+
+    print(f"\n=== Fetching {prefix} prices for regions: {', '.join(regions)} ===")
+
+    with CachingSession(HTTP_CACHE_DB, pool_size=1, rate_per_host=2.0, burst=1) as session:
+        for _, row in df.iterrows():
+            item_name = row[name_column]
+            type_id = row[id_column]
+
+            if pd.isna(type_id):
+                metrics.inc("items_skipped_total", help="Rows without a usable Type ID", collector="ore")
+                print(f"[SKIP] No Type ID for {item_name}")
+                continue
+
+            try:
+                type_id = int(type_id)
+            except:
+                metrics.inc("items_skipped_total", collector="ore")
+                print(f"[SKIP] Invalid Type ID for {item_name}")
+                continue
+
+            print(f"→ {item_name} (ID: {type_id})")
+
+            for region, prices in parse_prices_for_regions(type_id, regions, session).items():
+                if prices:
+                    prices.update({
+                        "Name": item_name,
+                        "TypeID": type_id,
+                        "Region": region,
+                        "Timestamp": timestamp
+                    })
+                    output_data[region].append(prices)
+
+        print(session.stats.summary())
+        print(session.summary())
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    for region in regions:
+        if output_data[region]:
+            df_out = pd.DataFrame(output_data[region])
+            output_file = os.path.join(OUTPUT_DIR, f"{prefix}_min_prices_{region}.csv")
+            with metrics.timer("write_seconds", help="Time spent writing collected rows",
+                               collector="ore", target="csv"):
+                df_out.to_csv(output_file, index=False)
+            with metrics.timer("write_seconds", collector="ore", target="latest"):
+                latest_prices.update(df_out)
+            metrics.inc("rows_written_total", len(df_out), help="Price rows saved per region",
+                        collector="ore", prefix=prefix, region=region)
+            print(f"[OK] Saved {len(df_out)} entries → {output_file}")
+        else:
+            print(f"[WARN] No data collected for {prefix} ({region})")
 
 
 def get_all_prices():
-    for region in REGIONS:
-        fetch_prices(ORES_CSV, "Ore Type", "Type ID", "ore", region)
-        fetch_prices(MINERALS_CSV, "Mineral", "Type_ID", "mineral", region)
-        time.sleep(1)
+    metrics.reset()
+    fetch_prices(ORES_CSV, "Ore Type", "Type ID", "ore", REGIONS)
+    fetch_prices(MINERALS_CSV, "Mineral", "Type_ID", "mineral", REGIONS)
+    print(f"Metrics written to {', '.join(metrics.export(METRICS_RUN))}")
 
 
-DELIVERY_COST_PER_M3 = 1200
-MIN_PROCESS_QUANTITY = 100
 
 
 def compare_buy_profit(minerals_csv, jita_csv, cj_csv):
+    import matplotlib.pyplot as plt
+
     df_minerals = pd.read_csv(minerals_csv)
     df_jita = pd.read_csv(jita_csv)
     df_cj = pd.read_csv(cj_csv)
@@ -171,68 +173,26 @@ def compare_buy_profit(minerals_csv, jita_csv, cj_csv):
 
 
 def ores_profit_analysis(ores_csv, minerals_csv, ore_jita_csv, mineral_cj_csv):
+    import matplotlib.pyplot as plt
+
     df_ores = pd.read_csv(ores_csv)
-    df_minerals = pd.read_csv(minerals_csv)
     df_ore_jita = pd.read_csv(ore_jita_csv)
     df_mineral_cj = pd.read_csv(mineral_cj_csv)
 
-    mineral_map = {
-        'Trit': 'Tritanium',
-        'Pye': 'Pyerite',
-        'Mex': 'Mexallon',
-        'Iso': 'Isogen',
-        'Nocx': 'Nocxium',
-        'Zyd': 'Zydrine',
-        'Mega': 'Megacyte',
-        'Morph': 'Morphite'
-    }
-
-    df_ore_jita.rename(columns={'Ore Type':'Name'}, inplace=True, errors='ignore')
-    df_mineral_cj.rename(columns={'Mineral':'Name'}, inplace=True, errors='ignore')
-
-    results = []
-
-    for _, ore in df_ores.iterrows():
-        ore_name = ore['Ore Type']
-        ore_volume = ore['Compressed m3'] * MIN_PROCESS_QUANTITY
-
-        buy_price_jita_row = df_ore_jita[df_ore_jita['Name'] == ore_name]
-        if buy_price_jita_row.empty or pd.isna(buy_price_jita_row['Buy_Max'].values[0]) or buy_price_jita_row['Buy_Max'].values[0] <= 0:
-            print(f"[WARN] No valid Buy price in Jita for ore: {ore_name}, skipping")
-            continue
-        buy_price_jita = buy_price_jita_row['Buy_Max'].values[0]
-
-        cost_ore = (buy_price_jita * MIN_PROCESS_QUANTITY) + (ore_volume * DELIVERY_COST_PER_M3)
-
-        minerals_value_cj = 0
-        for mineral_code, mineral_name in mineral_map.items():
-            amount = ore.get(mineral_code, 0)
-            if amount > 0:
-                mineral_row = df_mineral_cj[df_mineral_cj['Name'] == mineral_name]
-                if mineral_row.empty or pd.isna(mineral_row['Buy_Max'].values[0]) or mineral_row['Buy_Max'].values[0] <= 0:
-                    continue
-                sell_price_cj = mineral_row['Buy_Max'].values[0]
-                minerals_value_cj += amount * 0.8 * sell_price_cj
-
-        profit = minerals_value_cj - cost_ore
-
-        results.append({
-            'Ore': ore_name,
-            'Ore_Buy_Cost_Jita': cost_ore,
-            'Minerals_Value_CJ': minerals_value_cj,
-            'Profit': profit,
-            'Profit_per_ore_unit': profit / MIN_PROCESS_QUANTITY,
-            'Margin_%': (profit / minerals_value_cj * 100) if minerals_value_cj > 0 else 0,
-            'ROI_%': (profit / cost_ore * 100) if cost_ore > 0 else 0,
-            'Decision': 'Profitable' if profit > 0 else 'Not profitable'
-        })
-
-    if not results:
+    grid = refining_grid(df_ores, {"jita": df_ore_jita}, {"C-J6MT": df_mineral_cj},
+                         delivery_cost_per_m3=DELIVERY_COST_PER_M3, quantity=MIN_PROCESS_QUANTITY)
+    for ore_name in df_ores.loc[~df_ores["Ore Type"].isin(grid["Ore"]), "Ore Type"]:
+        print(f"[WARN] No valid Buy price in Jita for ore: {ore_name}, skipping")
+
+    df_result = grid.rename(columns={
+        'Ore_Buy_Cost': 'Ore_Buy_Cost_Jita',
+        'Minerals_Value': 'Minerals_Value_CJ',
+    }).drop(columns=['Buy_Region', 'Sell_Region', 'Yield'])
+
+    if df_result.empty:
         print("No valid data to calculate profit. Check ore names and Jita/C-J prices.")
         return
 
-    df_result = pd.DataFrame(results)
-
     pd.set_option('display.float_format', '{:,.0f}'.format)
     print(df_result.to_string(index=False))
 
@@ -245,19 +205,3 @@ def ores_profit_analysis(ores_csv, minerals_csv, ore_jita_csv, mineral_cj_csv):
     plt.xticks(rotation=45, ha='right')
     plt.tight_layout()
     plt.show()
-
-
-ores_profit_analysis(
-    ores_csv="ores.csv",
-    minerals_csv="minerals.csv",
-    ore_jita_csv="prices/ore_min_prices_jita.csv",
-    mineral_cj_csv="prices/mineral_min_prices_C-J6MT.csv"
-)
-
-# compare_buy_profit(
-#     minerals_csv="minerals.csv",
-#     jita_csv="prices/mineral_min_prices_jita.csv",
-#     cj_csv="prices/mineral_min_prices_C-J6MT.csv"
-# )
-
-# get_all_prices()
@@ -0,0 +1,119 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from common.arbitrage import route_cost_matrix
+from common.loader import load_prices
+
+MINERAL_COLUMNS = {
+    "Trit": "Tritanium",
+    "Pye": "Pyerite",
+    "Mex": "Mexallon",
+    "Iso": "Isogen",
+    "Nocx": "Nocxium",
+    "Zyd": "Zydrine",
+    "Mega": "Megacyte",
+    "Morph": "Morphite",
+}
+REPROCESSING_YIELD = 0.8
+DELIVERY_COST_PER_M3 = 1200
+MIN_PROCESS_QUANTITY = 100
+RESULT_COLUMNS = ["Ore", "Buy_Region", "Sell_Region", "Yield", "Ore_Buy_Cost", "Minerals_Value",
+                  "Profit", "Profit_per_ore_unit", "Margin_%", "ROI_%", "Decision"]
+
+
+def yield_matrix(df_ores: pd.DataFrame) -> np.ndarray:
+    """(ore × mineral) units refined from one portion, in ores.csv row order and MINERAL_COLUMNS order."""
+    return df_ores[list(MINERAL_COLUMNS)].fillna(0).to_numpy(dtype=float)
+
+
+def price_vector(df_prices: pd.DataFrame, names, column: str = "Buy_Max") -> np.ndarray:
+    """Latest price per name, NaN when missing or not positive."""
+    df = df_prices.rename(columns={"Ore Type": "Name", "Mineral": "Name"})
+    if "Timestamp" in df.columns:
+        df = df.assign(_ts=pd.to_datetime(df["Timestamp"], errors="coerce")).sort_values("_ts", kind="stable")
+    prices = df.drop_duplicates("Name", keep="last").set_index("Name")[column]
+    prices = prices.reindex(list(names)).to_numpy(dtype=float)
+    return np.where(prices > 0, prices, np.nan)
+
+
+def refining_grid(df_ores: pd.DataFrame, ore_prices: dict, mineral_prices: dict, yields=(REPROCESSING_YIELD,),
+                  routes=None, delivery_cost_per_m3: float = DELIVERY_COST_PER_M3,
+                  quantity: int = MIN_PROCESS_QUANTITY, column: str = "Buy_Max") -> pd.DataFrame:
+    """Value refining every ore for each (yield, buy region, sell region).
+
+    `ore_prices` / `mineral_prices` map region to a price table. Ore is bought at `column`
+    in the buy region, shipped compressed and refined, and the minerals are valued at
+    `column` in the sell region; minerals without a price there add nothing. Shipping uses
+    `routes` (see common.arbitrage.route_cost_matrix) and `delivery_cost_per_m3` for the
+    rest. Ores with no buy price in a region are left out for that region.
+    """
+    ores = df_ores["Ore Type"].tolist()
+    minerals = list(MINERAL_COLUMNS.values())
+    buy_regions = list(ore_prices)
+    sell_regions = list(mineral_prices)
+    yields = np.asarray(yields, dtype=float)
+
+    amounts = yield_matrix(df_ores)                                                    # O × M
+    ore_buy = np.stack([price_vector(ore_prices[r], ores, column) for r in buy_regions])  # B × O
+    mineral_sell = np.stack([np.nan_to_num(price_vector(mineral_prices[r], minerals, column))
+                             for r in sell_regions])                                   # S × M
+    volume = df_ores["Compressed m3"].to_numpy(dtype=float) * quantity                 # O
+
+    regions = list(dict.fromkeys(buy_regions + sell_regions))
+    route_costs = route_cost_matrix(regions, routes, delivery_cost_per_m3)
+    route_costs = route_costs[np.ix_([regions.index(r) for r in buy_regions],
+                                     [regions.index(r) for r in sell_regions])]       # B × S
+
+    gross = (mineral_sell @ amounts.T)                                                 # S × O
+    value = yields[:, None, None, None] * gross[None, None, :, :]                      # Y × 1 × S × O
+    cost = (ore_buy * quantity)[:, None, :] + route_costs[:, :, None] * volume[None, None, :]  # B × S × O
+    value, cost = np.broadcast_arrays(value, cost[None])
+    profit = value - cost
+
+    shape = profit.shape
+    y, b, s, o = (idx.ravel() for idx in np.indices(shape))
+    keep = ~np.isnan(ore_buy[b, o])
+    value, cost, profit = value.ravel()[keep], cost.ravel()[keep], profit.ravel()[keep]
+    y, b, s, o = y[keep], b[keep], s[keep], o[keep]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = pd.DataFrame({
+            "Ore": np.asarray(ores, dtype=object)[o],
+            "Buy_Region": np.asarray(buy_regions, dtype=object)[b],
+            "Sell_Region": np.asarray(sell_regions, dtype=object)[s],
+            "Yield": yields[y],
+            "Ore_Buy_Cost": cost,
+            "Minerals_Value": value,
+            "Profit": profit,
+            "Profit_per_ore_unit": profit / quantity,
+            "Margin_%": np.where(value > 0, profit / value * 100, 0),
+            "ROI_%": np.where(cost > 0, profit / cost * 100, 0),
+            "Decision": np.where(profit > 0, "Profitable", "Not profitable"),
+        }, columns=RESULT_COLUMNS)
+    return result
+
+
+def rank_refining(result: pd.DataFrame) -> pd.DataFrame:
+    return result.sort_values("Profit", ascending=False, na_position="last", kind="stable").reset_index(drop=True)
+
+
+def load_region_prices(prefix: str, regions: list, prices_dir: str = "prices") -> dict:
+    frames = {}
+    for region in regions:
+        path = os.path.join(prices_dir, f"{prefix}_min_prices_{region}.csv")
+        if os.path.exists(path):
+            frames[region] = load_prices(path, compact=False)
+        else:
+            print(f"[WARN] No {prefix} prices for {region}: {path}")
+    return frames
+
+
+def refining_sweep(regions: list, yields=(REPROCESSING_YIELD,), ores_csv: str = "ores.csv",
+                   prices_dir: str = "prices", **kwargs) -> pd.DataFrame:
+    """Full grid over buy regions × sell regions × yields, ranked by profit."""
+    df_ores = pd.read_csv(ores_csv)
+    ore_prices = load_region_prices("ore", regions, prices_dir)
+    mineral_prices = load_region_prices("mineral", regions, prices_dir)
+    return rank_refining(refining_grid(df_ores, ore_prices, mineral_prices, yields=yields, **kwargs))